@@ -0,0 +1,269 @@
+"""
+University-wide exam clash analytics for the exam office.
+
+Takes an enrollment CSV listing the courses of every student and reports,
+before a schedule is published, how many students have two exams at the same
+time and which students have three or more exams on one day.
+
+Enrollments are a sparse student x course matrix, which is multiplied with a
+course x course clash matrix and a course x day matrix derived from the exam
+intervals of the schedule, so large rosters are analysed in seconds.
+
+Usage:
+    python analytics.py enrollments.csv --pairs clashes.csv --days busy_days.csv
+"""
+
+import argparse
+import collections
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+import utils
+from cache import VersionCache
+from utils import (
+    COURSE_CODE_AND_NAME_COLUMN,
+    get_alias_index,
+    get_exam_intervals,
+    get_schedule_version,
+    normalize_alias,
+)
+
+STUDENT_COLUMN = "student"
+COURSE_COLUMN = "course"
+
+# Students with at least this many exams on one day are reported
+BUSY_DAY_EXAMS = 3
+
+ClashReport = collections.namedtuple(
+    "ClashReport",
+    ["pairs", "students_with_clashes", "busy_days", "unknown_courses"],
+)
+
+# Clash and day matrices of recently used schedules, by version
+_schedule_matrices = VersionCache()
+
+
+def read_enrollments(source):
+    """
+    Read an enrollment CSV file.
+
+    The file has a 'student' and a 'course' column, with one row per
+    enrollment or several courses in one row separated by ';'.
+
+    Args:
+        source (str or file): Path or file object of the CSV file
+
+    Returns:
+        pd.DataFrame: One row per student and course
+
+    Raises:
+        ValueError: If a required column is missing
+    """
+    enrollments = pd.read_csv(source, dtype=str)
+    missing = {STUDENT_COLUMN, COURSE_COLUMN} - set(enrollments.columns)
+    if missing:
+        raise ValueError(
+            f"Enrollment file is missing columns: {', '.join(sorted(missing))}"
+        )
+
+    enrollments = enrollments[[STUDENT_COLUMN, COURSE_COLUMN]].dropna()
+    enrollments[COURSE_COLUMN] = enrollments[COURSE_COLUMN].str.split(";")
+    enrollments = enrollments.explode(COURSE_COLUMN, ignore_index=True)
+    enrollments[COURSE_COLUMN] = enrollments[COURSE_COLUMN].str.strip()
+    return enrollments[enrollments[COURSE_COLUMN] != ""].reset_index(drop=True)
+
+
+def get_schedule_matrices(df):
+    """
+    Get the clash and day matrices of a schedule.
+
+    Computed from the exam intervals and cached per schedule version.
+
+    Args:
+        df (pd.DataFrame): Exam schedule DataFrame
+
+    Returns:
+        tuple: Course x course CSR matrix with ones where two exams overlap,
+            course x day CSR matrix with a one on each exam's day, both in
+            schedule row order, and the dates of the day columns
+    """
+    courses, clashes, days, dates = _schedule_matrices.get_or_compute(
+        get_schedule_version(df), lambda: _build_schedule_matrices(df)
+    )
+    labels = df[COURSE_CODE_AND_NAME_COLUMN].to_numpy()
+    if not np.array_equal(courses, labels):
+        # A frame of the same version may list the courses in another order
+        order = pd.Index(courses).get_indexer(labels)
+        clashes = clashes[order][:, order]
+        days = days[order]
+    return clashes, days, dates
+
+
+def _build_schedule_matrices(df):
+    courses = df[COURSE_CODE_AND_NAME_COLUMN].to_numpy()
+    # The cached intervals may be in the row order of another frame
+    intervals = get_exam_intervals(df).reindex(courses)
+    starts = intervals["start"].to_numpy()
+    ends = intervals["end"].to_numpy()
+
+    # Sweep over exams in start order, each one only meets the exams that
+    # start before it ends; exams without a valid time never clash
+    timed = np.flatnonzero(~(np.isnat(starts) | np.isnat(ends)))
+    order = timed[np.argsort(starts[timed], kind="stable")]
+    sorted_starts = starts[order]
+    last = np.searchsorted(sorted_starts, ends[order], side="left")
+    rows, columns = [], []
+    for position, stop in enumerate(last):
+        others = order[position + 1 : stop]
+        rows.append(np.full(len(others), order[position]))
+        columns.append(others)
+    rows = np.concatenate(rows) if rows else np.array([], dtype=int)
+    columns = np.concatenate(columns) if columns else np.array([], dtype=int)
+    count = len(intervals)
+    clashes = sparse.coo_matrix(
+        (np.ones(len(rows), dtype=np.int32), (rows, columns)), shape=(count, count)
+    )
+    clashes = (clashes + clashes.T).tocsr()
+
+    day_codes, dates = pd.factorize(intervals["start"].dt.normalize(), sort=True)
+    known = day_codes >= 0
+    days = sparse.csr_matrix(
+        (
+            np.ones(known.sum(), dtype=np.int32),
+            (np.flatnonzero(known), day_codes[known]),
+        ),
+        shape=(count, len(dates)),
+    )
+
+    return courses, clashes, days, dates
+
+
+def enrollment_matrix(df, enrollments):
+    """
+    Build the sparse student x course enrollment matrix.
+
+    Courses may be given by any code or name alias of their exam.
+
+    Args:
+        df (pd.DataFrame): Exam schedule DataFrame
+        enrollments (pd.DataFrame): Enrollments from read_enrollments
+
+    Returns:
+        tuple: Student x course CSR matrix of ones in schedule row order,
+            student identifiers of the rows and list of unknown courses
+    """
+    index = get_alias_index(df)
+    positions = {
+        course: position
+        for position, course in enumerate(df[COURSE_CODE_AND_NAME_COLUMN])
+    }
+    courses = enrollments[COURSE_COLUMN]
+    unique = courses.unique()
+    lookup = {
+        course: positions.get(index.get(normalize_alias(course)), -1)
+        for course in unique
+    }
+    course_codes = courses.map(lookup).to_numpy(dtype=np.int64)
+    unknown = sorted(course for course, code in lookup.items() if code < 0)
+
+    student_codes, students = pd.factorize(enrollments[STUDENT_COLUMN])
+    known = course_codes >= 0
+    matrix = sparse.csr_matrix(
+        (
+            np.ones(known.sum(), dtype=np.int32),
+            (student_codes[known], course_codes[known]),
+        ),
+        shape=(len(students), len(positions)),
+    )
+    # Repeated enrollments in the same course count once
+    matrix.sum_duplicates()
+    matrix.data[:] = 1
+    return matrix, students, unknown
+
+
+def analyze_clashes(df, enrollments, busy_day_exams=BUSY_DAY_EXAMS):
+    """
+    Find the exam clashes of all enrolled students.
+
+    Args:
+        df (pd.DataFrame): Exam schedule DataFrame
+        enrollments (pd.DataFrame): Enrollments from read_enrollments
+        busy_day_exams (int): Number of exams on one day that is reported
+
+    Returns:
+        ClashReport: Clashing course pairs with their number of affected
+            students, number of students with at least one clash, students
+            with too many exams on one day, and enrolled courses that are not
+            in the schedule
+    """
+    clashes, days, dates = get_schedule_matrices(df)
+    enrolled, students, unknown = enrollment_matrix(df, enrollments)
+    courses = df[COURSE_CODE_AND_NAME_COLUMN].to_numpy()
+
+    # Students taking both courses of every clashing pair
+    shared = (enrolled.T @ enrolled).multiply(clashes)
+    shared = sparse.triu(shared, k=1).tocoo()
+    pairs = pd.DataFrame(
+        {
+            "course_a": courses[shared.row],
+            "course_b": courses[shared.col],
+            "students": shared.data.astype(np.int64),
+        }
+    )
+    pairs = pairs.sort_values(
+        ["students", "course_a", "course_b"], ascending=[False, True, True]
+    ).reset_index(drop=True)
+
+    # Enrolled courses that clash with another course of the same student
+    clashing = enrolled.multiply(enrolled @ clashes).tocsr()
+    students_with_clashes = int((clashing.getnnz(axis=1) > 0).sum())
+
+    per_day = (enrolled @ days).tocoo()
+    busy = per_day.data >= busy_day_exams
+    busy_days = pd.DataFrame(
+        {
+            STUDENT_COLUMN: students[per_day.row[busy]],
+            "date": dates[per_day.col[busy]],
+            "exams": per_day.data[busy].astype(np.int64),
+        }
+    )
+    busy_days = busy_days.sort_values(
+        ["exams", STUDENT_COLUMN, "date"], ascending=[False, True, True]
+    ).reset_index(drop=True)
+
+    return ClashReport(pairs, students_with_clashes, busy_days, unknown)
+
+
+def main():
+    """Analyse an enrollment file against the current exam schedule"""
+    parser = argparse.ArgumentParser(description="Report exam clashes of students")
+    parser.add_argument("enrollments", help="CSV file with student and course")
+    parser.add_argument("--pairs", help="Write clashing course pairs to this CSV")
+    parser.add_argument("--days", help="Write students' busy days to this CSV")
+    parser.add_argument("--busy-day-exams", type=int, default=BUSY_DAY_EXAMS)
+    args = parser.parse_args()
+
+    report = analyze_clashes(
+        utils.get_df(), read_enrollments(args.enrollments), args.busy_day_exams
+    )
+    print(f"Students with clashing exams: {report.students_with_clashes}")
+    print(f"Clashing course pairs: {len(report.pairs)}")
+    print(
+        f"Students with {args.busy_day_exams}+ exams on one day: "
+        f"{report.busy_days[STUDENT_COLUMN].nunique()}"
+    )
+    if report.unknown_courses:
+        print(f"Courses not in the schedule: {', '.join(report.unknown_courses)}")
+    print(report.pairs.head(20).to_string(index=False))
+
+    if args.pairs:
+        report.pairs.to_csv(args.pairs, index=False)
+    if args.days:
+        report.busy_days.to_csv(args.days, index=False)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
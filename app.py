@@ -1,8 +1,39 @@
 import io
+import os
 
+import plotly.graph_objects as go
 import streamlit as st
 
-from utils import create_ics_file, create_result_dataframe, createImage, df
+from density import get_density_table, get_exam_density
+from departments import get_department_artifacts, get_departments, warm_departments
+from export import WRITERS, export_bytes
+from feed import feed_url
+from grades import required_grade, scenario_grid
+from optimizer import (
+    MAX_ELECTIVES,
+    RANK_EXAMS_PER_DAY,
+    RANK_MIN_GAP,
+    find_best_combinations,
+)
+from store import install_store_loader
+from utils import (
+    EXAM_TERM,
+    create_ics_file,
+    create_result_dataframe,
+    get_course_labels,
+    get_quarantined_rows,
+    get_schedule_loader,
+    render_table_image,
+)
+
+# Public URL of the ICS feed server (feed.py), subscriptions are hidden if unset
+FEED_BASE_URL = os.environ.get("EXAMGENIUS_FEED_URL")
+
+# SQLite database keeping processed schedules between restarts, if set
+SCHEDULE_DB = os.environ.get("EXAMGENIUS_DB")
+
+# Prebuild every department's results after each schedule load when set to 1
+WARM_DEPARTMENTS = os.environ.get("EXAMGENIUS_WARM_DEPARTMENTS") == "1"
 
 # Configure page settings - must be first Streamlit command
 st.set_page_config(page_title="Exam Genius", page_icon="📚")
@@ -20,7 +51,7 @@ def create_grade_section(label, idx, language_on, default_grade=0.0, default_wei
         default_weight (int): Default weight value
 
     Returns:
-        tuple: Grade and weight values
+        tuple: Grade and weight values, and whether the grade is still unknown
     """
     st.write(f"### {label}")
     col1, col2, col3, col4 = st.columns([2, 1, 1, 0.5])
@@ -45,7 +76,18 @@ def create_grade_section(label, idx, language_on, default_grade=0.0, default_wei
             value=default_weight,
         )
 
-    return grade, weight
+    with col3:
+        unknown = st.checkbox(
+            "?",
+            key=f"unknown_{idx}",
+            help=(
+                "Bu sınava henüz girmediyseniz işaretleyin"
+                if not language_on
+                else "Check if you have not taken this exam yet"
+            ),
+        )
+
+    return grade, weight, unknown
 
 
 def format_grade(grade):
@@ -56,6 +98,418 @@ def format_grade(grade):
     )
 
 
+def show_required_grades(grades, weights, labels, unknown, passing_grade, language_on):
+    """
+    Show the score needed on the unknown exams and a what-if grid.
+
+    Args:
+        grades (list): Grade of every exam
+        weights (list): Weight percentage of every exam
+        labels (list): Label of every exam
+        unknown (list): Indices of the exams without a grade yet
+        passing_grade (float): Minimum total grade needed to pass
+        language_on (bool): Language toggle state
+    """
+    if sum(weights[i] for i in unknown) == 0:
+        st.error(
+            "⚠️ Bilinmeyen sınavların yüzdesi 0'dan büyük olmalıdır."
+            if not language_on
+            else "⚠️ Unknown exams must have a percentage above 0."
+        )
+        return
+
+    required = required_grade(grades, weights, passing_grade, unknown)
+    required_formatted = format_grade(required)
+
+    if required == 0:
+        st.success(
+            "🎉 Kalan sınavlardan bağımsız olarak dersi geçiyorsunuz."
+            if not language_on
+            else "🎉 You pass the course regardless of the remaining exams."
+        )
+    elif required > 100:
+        st.warning(
+            f"😢 Geçmek için kalan sınavlardan {required_formatted} almanız gerekiyor, bu mümkün değil."
+            if not language_on
+            else f"😢 You would need {required_formatted} on the remaining exams, which is not possible."
+        )
+    else:
+        st.info(
+            f"🎯 Geçmek için kalan sınavlardan en az {required_formatted} almanız gerekiyor."
+            if not language_on
+            else f"🎯 You need at least {required_formatted} on the remaining exams to pass."
+        )
+
+    if len(unknown) == 1:
+        grid = scenario_grid(grades, weights, unknown, step=10)
+        grid.index = grid.index.map(format_grade)
+        grid.index.name = labels[unknown[0]]
+        grid["total"] = grid["total"].map(format_grade)
+        grid.columns = ["Toplam" if not language_on else "Total"]
+        st.dataframe(grid)
+    elif len(unknown) == 2:
+        grid = scenario_grid(grades, weights, unknown, step=1)
+        fig = go.Figure(
+            go.Heatmap(
+                z=grid.values,
+                x=grid.columns,
+                y=grid.index,
+                zmin=0,
+                zmax=100,
+                colorscale=[
+                    [0, "#d73027"],
+                    [min(max(passing_grade / 100, 0.01), 0.99), "#fee08b"],
+                    [1, "#1a9850"],
+                ],
+                hovertemplate=(
+                    f"{labels[unknown[0]]}: %{{y}}<br>"
+                    f"{labels[unknown[1]]}: %{{x}}<br>"
+                    f"{'Toplam' if not language_on else 'Total'}: %{{z:.1f}}<extra></extra>"
+                ),
+            )
+        )
+        fig.update_layout(
+            xaxis_title=labels[unknown[1]],
+            yaxis_title=labels[unknown[0]],
+            margin=dict(l=0, r=0, t=0, b=0),
+            height=300,
+        )
+        st.plotly_chart(fig)
+
+
+@st.fragment(run_every=0.5)
+def show_loading_status(loader, language_on):
+    """
+    Show the schedule loading progress until the data is ready.
+
+    Runs as a fragment so only this block polls the loader; the whole page is
+    rerun once the schedule is available.
+
+    Args:
+        loader (ScheduleLoader): Background schedule loader
+        language_on (bool): Language toggle state
+    """
+    if loader.is_ready:
+        st.rerun()
+    elif loader.status == loader.ERROR:
+        st.error(
+            "⚠️ Sınav programı yüklenemedi. Lütfen daha sonra tekrar deneyin."
+            if not language_on
+            else "⚠️ The exam schedule could not be loaded. Please try again later."
+        )
+        if st.button("🔄 Tekrar Dene" if not language_on else "🔄 Retry"):
+            loader.start()
+            st.rerun()
+    else:
+        st.progress(
+            loader.progress,
+            text=(
+                "Sınav programı yükleniyor..."
+                if not language_on
+                else "Loading the exam schedule..."
+            ),
+        )
+
+
+def show_exam_dates(df, language_on):
+    """
+    Show the course picker and the exam dates of the selected courses.
+
+    Args:
+        df (pd.DataFrame): Exam schedule DataFrame
+        language_on (bool): Language toggle state
+    """
+    departments = get_departments(df)
+    department = st.selectbox(
+        "Bölümün Tüm Dersleri" if not language_on else "Whole Department",
+        [None] + list(departments),
+        format_func=lambda department: (
+            department.upper()
+            if department
+            else ("Bölüm seçin" if not language_on else "Select a department")
+        ),
+        key="department",
+    )
+
+    if department:
+        course_list = departments[department]
+        st.caption(
+            f"{department.upper()} bölümünün {len(course_list)} dersi seçildi."
+            if not language_on
+            else f"All {len(course_list)} courses of {department.upper()} are selected."
+        )
+    else:
+        # Cross-listed codes are part of the labels so searching finds them
+        labels = get_course_labels(df)
+        course_list = st.multiselect(
+            "Dersleri Seçin" if not language_on else "Select Courses",
+            df["DERS KODU VE ADI"],
+            format_func=labels.get,
+            placeholder=(
+                "Ders Kodu veya Adı" if not language_on else "Course Code or Name"
+            ),
+        )
+
+    col1, col2, col3 = st.columns(3)
+
+    if len(course_list) > 0 and col1.button(
+        "Sınav Tarihlerini Göster" if not language_on else "Show Exam Dates"
+    ):
+        image = None
+        if department:
+            # Whole departments are served from the prebuilt artifacts
+            artifacts = get_department_artifacts(
+                df, department, "tr" if not language_on else "en", exam_type="final"
+            )
+            result_df, ics_content, image = artifacts
+        else:
+            result_df = create_result_dataframe(
+                df,
+                course_list,
+                "tr" if not language_on else "en",
+                include_classroom=True,
+            )
+            ics_content = create_ics_file(
+                df, course_list, "tr" if not language_on else "en", exam_type="final"
+            )
+        st.dataframe(result_df, hide_index=True)
+
+        if image is None:
+            image = render_table_image(result_df)
+
+        col2.download_button(
+            "Resim Olarak İndir" if not language_on else "Download as Image",
+            data=image,
+            file_name="examgenius.png",
+            mime="image/png",
+        )
+
+        # Offer download of ICS file
+        ics_bytes = ics_content.encode()
+
+        col3.download_button(
+            "📆 Takvime Ekle" if not language_on else "📆 Add to Calendar",
+            data=io.BytesIO(ics_bytes),
+            file_name="exam_schedule.ics",
+            mime="text/calendar",
+            help=(
+                "Sınav tarihlerini takvim uygulamanıza eklemek için tıklayın"
+                if not language_on
+                else "Click to add exam dates to your calendar application"
+            ),
+        )
+
+        # Offer the other export formats and a bundle of all of them
+        language = "tr" if not language_on else "en"
+        formats = [fmt for fmt in WRITERS if fmt != "ics"] + ["zip"]
+        for export_col, fmt in zip(st.columns(len(formats)), formats):
+            if fmt == "zip":
+                label = "📦 Tümü (ZIP)" if not language_on else "📦 All (ZIP)"
+                extension, mime = "zip", "application/zip"
+            else:
+                label = fmt.upper()
+                extension, mime = WRITERS[fmt].extension, WRITERS[fmt].mime
+            export_col.download_button(
+                label,
+                # Only the clicked format is generated
+                data=lambda fmt=fmt: export_bytes(
+                    result_df, fmt, language, exam_type="final"
+                ),
+                file_name=f"exam_schedule.{extension}",
+                mime=mime,
+                key=f"export_{fmt}",
+            )
+
+        if FEED_BASE_URL:
+            st.caption(
+                "🔔 Takvim uygulamanızda aşağıdaki adrese abone olun, sınav programı değiştiğinde takviminiz kendiliğinden güncellenir:"
+                if not language_on
+                else "🔔 Subscribe to this address in your calendar application to get schedule changes automatically:"
+            )
+            st.code(
+                feed_url(
+                    FEED_BASE_URL, df, course_list, "tr" if not language_on else "en"
+                ),
+                language=None,
+            )
+
+    # Rows of the workbook that failed validation are listed for reference
+    quarantine = get_quarantined_rows(df)
+    if len(quarantine) > 0:
+        with st.expander(
+            f"⚠️ Sınav programında hatalı olduğu için atlanan satırlar: {len(quarantine)}"
+            if not language_on
+            else f"⚠️ Rows of the exam schedule skipped as invalid: {len(quarantine)}"
+        ):
+            st.dataframe(quarantine, hide_index=True)
+
+
+def format_gap(gap, language_on):
+    """
+    Format the rest between two exams in days and hours.
+
+    Args:
+        gap (pd.Timedelta): Rest between exams, None if there is only one exam
+        language_on (bool): Language toggle state
+
+    Returns:
+        str: Formatted duration
+    """
+    if gap is None:
+        return "-"
+    hours = int(gap.total_seconds() // 3600)
+    days, hours = divmod(hours, 24)
+    if not language_on:
+        return f"{days} gün {hours} saat" if days else f"{hours} saat"
+    return f"{days} d {hours} h" if days else f"{hours} h"
+
+
+def show_elective_planner(df, language_on):
+    """
+    Show the elective planner that suggests clash-free course combinations.
+
+    Args:
+        df (pd.DataFrame): Exam schedule DataFrame
+        language_on (bool): Language toggle state
+    """
+    with st.expander(
+        "🧩 Seçmeli Ders Planlayıcı" if not language_on else "🧩 Elective Planner"
+    ):
+        courses = df["DERS KODU VE ADI"]
+        labels = get_course_labels(df)
+        required = st.multiselect(
+            "Zorunlu Dersler" if not language_on else "Required Courses",
+            courses,
+            format_func=labels.get,
+            key="planner_required",
+        )
+        optional = st.multiselect(
+            "Seçmeli Ders Havuzu" if not language_on else "Elective Pool",
+            [course for course in courses if course not in required],
+            format_func=labels.get,
+            key="planner_optional",
+        )
+
+        col1, col2 = st.columns(2)
+        count = col1.number_input(
+            "Seçmeli Ders Sayısı" if not language_on else "Number of Electives",
+            min_value=1,
+            max_value=max(min(len(optional), MAX_ELECTIVES), 1),
+            value=1,
+            key="planner_count",
+        )
+        rank = col2.radio(
+            "Sıralama" if not language_on else "Rank By",
+            [RANK_MIN_GAP, RANK_EXAMS_PER_DAY],
+            format_func=lambda rank: {
+                RANK_MIN_GAP: ("En uzun ara" if not language_on else "Longest rest"),
+                RANK_EXAMS_PER_DAY: (
+                    "Günde en az sınav" if not language_on else "Fewest exams per day"
+                ),
+            }[rank],
+            key="planner_rank",
+        )
+
+        if optional and st.button(
+            "🔎 Kombinasyonları Bul" if not language_on else "🔎 Find Combinations",
+            key="planner_find",
+        ):
+            try:
+                combinations = find_best_combinations(
+                    df, required, optional, int(count), k=5, rank=rank
+                )
+            except ValueError as e:
+                st.error(f"⚠️ {e}")
+                return
+
+            if not combinations:
+                st.warning(
+                    "😢 Sınavları çakışmayan bir kombinasyon bulunamadı."
+                    if not language_on
+                    else "😢 No combination without exam clashes was found."
+                )
+                return
+
+            st.dataframe(
+                {
+                    ("Seçmeli Dersler" if not language_on else "Electives"): [
+                        ", ".join(combination.electives) for combination in combinations
+                    ],
+                    ("En Kısa Ara" if not language_on else "Shortest Rest"): [
+                        format_gap(combination.min_gap, language_on)
+                        for combination in combinations
+                    ],
+                    (
+                        "Günde En Çok Sınav"
+                        if not language_on
+                        else "Most Exams per Day"
+                    ): [combination.max_exams_per_day for combination in combinations],
+                },
+                hide_index=True,
+            )
+
+
+def show_exam_density(df, language_on):
+    """
+    Show a heatmap of the number of exams or booked rooms per day and slot.
+
+    Args:
+        df (pd.DataFrame): Exam schedule DataFrame
+        language_on (bool): Language toggle state
+    """
+    with st.expander("📊 Sınav Yoğunluğu" if not language_on else "📊 Exam Density"):
+        departments = st.multiselect(
+            "Bölümler" if not language_on else "Departments",
+            sorted(set(get_density_table(df)["department"]) - {""}),
+            format_func=str.upper,
+            placeholder="Tüm bölümler" if not language_on else "All departments",
+            key="density_departments",
+        )
+        metric = st.radio(
+            "Gösterilen" if not language_on else "Show",
+            ["exams", "rooms"],
+            format_func=lambda metric: {
+                "exams": "Sınav sayısı" if not language_on else "Number of exams",
+                "rooms": "Derslik sayısı" if not language_on else "Rooms booked",
+            }[metric],
+            horizontal=True,
+            key="density_metric",
+        )
+
+        stats = get_exam_density(df, departments)
+        grid = stats.exams if metric == "exams" else stats.rooms
+        if grid.empty:
+            st.info("Sınav bulunamadı." if not language_on else "No exams found.")
+            return
+
+        fig = go.Figure(
+            go.Heatmap(
+                z=grid.to_numpy(),
+                x=list(grid.columns),
+                y=[f"{date:%d/%m/%Y}" for date in grid.index],
+                colorscale="YlOrRd",
+                hovertemplate="%{y} %{x}: %{z}<extra></extra>",
+            )
+        )
+        fig.update_layout(
+            xaxis_title="Saat" if not language_on else "Time",
+            yaxis_title="Gün" if not language_on else "Day",
+            yaxis_autorange="reversed",
+            height=max(300, 28 * len(grid)),
+        )
+        st.plotly_chart(fig)
+
+        busiest_day = stats.per_day[metric].idxmax()
+        busiest_slot = stats.per_slot[metric].idxmax()
+        st.caption(
+            f"En yoğun gün: {busiest_day:%d/%m/%Y} ({stats.per_day[metric].max()}), "
+            f"en yoğun saat: {busiest_slot} ({stats.per_slot[metric].max()})"
+            if not language_on
+            else f"Busiest day: {busiest_day:%d/%m/%Y} ({stats.per_day[metric].max()}), "
+            f"busiest slot: {busiest_slot} ({stats.per_slot[metric].max()})"
+        )
+
+
 def main():
     """
     Main Streamlit application for Exam Genius.
@@ -80,8 +534,9 @@ def main():
                 2. **📝 Not ve Yüzde Girin**: Her sınav için notu ve yüzdesini girin. Toplam yüzdelik değerinin 100% olduğunu kontrol edin.
                 3. **🎯 Geçme Notunu Ayarlayın**: Gereken minimum geçme notunu girin.
                 4. **🔍 Hesapla**: "Hesapla" butonuna tıklayarak girdiğiniz not ve yüzdelere göre geçip geçmediğinizi görün.
-                5. **📅 Sınav Tarihleri**: "Sınav Tarihleri" bölümünü kullanarak derslerinizin sınav tarihlerini görüntüleyin ve indirin.
-                6. **📆 Takvime Ekle**: "Takvime Ekle" butonu ile sınav tarihlerinizi takvim uygulamanıza ekleyebilirsiniz.
+                5. **❓ Gereken Notu Bulun**: Henüz girmediğiniz sınavları "?" ile işaretleyin; "Hesapla" dersi geçmek için bu sınavlardan almanız gereken notu ve olası senaryoları gösterir.
+                6. **📅 Sınav Tarihleri**: "Sınav Tarihleri" bölümünü kullanarak derslerinizin sınav tarihlerini görüntüleyin ve indirin.
+                7. **📆 Takvime Ekle**: "Takvime Ekle" butonu ile sınav tarihlerinizi takvim uygulamanıza ekleyebilirsiniz.
                 """
                 if not language_on
                 else """
@@ -89,8 +544,9 @@ def main():
                 2. **📝 Enter Grades and Weights**: For each exam, enter the grade and its weight. Ensure that the total weight adds up to 100%.
                 3. **🎯 Set Passing Grade**: Enter the minimum passing grade required.
                 4. **🔍 Calculate**: Click on "Calculate" to see if you have passed based on the grades and weights you entered.
-                5. **📅 Exam Dates**: Use the "Exam Dates" section to view and download the exam dates for your courses.
-                6. **📆 Add to Calendar**: Use the "Add to Calendar" button to add your exam dates to your calendar application.
+                5. **❓ Find Required Grades**: Mark the exams you have not taken yet with "?"; "Calculate" then shows the grade you need on them to pass and a what-if grid.
+                6. **📅 Exam Dates**: Use the "Exam Dates" section to view and download the exam dates for your courses.
+                7. **📆 Add to Calendar**: Use the "Add to Calendar" button to add your exam dates to your calendar application.
                 """
             )
             st.write(instructions)
@@ -120,6 +576,8 @@ def main():
         # Grade input sections with default weights
         grades = []
         weights = []
+        labels = []
+        unknown = []
         for i in range(num_exams):
             if i == 0:
                 label = "Vize" if not language_on else "Midterm"
@@ -131,11 +589,14 @@ def main():
                 label = f"Diğer {i - 1}" if not language_on else f"Other {i - 1}"
                 default_weight = 0
 
-            grade, weight = create_grade_section(
+            grade, weight, is_unknown = create_grade_section(
                 label, i + 1, language_on, default_weight=default_weight
             )
             grades.append(grade)
             weights.append(weight)
+            labels.append(label)
+            if is_unknown:
+                unknown.append(i)
 
         # Calculate grades
         if st.button("🔍 Hesapla" if not language_on else "🔍 Calculate"):
@@ -147,6 +608,10 @@ def main():
                     if not language_on
                     else f"⚠️ The total percentage must be 100. Current total: {total_weight}%"
                 )
+            elif unknown:
+                show_required_grades(
+                    grades, weights, labels, unknown, passing_grade, language_on
+                )
             else:
                 total = sum(
                     grade * (weight / 100) for grade, weight in zip(grades, weights)
@@ -190,48 +655,19 @@ def main():
         else "Please select the course codes of the courses for which you want to see the exam dates."
     )
 
-    course_list = st.multiselect(
-        "Dersleri Seçin" if not language_on else "Select Courses",
-        df["DERS KODU VE ADI"],
-        placeholder="Ders Kodu veya Adı" if not language_on else "Course Code or Name",
-    )
-
-    col1, col2, col3 = st.columns(3)
-
-    if len(course_list) > 0 and col1.button(
-        "Sınav Tarihlerini Göster" if not language_on else "Show Exam Dates"
-    ):
-        result_df = create_result_dataframe(
-            df, course_list, "tr" if not language_on else "en", include_classroom=True
-        )
-        st.dataframe(result_df, hide_index=True)
-        createImage(result_df)
-
-        with open("output/examgenius.png", "rb") as file:
-            col2.download_button(
-                "Resim Olarak İndir" if not language_on else "Download as Image",
-                data=file,
-                file_name="examgenius.png",
-                mime="image/png",
-            )
-
-        # Create and offer download of ICS file
-        ics_content = create_ics_file(
-            df, course_list, "tr" if not language_on else "en", exam_type="final"
-        )
-        ics_bytes = ics_content.encode()
-
-        col3.download_button(
-            "📆 Takvime Ekle" if not language_on else "📆 Add to Calendar",
-            data=io.BytesIO(ics_bytes),
-            file_name="exam_schedule.ics",
-            mime="text/calendar",
-            help=(
-                "Sınav tarihlerini takvim uygulamanıza eklemek için tıklayın"
-                if not language_on
-                else "Click to add exam dates to your calendar application"
-            ),
-        )
+    if SCHEDULE_DB:
+        install_store_loader(SCHEDULE_DB, EXAM_TERM)
+    loader = get_schedule_loader()
+    if WARM_DEPARTMENTS and loader.warm_up is None:
+        loader.warm_up = warm_departments
+    # Failed loads are only retried with the button of show_loading_status
+    loader.start(retry=False)
+    if loader.is_ready:
+        show_exam_dates(loader.df, language_on)
+        show_elective_planner(loader.df, language_on)
+        show_exam_density(loader.df, language_on)
+    else:
+        show_loading_status(loader, language_on)
 
     # Footer: Update info and feedback side by side
     footer_col1, footer_col2 = st.columns(2)
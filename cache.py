@@ -0,0 +1,154 @@
+"""
+Thread-safe LRU cache with a size bound and time-to-live.
+
+Used by utils to share formatted exam lookups between all sessions of the
+process, since many students select the same courses. VersionCache keeps the
+values derived from a whole schedule, such as its alias index or exam
+intervals, for the most recent schedule versions.
+"""
+
+import collections
+import threading
+import time
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Bounded least-recently-used cache whose entries expire after a TTL.
+
+    Values are computed outside the lock, so a slow computation never blocks
+    other lookups; two threads missing the same key may both compute it.
+    """
+
+    def __init__(self, max_size=1024, ttl=3600, clock=time.monotonic):
+        """
+        Args:
+            max_size (int): Maximum number of entries
+            ttl (float): Seconds an entry stays valid, None to never expire
+            clock (callable): Function returning the current time in seconds
+        """
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+        self._clock = clock
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key, default=None):
+        """
+        Get the value of a key without computing it.
+
+        Args:
+            key (hashable): Cache key
+            default (object): Value returned on a miss
+
+        Returns:
+            object: Cached value, default if the key is missing or expired
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires is None or now < expires:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        """
+        Store the value of a key, evicting the least recently used entries.
+
+        Args:
+            key (hashable): Cache key
+            value (object): Value to store
+        """
+        expires = None if self.ttl is None else self._clock() + self.ttl
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """
+        Get the value of a key, computing and storing it on a miss.
+
+        Exceptions raised by compute are passed on and nothing is stored.
+
+        Args:
+            key (hashable): Cache key
+            compute (callable): Function without arguments returning the value
+
+        Returns:
+            object: Cached or newly computed value
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def invalidate(self, predicate=None):
+        """
+        Remove entries from the cache.
+
+        Args:
+            predicate (callable): Function returning True for keys to remove,
+                all entries are removed if not given
+
+        Returns:
+            int: Number of removed entries
+        """
+        with self._lock:
+            keys = [key for key in self._entries if predicate is None or predicate(key)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def stats(self):
+        """
+        Get the cache counters.
+
+        Returns:
+            dict: Hits, misses, evictions, expirations and current size
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "size": len(self._entries),
+            }
+
+
+class VersionCache(LRUCache):
+    """
+    Cache of values derived from exam schedules, keyed by schedule version.
+
+    Entries never expire, since a version always derives the same values.
+    Only the most recent versions are kept, so a session still holding the
+    previous schedule while a new one is served does not evict its values.
+    """
+
+    def __init__(self, max_size=2):
+        """
+        Args:
+            max_size (int): Number of schedule versions kept
+        """
+        super().__init__(max_size=max_size, ttl=None)
@@ -0,0 +1,157 @@
+"""
+Schedule builders shared by the tests, provided as pytest fixtures.
+"""
+
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import fixtures
+from utils import (
+    CLASSROOM_CODE_COLUMN,
+    COURSE_CODE_AND_NAME_COLUMN,
+    COURSE_CODE_COLUMN,
+    COURSE_NAME_COLUMN,
+    EXAM_DATE_COLUMN,
+    EXAM_FINISH_TIME_COLUMN,
+    EXAM_TIME_COLUMN,
+)
+
+# Exams of overlapping_schedule: comp101 and math102 clash, and four exams
+# fall on Monday
+OVERLAPPING_EXAMS = [
+    ("comp101", "2025-11-17 Pazartesi", "09:00:00", "11:00:00"),
+    ("math102", "2025-11-17 Pazartesi", "10:00:00", "12:00:00"),
+    ("phys103", "2025-11-17 Pazartesi", "13:00:00", "15:00:00"),
+    ("chem104", "2025-11-18 Salı", "09:00:00", "11:00:00"),
+    ("biol105", "2025-11-20 Perşembe", "09:00:00", "11:00:00"),
+    ("hist106", "2025-11-17 Pazartesi", "16:00:00", "18:00:00"),
+]
+
+
+def build_schedule(exams):
+    """
+    Create a processed exam schedule.
+
+    Args:
+        exams (list): (code, date, start, finish) tuples, optionally followed
+            by the course name and the classroom. Without names the course is
+            labelled by its upper-case code.
+
+    Returns:
+        pd.DataFrame: Exam schedule DataFrame
+    """
+    columns = {
+        COURSE_CODE_COLUMN: [exam[0] for exam in exams],
+        EXAM_DATE_COLUMN: [exam[1] for exam in exams],
+        EXAM_TIME_COLUMN: [exam[2] for exam in exams],
+        EXAM_FINISH_TIME_COLUMN: [exam[3] for exam in exams],
+    }
+    labels = [exam[0].upper() for exam in exams]
+    if all(len(exam) > 4 for exam in exams):
+        columns[COURSE_NAME_COLUMN] = [exam[4] for exam in exams]
+        labels = [f"{label} ({exam[4]})" for label, exam in zip(labels, exams)]
+    if all(len(exam) > 5 for exam in exams):
+        columns[CLASSROOM_CODE_COLUMN] = [exam[5] for exam in exams]
+    columns[COURSE_CODE_AND_NAME_COLUMN] = labels
+    return pd.DataFrame(columns)
+
+
+def build_raw_schedule():
+    """Create a raw workbook with valid and invalid rows"""
+    return pd.DataFrame(
+        {
+            EXAM_DATE_COLUMN: [
+                "2025-11-15 Cuma",
+                "17.11.2025 Pazartesi",
+                "someday",
+                "2025-11-18 Salı",
+                "2025-11-19 Çarşamba",
+                None,
+                "2025-11-15 Cuma",
+            ],
+            EXAM_TIME_COLUMN: [
+                "09:30:00",
+                datetime.time(13, 0),
+                "10:00",
+                "noon",
+                "14:00",
+                "15:00",
+                "09:30:00",
+            ],
+            EXAM_FINISH_TIME_COLUMN: [
+                "11:30:00",
+                datetime.time(15, 0),
+                "12:00",
+                "14:00",
+                "16:00",
+                "17:00",
+                "11:30:00",
+            ],
+            COURSE_CODE_COLUMN: [
+                "COMP101;BİL101",
+                "MATH 102",
+                "PHYS103",
+                "CHEM104",
+                np.nan,
+                12345,
+                "COMP101",
+            ],
+            COURSE_NAME_COLUMN: [
+                "Computer Science;Bilgisayar Bilimi",
+                "Calculus",
+                "Physics",
+                "Chemistry",
+                "Biology",
+                "   ",
+                "Computer Science",
+            ],
+            # The second COMP101 row has no classroom
+            CLASSROOM_CODE_COLUMN: [
+                "A-101;A-102",
+                "B-201",
+                "C-301",
+                "D-401",
+                "E",
+                7,
+                np.nan,
+            ],
+        }
+    )
+
+
+def fake_render(table):
+    """Stand-in for the image renderer, run in the worker processes"""
+    return f"PNG {len(table)}".encode()
+
+
+@pytest.fixture
+def make_schedule():
+    """Factory of processed schedules, see build_schedule"""
+    return build_schedule
+
+
+@pytest.fixture
+def overlapping_schedule():
+    """Processed schedule of OVERLAPPING_EXAMS"""
+    return build_schedule(OVERLAPPING_EXAMS)
+
+
+@pytest.fixture
+def make_raw_schedule():
+    """Factory of raw workbooks with valid and invalid rows"""
+    return build_raw_schedule
+
+
+@pytest.fixture
+def make_fixture_schedule():
+    """Factory of large synthetic schedules, see fixtures.make_fixture_schedule"""
+    return fixtures.make_fixture_schedule
+
+
+@pytest.fixture(name="fake_render")
+def fake_render_fixture():
+    """Picklable stand-in for utils.render_table_image"""
+    return fake_render
@@ -0,0 +1,96 @@
+"""
+Exam density of a schedule by day and time slot.
+
+The exams of a schedule are aggregated once per schedule version into a
+small table of exam and room counts per department, day and slot. Department
+filters are applied to that table, so they never touch the schedule rows.
+"""
+
+import collections
+
+import pandas as pd
+
+from cache import VersionCache
+from departments import get_department_prefixes
+from utils import (
+    CLASSROOM_CODE_COLUMN,
+    COURSE_CODE_AND_NAME_COLUMN,
+    get_exam_intervals,
+    get_schedule_version,
+)
+
+DensityStats = collections.namedtuple(
+    "DensityStats", ["exams", "rooms", "per_day", "per_slot"]
+)
+
+# Aggregated exam counts of recently used schedules, by version
+_density_tables = VersionCache()
+
+
+def get_density_table(df):
+    """
+    Get the exam and room counts per department, day and slot of a schedule.
+
+    Computed with one vectorized groupby and cached per schedule version.
+
+    Args:
+        df (pd.DataFrame): Exam schedule DataFrame
+
+    Returns:
+        pd.DataFrame: 'department', 'date', 'slot', 'exams' and 'rooms'
+            columns; rooms counts the classrooms booked by the exams
+    """
+    return _density_tables.get_or_compute(
+        get_schedule_version(df), lambda: _build_density_table(df)
+    )
+
+
+def _build_density_table(df):
+    # The cached intervals may come from a frame of the same version with
+    # its rows in another order, so they are aligned to df by course
+    intervals = get_exam_intervals(df).reindex(df[COURSE_CODE_AND_NAME_COLUMN])
+    if CLASSROOM_CODE_COLUMN in df.columns:
+        classrooms = df[CLASSROOM_CODE_COLUMN].astype("string").str.strip()
+        rooms = (classrooms.str.count(",") + 1).where(classrooms != "", 0)
+        rooms = rooms.fillna(0).to_numpy(dtype="int64")
+    else:
+        rooms = 0
+
+    exams = pd.DataFrame(
+        {
+            "department": get_department_prefixes(df).fillna("").to_numpy(),
+            "date": intervals["start"].dt.normalize().to_numpy(),
+            "slot": intervals["start"].dt.strftime("%H:%M").to_numpy(),
+            "exams": 1,
+            "rooms": rooms,
+        }
+    ).dropna(subset=["date"])
+    return exams.groupby(["department", "date", "slot"], as_index=False).sum()
+
+
+def get_exam_density(df, departments=None):
+    """
+    Get the exam and room counts per day and slot.
+
+    Args:
+        df (pd.DataFrame): Exam schedule DataFrame
+        departments (list): Only count these department prefixes (e.g.
+            ['comp', 'eee']), all departments if empty or not given
+
+    Returns:
+        DensityStats: Day x slot tables of exam and room counts, and the
+            'exams' and 'rooms' totals per day and per slot
+    """
+    table = get_density_table(df)
+    if departments:
+        table = table[table["department"].isin(departments)]
+
+    grid = table.groupby(["date", "slot"])[["exams", "rooms"]].sum()
+    exams = grid["exams"].unstack(fill_value=0).sort_index(axis=1)
+    rooms = grid["rooms"].unstack(fill_value=0).sort_index(axis=1)
+    return DensityStats(
+        exams=exams,
+        rooms=rooms,
+        per_day=table.groupby("date")[["exams", "rooms"]].sum(),
+        per_slot=table.groupby("slot")[["exams", "rooms"]].sum(),
+    )
@@ -0,0 +1,174 @@
+"""
+Prebuilt exam schedules of whole departments.
+
+Most students look up every course of their program, e.g. all ``comp`` or
+``eee`` courses. The result table, ICS file and PNG image of each department
+are built once per schedule load and served from memory afterwards.
+"""
+
+import collections
+import concurrent.futures
+import multiprocessing
+
+from cache import VersionCache
+from utils import (
+    COURSE_CODE_AND_NAME_COLUMN,
+    COURSE_CODE_COLUMN,
+    create_ics_file,
+    create_result_dataframe,
+    get_schedule_version,
+    render_table_image,
+)
+
+DEPARTMENT_PATTERN = r"^([a-z]+)"
+
+DepartmentArtifacts = collections.namedtuple(
+    "DepartmentArtifacts", ["table", "ics", "png"]
+)
+
+# Artifacts of recently warmed schedules, by version and exam type
+_department_artifacts = VersionCache()
+
+
+def get_department_prefixes(df):
+    """
+    Get the department of every course of a schedule.
+
+    The department is the letter prefix of the normalized course code.
+
+    Args:
+        df (pd.DataFrame): Exam schedule DataFrame
+
+    Returns:
+        pd.Series: Department prefix of each row, NA if the code has none
+    """
+    return (
+        df[COURSE_CODE_COLUMN]
+        .astype("string")
+        .str.extract(DEPARTMENT_PATTERN, expand=False)
+    )
+
+
+def get_departments(df):
+    """
+    Group the courses of a schedule by department.
+
+    Args:
+        df (pd.DataFrame): Exam schedule DataFrame
+
+    Returns:
+        dict: Department prefix to its list of course codes and names,
+            sorted by department
+    """
+    prefixes = get_department_prefixes(df)
+    courses = df[COURSE_CODE_AND_NAME_COLUMN].groupby(prefixes, sort=True)
+    return {department: list(group) for department, group in courses}
+
+
+def build_department_artifacts(df, department, language="tr", exam_type="final"):
+    """
+    Build the result table and ICS file of a department without an image.
+
+    Args:
+        df (pd.DataFrame): Exam schedule DataFrame
+        department (str): Department prefix (e.g. 'comp')
+        language (str): Language of the result ('tr' or 'en')
+        exam_type (str): Type of exam ('midterm' or 'final')
+
+    Returns:
+        DepartmentArtifacts: Table and ICS content, png is None
+
+    Raises:
+        ValueError: If the department has no courses in the schedule
+    """
+    courses = get_departments(df).get(department)
+    if not courses:
+        raise ValueError(f"Department '{department}' not found in exam schedule")
+    return _build_artifacts(df, courses, language, exam_type)
+
+
+def _build_artifacts(df, courses, language, exam_type):
+    table = create_result_dataframe(df, courses, language, include_classroom=True)
+    ics = create_ics_file(df, courses, language, exam_type)
+    return DepartmentArtifacts(table, ics, None)
+
+
+def warm_departments(
+    df,
+    languages=("tr", "en"),
+    exam_type="final",
+    render_images=True,
+    max_workers=None,
+    render=render_table_image,
+):
+    """
+    Prebuild the artifacts of every department in every language.
+
+    Images are rendered in a process pool since they dominate the cost. A
+    failed render leaves the image out, it is then rendered on request.
+
+    Args:
+        df (pd.DataFrame): Exam schedule DataFrame
+        languages (tuple): Languages to build ('tr' and/or 'en')
+        exam_type (str): Type of exam ('midterm' or 'final')
+        render_images (bool): Whether to render PNG images
+        max_workers (int): Number of image render processes
+        render (callable): Picklable function rendering a table to PNG bytes
+
+    Returns:
+        dict: (department, language) to DepartmentArtifacts
+    """
+    version = get_schedule_version(df)
+    artifacts = {
+        (department, language): _build_artifacts(df, courses, language, exam_type)
+        for department, courses in get_departments(df).items()
+        for language in languages
+    }
+
+    if render_images and artifacts:
+        failures = 0
+        # Spawned workers do not inherit the locks of the app's threads
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            futures = {
+                pool.submit(render, built.table): key
+                for key, built in artifacts.items()
+            }
+            for future in concurrent.futures.as_completed(futures):
+                key = futures[future]
+                try:
+                    artifacts[key] = artifacts[key]._replace(png=future.result())
+                except Exception:
+                    failures += 1
+        if failures:
+            print(f"Rendering {failures} department images failed")
+
+    _department_artifacts.put((version, exam_type), artifacts)
+    return artifacts
+
+
+def get_department_artifacts(df, department, language="tr", exam_type="final"):
+    """
+    Get the artifacts of a department, prebuilt if available.
+
+    Args:
+        df (pd.DataFrame): Exam schedule DataFrame
+        department (str): Department prefix (e.g. 'comp')
+        language (str): Language of the result ('tr' or 'en')
+        exam_type (str): Type of exam ('midterm' or 'final')
+
+    Returns:
+        DepartmentArtifacts: Table, ICS content and PNG image, png is None
+            if the image has not been rendered
+
+    Raises:
+        ValueError: If the department has no courses in the schedule
+    """
+    version = get_schedule_version(df)
+    prebuilt = _department_artifacts.get((version, exam_type), {})
+    artifacts = prebuilt.get((department, language))
+    if artifacts is not None:
+        # Tables are shared between sessions, so each caller gets a copy
+        return artifacts._replace(table=artifacts.table.copy())
+    return build_department_artifacts(df, department, language, exam_type)
@@ -0,0 +1,365 @@
+"""
+Export pipeline for exam schedule selections.
+
+Writers take the output of create_result_dataframe and stream it into a
+binary file object in row chunks, so exports of large selections do not
+build the whole document in memory. Several formats can be bundled into a
+streamed ZIP archive. The same functions back the Streamlit download buttons
+and batch jobs writing to disk.
+"""
+
+import collections
+import csv
+import io
+import os
+import zipfile
+
+import openpyxl
+from unidecode import unidecode
+
+from utils import ICS_FOOTER, ICS_HEADER, create_ics_event, get_language_column_names
+
+# Number of rows handled at a time by the writers
+CHUNK_SIZE = 500
+
+ExportFormat = collections.namedtuple("ExportFormat", ["extension", "mime", "write"])
+
+# Registered writers by format name
+WRITERS = {}
+
+
+def register_writer(name, extension, mime):
+    """
+    Register a writer function for an export format.
+
+    The writer is called as ``write(result_df, file, language, **options)``
+    and must write bytes to ``file`` without seeking.
+
+    Args:
+        name (str): Format name (e.g. 'csv')
+        extension (str): File name extension without the dot
+        mime (str): MIME type of the output
+
+    Returns:
+        callable: Decorator registering the writer
+    """
+
+    def decorator(write):
+        WRITERS[name] = ExportFormat(extension, mime, write)
+        return write
+
+    return decorator
+
+
+def iter_row_chunks(result_df, chunk_size=CHUNK_SIZE):
+    """
+    Iterate over the rows of a result DataFrame in chunks.
+
+    Args:
+        result_df (pd.DataFrame): Result DataFrame
+        chunk_size (int): Maximum number of rows per chunk
+
+    Yields:
+        list: Rows as tuples of cell values
+    """
+    for start in range(0, len(result_df), chunk_size):
+        chunk = result_df.iloc[start : start + chunk_size]
+        yield list(chunk.itertuples(index=False, name=None))
+
+
+@register_writer("csv", "csv", "text/csv")
+def write_csv(result_df, file, language="tr", **options):
+    """Write the result as UTF-8 CSV with a BOM so Excel detects the encoding"""
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        writer = csv.writer(text)
+        writer.writerow(result_df.columns)
+        for rows in iter_row_chunks(result_df):
+            writer.writerows(rows)
+        text.flush()
+    finally:
+        # Leave the underlying file open for the caller
+        text.detach()
+
+
+@register_writer(
+    "xlsx", "xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+)
+def write_xlsx(result_df, file, language="tr", **options):
+    """Write the result as an Excel workbook using openpyxl's write-only mode"""
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet("Sınavlar" if language == "tr" else "Exams")
+    sheet.append(list(result_df.columns))
+    for rows in iter_row_chunks(result_df):
+        for row in rows:
+            sheet.append(list(row))
+    workbook.save(file)
+
+
+@register_writer("ics", "ics", "text/calendar")
+def write_ics(result_df, file, language="tr", exam_type="final", **options):
+    """Write the result as an ICS calendar with one event per exam"""
+    col_names = get_language_column_names(language)
+    course_name_col = col_names["course_name"]
+    exam_date_col = col_names["exam_date"]
+    classroom_col = col_names["classroom"]
+    has_classroom = classroom_col in result_df.columns
+
+    file.write("\n".join(ICS_HEADER).encode())
+    for start in range(0, len(result_df), CHUNK_SIZE):
+        chunk = result_df.iloc[start : start + CHUNK_SIZE]
+        classrooms = chunk[classroom_col] if has_classroom else ["N/A"] * len(chunk)
+        lines = []
+        for course_name, exam_date, classroom in zip(
+            chunk[course_name_col], chunk[exam_date_col], classrooms
+        ):
+            lines.extend(
+                create_ics_event(course_name, exam_date, classroom, language, exam_type)
+            )
+        if lines:
+            file.write(("\n" + "\n".join(lines)).encode())
+    file.write(("\n" + "\n".join(ICS_FOOTER)).encode())
+
+
+class _PDFStream:
+    """
+    Minimal PDF writer that emits objects as soon as they are complete.
+
+    Only the byte offsets of the objects are kept in memory, which are needed
+    for the cross-reference table at the end of the file.
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self.position = 0
+        self.offsets = {}
+        self.next_id = 1
+
+    def write(self, data):
+        self.file.write(data)
+        self.position += len(data)
+
+    def reserve(self):
+        object_id = self.next_id
+        self.next_id += 1
+        return object_id
+
+    def add(self, body, object_id=None):
+        object_id = object_id or self.reserve()
+        self.offsets[object_id] = self.position
+        self.write(f"{object_id} 0 obj\n".encode() + body + b"\nendobj\n")
+        return object_id
+
+    def add_stream(self, content):
+        return self.add(
+            f"<< /Length {len(content)} >>\nstream\n".encode()
+            + content
+            + b"\nendstream"
+        )
+
+    def finish(self, root_id):
+        xref_position = self.position
+        count = self.next_id
+        lines = [f"xref\n0 {count}\n", "0000000000 65535 f \n"]
+        lines.extend(f"{self.offsets[i]:010d} 00000 n \n" for i in range(1, count))
+        lines.append(
+            f"trailer\n<< /Size {count} /Root {root_id} 0 R >>\n"
+            f"startxref\n{xref_position}\n%%EOF\n"
+        )
+        self.write("".join(lines).encode())
+
+
+def _pdf_text(value):
+    """
+    Encode a cell for a PDF string in WinAnsi encoding.
+
+    Characters outside the encoding (e.g. 'ş', 'ğ', 'ı') are transliterated.
+    """
+    text = str(value).replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    try:
+        return text.encode("cp1252")
+    except UnicodeEncodeError:
+        text = "".join(
+            char if char.encode("cp1252", "ignore") else unidecode(char)
+            for char in text
+        )
+        return text.encode("cp1252", "replace")
+
+
+# A4 page layout in points
+PDF_PAGE_WIDTH = 595
+PDF_PAGE_HEIGHT = 842
+PDF_MARGIN = 40
+PDF_FONT_SIZE = 9
+PDF_LINE_HEIGHT = 14
+
+
+@register_writer("pdf", "pdf", "application/pdf")
+def write_pdf(result_df, file, language="tr", title="Exam Genius", **options):
+    """Write the result as a paginated PDF table, one page at a time"""
+    pdf = _PDFStream(file)
+    pdf.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    pages_id = pdf.reserve()
+    font_id = pdf.add(
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica "
+        b"/Encoding /WinAnsiEncoding >>"
+    )
+
+    # Course names get half of the width, other columns share the rest
+    usable_width = PDF_PAGE_WIDTH - 2 * PDF_MARGIN
+    column_count = len(result_df.columns)
+    widths = [usable_width / 2] + [usable_width / 2 / max(column_count - 1, 1)] * (
+        column_count - 1
+    )
+    # Helvetica averages about half the font size per character
+    max_chars = [int(width / (PDF_FONT_SIZE * 0.5)) - 1 for width in widths]
+
+    def text_line(cells, y):
+        parts = []
+        x = PDF_MARGIN
+        for cell, width, limit in zip(cells, widths, max_chars):
+            cell = str(cell)
+            if len(cell) > limit:
+                cell = cell[: limit - 3] + "..."
+            parts.append(b"BT /F1 %d Tf %.1f %.1f Td (" % (PDF_FONT_SIZE, x, y))
+            parts.append(_pdf_text(cell) + b") Tj ET\n")
+            x += width
+        return b"".join(parts)
+
+    rows_per_page = (
+        int((PDF_PAGE_HEIGHT - 2 * PDF_MARGIN - 2 * PDF_LINE_HEIGHT) / PDF_LINE_HEIGHT)
+        - 1
+    )
+    top = PDF_PAGE_HEIGHT - PDF_MARGIN
+
+    page_ids = []
+
+    def add_page(rows):
+        content = [
+            b"BT /F1 14 Tf %d %d Td (" % (PDF_MARGIN, top)
+            + _pdf_text(title)
+            + b") Tj ET\n"
+        ]
+        y = top - 2 * PDF_LINE_HEIGHT
+        content.append(text_line(result_df.columns, y))
+        content.append(
+            b"%d %.1f m %d %.1f l S\n"
+            % (PDF_MARGIN, y - 4, PDF_PAGE_WIDTH - PDF_MARGIN, y - 4)
+        )
+        for row in rows:
+            y -= PDF_LINE_HEIGHT
+            content.append(text_line(row, y))
+        content_id = pdf.add_stream(b"".join(content))
+        page_ids.append(
+            pdf.add(
+                f"<< /Type /Page /Parent {pages_id} 0 R "
+                f"/MediaBox [0 0 {PDF_PAGE_WIDTH} {PDF_PAGE_HEIGHT}] "
+                f"/Resources << /Font << /F1 {font_id} 0 R >> >> "
+                f"/Contents {content_id} 0 R >>".encode()
+            )
+        )
+
+    for start in range(0, max(len(result_df), 1), rows_per_page):
+        chunk = result_df.iloc[start : start + rows_per_page]
+        add_page(chunk.itertuples(index=False, name=None))
+
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    pdf.add(
+        f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode(),
+        object_id=pages_id,
+    )
+    root_id = pdf.add(f"<< /Type /Catalog /Pages {pages_id} 0 R >>".encode())
+    pdf.finish(root_id)
+
+
+def export(result_df, file, fmt, language="tr", **options):
+    """
+    Stream a result DataFrame into a file object in the given format.
+
+    Args:
+        result_df (pd.DataFrame): Output of create_result_dataframe
+        file (file object): Writable binary file object
+        fmt (str): Registered format name (e.g. 'csv', 'xlsx', 'pdf', 'ics')
+        language (str): Language of the result ('tr' or 'en')
+        **options: Format specific options (e.g. exam_type for ICS)
+
+    Raises:
+        ValueError: If the format is not registered
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown export format '{fmt}'")
+    WRITERS[fmt].write(result_df, file, language, **options)
+
+
+def export_zip(
+    result_df, file, formats, language="tr", basename="exam_schedule", **options
+):
+    """
+    Stream several export formats into a ZIP archive.
+
+    Args:
+        result_df (pd.DataFrame): Output of create_result_dataframe
+        file (file object): Writable binary file object, need not be seekable
+        formats (list): Registered format names to include
+        language (str): Language of the result ('tr' or 'en')
+        basename (str): File name of the entries without extension
+        **options: Format specific options passed to every writer
+
+    Raises:
+        ValueError: If a format is not registered
+    """
+    unknown = [fmt for fmt in formats if fmt not in WRITERS]
+    if unknown:
+        raise ValueError(f"Unknown export formats: {', '.join(unknown)}")
+
+    with zipfile.ZipFile(file, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for fmt in formats:
+            name = f"{basename}.{WRITERS[fmt].extension}"
+            with archive.open(name, "w", force_zip64=True) as entry:
+                export(result_df, entry, fmt, language, **options)
+
+
+def export_bytes(result_df, fmt, language="tr", **options):
+    """
+    Export a result DataFrame into memory, e.g. for a download button.
+
+    Args:
+        result_df (pd.DataFrame): Output of create_result_dataframe
+        fmt (str): Registered format name, or 'zip' for all formats
+        language (str): Language of the result ('tr' or 'en')
+        **options: Format specific options
+
+    Returns:
+        bytes: Exported file content
+    """
+    buffer = io.BytesIO()
+    if fmt == "zip":
+        export_zip(result_df, buffer, list(WRITERS), language, **options)
+    else:
+        export(result_df, buffer, fmt, language, **options)
+    return buffer.getvalue()
+
+
+def export_to_path(result_df, path, language="tr", **options):
+    """
+    Export a result DataFrame to a file, choosing the format from its extension.
+
+    Args:
+        result_df (pd.DataFrame): Output of create_result_dataframe
+        path (str): Output file path (e.g. 'schedule.pdf' or 'all.zip')
+        language (str): Language of the result ('tr' or 'en')
+        **options: Format specific options
+
+    Raises:
+        ValueError: If the extension does not match a registered format
+    """
+    fmt = os.path.splitext(path)[1].lstrip(".").lower()
+    if fmt != "zip" and fmt not in WRITERS:
+        raise ValueError(f"Unknown export format '{fmt}'")
+
+    with open(path, "wb") as file:
+        if fmt == "zip":
+            export_zip(result_df, file, list(WRITERS), language, **options)
+        else:
+            export(result_df, file, fmt, language, **options)
@@ -0,0 +1,370 @@
+"""
+Subscribable ICS feed for a student's exam schedule.
+
+Each feed URL carries an opaque token that encodes the selected course codes
+and language. Calendars are assembled from cached per-course event fragments
+and served with an ETag tied to the schedule version, so polling clients get
+a 304 response without any calendar being rebuilt.
+
+Run with ``python feed.py --port 8502`` and subscribe to
+``webcal://<host>:8502/feed/<token>.ics``.
+"""
+
+import argparse
+import base64
+import datetime
+import hashlib
+import json
+import socketserver
+import threading
+import uuid
+import zlib
+from wsgiref.simple_server import WSGIServer, make_server
+
+import utils
+from cache import LRUCache
+from utils import (
+    COURSE_CODE_AND_NAME_COLUMN,
+    COURSE_CODE_COLUMN,
+    ICS_FOOTER,
+    ICS_HEADER,
+    ScheduleLoader,
+    create_ics_event,
+    create_result_dataframe,
+    get_language_column_names,
+    get_schedule_version,
+    resolve_course,
+)
+
+FEED_PATH_PREFIX = "/feed/"
+FEED_MAX_AGE = 300  # Seconds calendar clients may reuse a response
+MAX_TOKEN_BYTES = 65536  # Largest decompressed token payload
+SCHEDULE_REFRESH_INTERVAL = 3600  # Seconds between reloads of the schedule
+
+# Namespace for stable event UIDs, so updated exams replace old events
+EVENT_UID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_DNS, "examgenius.halic.edu.tr")
+
+
+def encode_token(course_codes, language="tr"):
+    """
+    Encode a course selection into an opaque URL-safe token.
+
+    Args:
+        course_codes (list): Normalized course codes (e.g. 'comp101')
+        language (str): Language of the feed ('tr' or 'en')
+
+    Returns:
+        str: Feed token
+    """
+    payload = json.dumps(
+        {"c": sorted(set(course_codes)), "l": language}, separators=(",", ":")
+    )
+    token = base64.urlsafe_b64encode(zlib.compress(payload.encode(), 9))
+    return token.decode().rstrip("=")
+
+
+def decode_token(token):
+    """
+    Decode a feed token created by encode_token.
+
+    Args:
+        token (str): Feed token
+
+    Returns:
+        tuple: Course codes and language
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        data = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        # Decompress at most MAX_TOKEN_BYTES, so a small token cannot
+        # expand into a huge payload
+        decompressor = zlib.decompressobj()
+        text = decompressor.decompress(data, MAX_TOKEN_BYTES)
+        if (
+            not decompressor.eof
+            or decompressor.unconsumed_tail
+            or decompressor.unused_data
+        ):
+            raise ValueError("payload is too large or truncated")
+        payload = json.loads(text)
+        course_codes, language = payload["c"], payload["l"]
+    except (ValueError, KeyError, TypeError, zlib.error) as e:
+        raise ValueError(f"Invalid feed token: {e}")
+
+    if (
+        language not in ("tr", "en")
+        or not isinstance(course_codes, list)
+        or not all(isinstance(code, str) for code in course_codes)
+    ):
+        raise ValueError("Invalid feed token")
+    return course_codes, language
+
+
+def feed_url(base_url, df, course_list, language="tr"):
+    """
+    Build the webcal URL of a feed for selected courses.
+
+    Args:
+        base_url (str): Public http(s) URL of the feed server
+        df (pd.DataFrame): Exam schedule DataFrame
+        course_list (list): List of selected courses
+        language (str): Language of the feed ('tr' or 'en')
+
+    Returns:
+        str: webcal:// URL of the feed
+    """
+    selected = df[df[COURSE_CODE_AND_NAME_COLUMN].isin(course_list)]
+    token = encode_token(selected[COURSE_CODE_COLUMN], language)
+    url = f"{base_url.rstrip('/')}{FEED_PATH_PREFIX}{token}.ics"
+    return "webcal://" + url.split("://", 1)[-1]
+
+
+class FeedCache:
+    """
+    Bounded caches of event fragments and assembled calendars.
+
+    Both caches are keyed by schedule version, so entries of an old schedule
+    are never served and age out as new ones are added.
+    """
+
+    def __init__(self, max_fragments=20000, max_feeds=5000):
+        """
+        Args:
+            max_fragments (int): Maximum number of cached event fragments
+            max_feeds (int): Maximum number of cached calendars
+        """
+        self._fragments = LRUCache(max_size=max_fragments, ttl=None)
+        self._feeds = LRUCache(max_size=max_feeds, ttl=None)
+
+    @property
+    def fragment_builds(self):
+        """int: Number of event fragments built"""
+        return self._fragments.misses
+
+    @property
+    def feed_builds(self):
+        """int: Number of calendars assembled"""
+        return self._feeds.misses
+
+    def fragment(self, df, version, course, language, exam_type):
+        """
+        Get the ICS event lines of one course, building them if necessary.
+
+        Args:
+            df (pd.DataFrame): Exam schedule DataFrame
+            version (str): Schedule version
+            course (str): Course code and name
+            language (str): Language of the event ('tr' or 'en')
+            exam_type (str): Type of exam ('midterm' or 'final')
+
+        Returns:
+            str: ICS event lines joined with CRLF
+        """
+        return self._fragments.get_or_compute(
+            (version, course, language, exam_type),
+            lambda: self._build_fragment(df, course, language, exam_type),
+        )
+
+    @staticmethod
+    def _build_fragment(df, course, language, exam_type):
+        col_names = get_language_column_names(language)
+        row = create_result_dataframe(
+            df, [course], language, include_classroom=True
+        ).iloc[0]
+        uid = uuid.uuid5(EVENT_UID_NAMESPACE, f"{course}/{exam_type}")
+        return "\r\n".join(
+            create_ics_event(
+                row[col_names["course_name"]],
+                row[col_names["exam_date"]],
+                row[col_names["classroom"]],
+                language,
+                exam_type,
+                uid=f"{uid}@examgenius",
+                dtstamp=datetime.datetime.now(),
+            )
+        )
+
+    def feed(self, df, version, token, exam_type):
+        """
+        Get the ETag and body of a feed, assembling it if necessary.
+
+        Args:
+            df (pd.DataFrame): Exam schedule DataFrame
+            version (str): Schedule version
+            token (str): Feed token
+            exam_type (str): Type of exam ('midterm' or 'final')
+
+        Returns:
+            tuple: ETag and encoded calendar body
+
+        Raises:
+            ValueError: If the token is malformed
+        """
+        return self._feeds.get_or_compute(
+            (version, token, exam_type),
+            lambda: self._build_feed(df, version, token, exam_type),
+        )
+
+    def _build_feed(self, df, version, token, exam_type):
+        course_codes, language = decode_token(token)
+        # Cross-listed codes resolve to their exam, removed courses are left out
+        courses = [resolve_course(df, code) for code in course_codes]
+        courses = list(dict.fromkeys(course for course in courses if course))
+        fragments = [
+            self.fragment(df, version, course, language, exam_type)
+            for course in courses
+        ]
+        body = "\r\n".join(ICS_HEADER + fragments + ICS_FOOTER) + "\r\n"
+        return feed_etag(version, token, exam_type), body.encode()
+
+
+def feed_etag(version, token, exam_type):
+    """
+    Calculate the ETag of a feed for a schedule version.
+
+    Args:
+        version (str): Schedule version
+        token (str): Feed token
+        exam_type (str): Type of exam ('midterm' or 'final')
+
+    Returns:
+        str: Quoted ETag header value
+    """
+    digest = hashlib.sha1(f"{version}/{token}/{exam_type}".encode()).hexdigest()
+    return f'"{digest[:20]}"'
+
+
+def create_feed_app(get_df=None, exam_type="final", cache=None):
+    """
+    Create the WSGI application serving ICS feeds.
+
+    Args:
+        get_df (callable): Function returning the current schedule DataFrame,
+            defaults to utils.get_df
+        exam_type (str): Type of exam in the schedule ('midterm' or 'final')
+        cache (FeedCache): Cache to use, a new one is created if not given
+
+    Returns:
+        callable: WSGI application
+    """
+    get_df = get_df or utils.get_df
+    cache = cache or FeedCache()
+
+    def respond(start_response, status, headers=(), body=b""):
+        start_response(status, [("Content-Length", str(len(body)))] + list(headers))
+        return [body]
+
+    def app(environ, start_response):
+        method = environ["REQUEST_METHOD"]
+        path = environ.get("PATH_INFO", "")
+        if method not in ("GET", "HEAD"):
+            return respond(
+                start_response, "405 Method Not Allowed", [("Allow", "GET, HEAD")]
+            )
+        if not (path.startswith(FEED_PATH_PREFIX) and path.endswith(".ics")):
+            return respond(start_response, "404 Not Found")
+
+        token = path[len(FEED_PATH_PREFIX) : -len(".ics")]
+        try:
+            df = get_df()
+        except Exception:
+            return respond(
+                start_response, "503 Service Unavailable", [("Retry-After", "60")]
+            )
+
+        version = get_schedule_version(df)
+        etag = feed_etag(version, token, exam_type)
+        headers = [
+            ("ETag", etag),
+            ("Cache-Control", f"public, max-age={FEED_MAX_AGE}"),
+        ]
+
+        # Answer conditional requests before touching the calendar caches
+        if_none_match = environ.get("HTTP_IF_NONE_MATCH", "")
+        if etag in [tag.strip() for tag in if_none_match.split(",")]:
+            return respond(start_response, "304 Not Modified", headers)
+
+        try:
+            etag, body = cache.feed(df, version, token, exam_type)
+        except ValueError:
+            return respond(start_response, "404 Not Found")
+
+        headers.append(("Content-Type", "text/calendar; charset=utf-8"))
+        if method == "HEAD":
+            start_response("200 OK", [("Content-Length", str(len(body)))] + headers)
+            return [b""]
+        return respond(start_response, "200 OK", headers, body)
+
+    app.cache = cache
+    return app
+
+
+class ThreadingWSGIServer(socketserver.ThreadingMixIn, WSGIServer):
+    """WSGI server handling every request on its own thread."""
+
+    daemon_threads = True
+
+
+def keep_schedule_fresh(
+    interval=SCHEDULE_REFRESH_INTERVAL, stop=None, make_loader=ScheduleLoader
+):
+    """
+    Reload the process-wide exam schedule on an interval.
+
+    Each reload runs on a new loader, which replaces the process-wide one once
+    it is ready. The current schedule is served until then and kept if the
+    reload fails, and feeds get new ETags once the workbook has changed.
+
+    Args:
+        interval (float): Seconds between reloads
+        stop (threading.Event): Reloading stops once it is set
+        make_loader (callable): Function returning a new ScheduleLoader
+
+    Returns:
+        threading.Thread: Daemon thread running the reloads
+    """
+    stop = stop or threading.Event()
+
+    def run():
+        while not stop.wait(interval):
+            loader = make_loader()
+            loader.start()
+            loader.wait()
+            if loader.is_ready:
+                utils.set_schedule_loader(loader)
+            else:
+                print(f"Reloading the exam schedule failed: {loader.error}")
+
+    thread = threading.Thread(target=run, name="schedule-refresh", daemon=True)
+    thread.start()
+    return thread
+
+
+def main():
+    """Serve ICS feeds over HTTP"""
+    parser = argparse.ArgumentParser(description="Serve Exam Genius ICS feeds")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--exam-type", default="final", choices=["midterm", "final"])
+    parser.add_argument(
+        "--refresh",
+        type=float,
+        default=SCHEDULE_REFRESH_INTERVAL,
+        help="Seconds between reloads of the exam schedule",
+    )
+    args = parser.parse_args()
+
+    utils.get_schedule_loader().start()
+    keep_schedule_fresh(args.refresh)
+    app = create_feed_app(exam_type=args.exam_type)
+    with make_server(
+        args.host, args.port, app, server_class=ThreadingWSGIServer
+    ) as server:
+        print(f"Serving feeds on http://{args.host}:{args.port}{FEED_PATH_PREFIX}")
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+HTTP fetch layer for downloading exam schedule workbooks.
+
+Downloads are streamed to a temporary file through a pooled session, retried
+with exponential backoff and resumed with HTTP Range requests when the server
+supports them. Resumed requests carry an If-Range validator, so a workbook
+that changed between attempts is downloaded again instead of being spliced.
+"""
+
+import contextlib
+import os
+import tempfile
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Default limits for schedule downloads
+DEFAULT_TIMEOUT = 30
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+
+# Status codes worth retrying; anything else is reported immediately
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Errors that indicate a dropped or stalled transfer
+RETRY_EXCEPTIONS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+
+class DownloadTooLargeError(requests.exceptions.RequestException):
+    """Raised when a download exceeds the configured maximum size."""
+
+
+class IncompleteDownloadError(requests.exceptions.ChunkedEncodingError):
+    """Raised when the server closes the connection before the full body."""
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Get the process-wide pooled HTTP session, creating it if necessary.
+
+    Returns:
+        requests.Session: Shared session with a connection pool
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+    return _session
+
+
+def _expected_total(response, offset):
+    """
+    Determine the full size of the resource from the response headers.
+
+    Args:
+        response (requests.Response): Response for the current attempt
+        offset (int): Number of bytes already received before this attempt
+
+    Returns:
+        int or None: Total size in bytes, or None if the server did not say
+    """
+    content_range = response.headers.get("Content-Range", "")
+    if response.status_code == 206 and "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        if total.isdigit():
+            return int(total)
+
+    content_length = response.headers.get("Content-Length")
+    if content_length is not None and content_length.isdigit():
+        return offset + int(content_length)
+    return None
+
+
+def _validator(response):
+    """
+    Get the validator identifying the version of a downloaded resource.
+
+    Args:
+        response (requests.Response): Response with the full body
+
+    Returns:
+        str or None: Strong ETag or Last-Modified date usable in If-Range,
+            None if the server sent neither
+    """
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("Last-Modified")
+
+
+def download_to_file(
+    url,
+    file,
+    session=None,
+    timeout=DEFAULT_TIMEOUT,
+    retries=DEFAULT_RETRIES,
+    backoff=DEFAULT_BACKOFF,
+    max_bytes=DEFAULT_MAX_BYTES,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    verify=True,
+    on_progress=None,
+):
+    """
+    Stream a URL into a binary file, retrying and resuming on failures.
+
+    Args:
+        url (str): URL to download
+        file (file object): Writable, seekable binary file
+        session (requests.Session): Session to use, defaults to the shared one
+        timeout (float): Connect and read timeout per attempt in seconds
+        retries (int): Maximum number of retries after the first attempt
+        backoff (float): Base delay in seconds, doubled after every retry
+        max_bytes (int): Maximum accepted size of the body in bytes
+        chunk_size (int): Size of the chunks read from the socket
+        verify (bool): Whether to verify the server's TLS certificate
+        on_progress (callable): Called with (received, total) after each chunk
+
+    Returns:
+        int: Number of bytes written
+
+    Raises:
+        DownloadTooLargeError: If the body exceeds max_bytes
+        requests.exceptions.RequestException: If all attempts fail
+    """
+    session = session or get_session()
+    received = 0
+    attempt = 0
+    validator = None
+
+    while True:
+        # Received bytes are only counted right if the body is not decoded
+        headers = {"Accept-Encoding": "identity"}
+        if received and validator is not None:
+            headers["Range"] = f"bytes={received}-"
+            headers["If-Range"] = validator
+        else:
+            # Without a validator a resumed body could belong to another
+            # version of the file
+            received = 0
+        try:
+            with session.get(
+                url, headers=headers, stream=True, timeout=timeout, verify=verify
+            ) as response:
+                if received and response.status_code == 416:
+                    # Everything was already received before the drop
+                    return received
+
+                response.raise_for_status()
+
+                if response.status_code != 206:
+                    # Server ignored the Range header or the file changed,
+                    # start over
+                    received = 0
+                    validator = _validator(response)
+                file.seek(received)
+                file.truncate()
+
+                total = _expected_total(response, received)
+                if total is not None and total > max_bytes:
+                    raise DownloadTooLargeError(
+                        f"{url} is {total} bytes, limit is {max_bytes} bytes"
+                    )
+
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    received += len(chunk)
+                    if received > max_bytes:
+                        raise DownloadTooLargeError(
+                            f"{url} exceeded the limit of {max_bytes} bytes"
+                        )
+                    file.write(chunk)
+                    if on_progress is not None:
+                        on_progress(received, total)
+
+                if total is not None and received < total:
+                    raise IncompleteDownloadError(
+                        f"Received {received} of {total} bytes from {url}"
+                    )
+                file.flush()
+                return received
+        except requests.exceptions.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            if status not in RETRY_STATUS_CODES or attempt >= retries:
+                raise
+        except RETRY_EXCEPTIONS:
+            if attempt >= retries:
+                raise
+
+        time.sleep(backoff * (2**attempt))
+        attempt += 1
+
+
+@contextlib.contextmanager
+def fetch_to_tempfile(url, suffix=None, **kwargs):
+    """
+    Download a URL to a temporary file that is removed on exit.
+
+    Args:
+        url (str): URL to download
+        suffix (str): Suffix of the temporary file name (e.g. '.xlsx')
+        **kwargs: Options passed to download_to_file
+
+    Yields:
+        str: Path of the downloaded file
+    """
+    fd, path = tempfile.mkstemp(suffix=suffix, prefix="examgenius-")
+    try:
+        with os.fdopen(fd, "w+b") as file:
+            download_to_file(url, file, **kwargs)
+        yield path
+    finally:
+        with contextlib.suppress(OSError):
+            os.remove(path)
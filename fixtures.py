@@ -0,0 +1,74 @@
+"""
+Synthetic exam schedules resembling the university's data.
+
+Used by the load-testing harness and the tests, so both run offline against
+schedules of any size.
+"""
+
+import random
+
+import pandas as pd
+
+from utils import (
+    CLASSROOM_CODE_COLUMN,
+    COURSE_CODE_AND_NAME_COLUMN,
+    COURSE_CODE_COLUMN,
+    COURSE_NAME_COLUMN,
+    EXAM_DATE_COLUMN,
+    EXAM_FINISH_TIME_COLUMN,
+    EXAM_TIME_COLUMN,
+)
+
+# Turkish weekday names as they appear in the university's workbook
+TR_WEEKDAYS = [
+    "Pazartesi",
+    "Salı",
+    "Çarşamba",
+    "Perşembe",
+    "Cuma",
+    "Cumartesi",
+    "Pazar",
+]
+DEPARTMENTS = ["comp", "eee", "math", "phys", "turk", "econ", "arch", "psy"]
+EXAM_SLOTS = [
+    ("09:00:00", "10:30:00"),
+    ("11:00:00", "12:30:00"),
+    ("13:30:00", "15:00:00"),
+    ("15:30:00", "17:00:00"),
+]
+
+
+def make_fixture_schedule(courses=300, seed=0):
+    """
+    Generate a processed exam schedule resembling the university's data.
+
+    Args:
+        courses (int): Number of courses
+        seed (int): Random seed
+
+    Returns:
+        pd.DataFrame: Exam schedule DataFrame as returned by process_exam_data
+    """
+    rng = random.Random(seed)
+    first_day = pd.Timestamp("2026-01-05")
+    rows = []
+    for i in range(courses):
+        department = DEPARTMENTS[i % len(DEPARTMENTS)]
+        code = f"{department}{100 + i // len(DEPARTMENTS)}"
+        day = first_day + pd.Timedelta(days=rng.randrange(12))
+        start, finish = rng.choice(EXAM_SLOTS)
+        name = f"{department.upper()} Course {i}"
+        rows.append(
+            {
+                COURSE_CODE_COLUMN: code,
+                EXAM_DATE_COLUMN: f"{day:%Y-%m-%d} {TR_WEEKDAYS[day.weekday()]}",
+                EXAM_TIME_COLUMN: start,
+                COURSE_NAME_COLUMN: name,
+                EXAM_FINISH_TIME_COLUMN: finish,
+                CLASSROOM_CODE_COLUMN: ", ".join(
+                    f"B-{rng.randrange(100, 400)}" for _ in range(rng.randint(1, 3))
+                ),
+                COURSE_CODE_AND_NAME_COLUMN: f"{code.upper()} ({name})",
+            }
+        )
+    return pd.DataFrame(rows)
@@ -0,0 +1,98 @@
+"""
+Weighted grade calculations for the sidebar grade calculator.
+
+Solves for the scores needed on exams that have not been taken yet and builds
+what-if grids of the final grade with NumPy broadcasting.
+"""
+
+import numpy as np
+import pandas as pd
+
+MAX_GRADE = 100.0
+
+
+def _split_known(grades, weights, unknown):
+    """
+    Separate the weighted contribution of known grades from unknown weights.
+
+    Args:
+        grades (list): Grade of every exam, ignored for unknown exams
+        weights (list): Weight percentage of every exam
+        unknown (list): Indices of the exams without a grade yet
+
+    Returns:
+        tuple: Known contribution to the total and weights of unknown exams
+    """
+    grades = np.asarray(grades, dtype=float)
+    weights = np.asarray(weights, dtype=float) / 100
+    mask = np.zeros(len(weights), dtype=bool)
+    mask[list(unknown)] = True
+
+    known_total = float(np.dot(grades[~mask], weights[~mask]))
+    return known_total, weights[mask]
+
+
+def required_grade(grades, weights, passing_grade, unknown):
+    """
+    Calculate the minimum score needed on every unknown exam to pass.
+
+    The same score is assumed for all unknown exams.
+
+    Args:
+        grades (list): Grade of every exam, ignored for unknown exams
+        weights (list): Weight percentage of every exam
+        passing_grade (float): Minimum total grade needed to pass
+        unknown (list): Indices of the exams without a grade yet
+
+    Returns:
+        float: Required score, 0 if the course is already passed and above
+            100 if passing is no longer possible
+
+    Raises:
+        ValueError: If no exam is unknown or the unknown exams have no weight
+    """
+    if len(unknown) == 0:
+        raise ValueError("At least one exam must be unknown")
+
+    known_total, unknown_weights = _split_known(grades, weights, unknown)
+    remaining_weight = unknown_weights.sum()
+    if remaining_weight == 0:
+        raise ValueError("Unknown exams must have a weight above 0")
+
+    return max((passing_grade - known_total) / remaining_weight, 0.0)
+
+
+def scenario_grid(grades, weights, unknown, step=0.1):
+    """
+    Calculate the total grade for every combination of unknown exam scores.
+
+    Args:
+        grades (list): Grade of every exam, ignored for unknown exams
+        weights (list): Weight percentage of every exam
+        unknown (list): Indices of one or two exams without a grade yet
+        step (float): Distance between the scores on each axis
+
+    Returns:
+        pd.DataFrame: For one unknown exam, a single 'total' column indexed by
+            its score. For two, totals indexed by the first exam's score with
+            one column per score of the second exam.
+
+    Raises:
+        ValueError: If the number of unknown exams is not one or two
+    """
+    if len(unknown) not in (1, 2):
+        raise ValueError("Scenario grids support one or two unknown exams")
+
+    known_total, unknown_weights = _split_known(grades, weights, unknown)
+    scores = np.linspace(0, MAX_GRADE, int(round(MAX_GRADE / step)) + 1)
+
+    if len(unknown) == 1:
+        totals = known_total + scores * unknown_weights[0]
+        return pd.DataFrame({"total": totals}, index=pd.Index(scores, name="score"))
+
+    totals = (
+        known_total
+        + scores[:, np.newaxis] * unknown_weights[0]
+        + scores[np.newaxis, :] * unknown_weights[1]
+    )
+    return pd.DataFrame(totals, index=scores, columns=scores)
@@ -0,0 +1,284 @@
+"""
+Load-testing harness for the Streamlit app.
+
+Simulates concurrent user sessions with Streamlit's headless AppTest driver
+against a generated fixture schedule, so it runs offline. Every session loads
+the page, toggles the language, selects courses, clicks "Show Exam Dates" and
+downloads the ICS file. The report contains rerun latency percentiles,
+throughput and memory per session.
+
+Sessions run on their own threads in one process, like sessions served by
+one Streamlit worker. AppTest is not safe to run concurrently, so reruns are
+executed one at a time; a session's rerun latency includes the time it waits
+for the worker, as it would on a busy server.
+
+Usage:
+    python loadtest.py --sessions 20 --iterations 3
+"""
+
+import argparse
+import contextlib
+import os
+import random
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1 import app_test as app_test_module
+
+import utils
+from fixtures import make_fixture_schedule
+from utils import COURSE_CODE_AND_NAME_COLUMN, ScheduleLoader
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+
+@contextlib.contextmanager
+def _shared_media_storage():
+    """
+    Make every AppTest run store media files in one storage.
+
+    AppTest creates a mock runtime with its own media storage per run and
+    installs it globally, so concurrent sessions would otherwise race for it.
+    A real server also has a single media file manager for all sessions.
+    """
+    storage = app_test_module.MemoryMediaFileStorage("/mock/media")
+    original = app_test_module.MemoryMediaFileStorage
+    app_test_module.MemoryMediaFileStorage = lambda media_endpoint: storage
+    try:
+        yield storage
+    finally:
+        app_test_module.MemoryMediaFileStorage = original
+
+
+@contextlib.contextmanager
+def _without_images():
+    """Skip the PNG render, e.g. where no Kaleido image backend is available."""
+    original = utils.render_table_image
+    utils.render_table_image = lambda df: b""
+    try:
+        yield
+    finally:
+        utils.render_table_image = original
+
+
+# Reruns are executed one at a time, see the module docstring
+_worker_lock = threading.Lock()
+
+
+class SessionStats:
+    """Measurements collected by one simulated session."""
+
+    def __init__(self):
+        self.latencies = []
+        self.downloads = 0
+        self.errors = []
+
+
+def _timed_run(at, stats, timeout):
+    started = time.perf_counter()
+    with _worker_lock:
+        at.run(timeout=timeout)
+    stats.latencies.append(time.perf_counter() - started)
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+
+def _find_button(elements, labels):
+    for element in elements:
+        if element.label in labels:
+            return element
+    raise LookupError(f"No element labelled {labels}")
+
+
+def simulate_session(
+    course_options, storage, iterations=1, courses_per_session=5, seed=0, timeout=30
+):
+    """
+    Drive one user session through the main flow of the app.
+
+    Args:
+        course_options (list): Courses that can be selected
+        storage (MemoryMediaFileStorage): Storage holding downloadable files
+        iterations (int): Number of times the flow is repeated
+        courses_per_session (int): Number of courses selected each time
+        seed (int): Random seed for the course selection
+        timeout (float): Maximum time of a single rerun in seconds
+
+    Returns:
+        SessionStats: Latencies, downloads and errors of the session
+    """
+    rng = random.Random(seed)
+    stats = SessionStats()
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+
+    try:
+        _timed_run(at, stats, timeout)
+        for _ in range(iterations):
+            toggle = at.toggle(key="language_toggle")
+            toggle.set_value(not toggle.value)
+            _timed_run(at, stats, timeout)
+
+            at.multiselect[0].set_value(rng.sample(course_options, courses_per_session))
+            _timed_run(at, stats, timeout)
+
+            _find_button(
+                at.button, ("Sınav Tarihlerini Göster", "Show Exam Dates")
+            ).click()
+            _timed_run(at, stats, timeout)
+
+            download = _find_button(
+                at.get("download_button"), ("📆 Takvime Ekle", "📆 Add to Calendar")
+            )
+            with _worker_lock:
+                file_name = download.proto.url.rsplit("/", 1)[1]
+                content = storage.get_file(file_name).content
+            if not content.startswith(b"BEGIN:VCALENDAR"):
+                raise RuntimeError("Downloaded file is not a calendar")
+            stats.downloads += 1
+    except Exception as e:
+        stats.errors.append(f"{type(e).__name__}: {e}")
+    return stats
+
+
+def run_load_test(
+    sessions=10,
+    iterations=1,
+    courses=300,
+    courses_per_session=5,
+    images=True,
+    timeout=30,
+):
+    """
+    Run concurrent simulated sessions and summarize their performance.
+
+    Args:
+        sessions (int): Number of concurrent sessions
+        iterations (int): Number of times each session repeats the flow
+        courses (int): Number of courses in the fixture schedule
+        courses_per_session (int): Number of courses each session selects
+        images (bool): Whether to render the PNG export with Kaleido
+        timeout (float): Maximum time of a single rerun in seconds
+
+    Returns:
+        dict: Latency percentiles in seconds, throughput in reruns per
+            second, peak Python memory per session in bytes, traced with
+            tracemalloc, and error details
+    """
+    schedule = make_fixture_schedule(courses)
+    loader = ScheduleLoader(lambda progress: schedule)
+    previous_loader = utils.get_schedule_loader()
+    utils.set_schedule_loader(loader)
+    loader.start()
+    loader.wait()
+
+    course_options = list(schedule[COURSE_CODE_AND_NAME_COLUMN])
+    results = [None] * sessions
+
+    with contextlib.ExitStack() as stack:
+        storage = stack.enter_context(_shared_media_storage())
+        if not images:
+            stack.enter_context(_without_images())
+        stack.callback(utils.set_schedule_loader, previous_loader)
+
+        def worker(index):
+            results[index] = simulate_session(
+                course_options,
+                storage,
+                iterations,
+                courses_per_session,
+                seed=index,
+                timeout=timeout,
+            )
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(sessions)]
+        # Python allocations of the sessions, the peak is reached while they
+        # all hold their state
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+            stack.callback(tracemalloc.stop)
+        tracemalloc.reset_peak()
+        memory_before = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        memory_peak = tracemalloc.get_traced_memory()[1]
+
+    latencies = np.array([latency for stats in results for latency in stats.latencies])
+    p50, p95, p99 = (
+        np.percentile(latencies, [50, 95, 99]) if len(latencies) else (0, 0, 0)
+    )
+    errors = [error for stats in results for error in stats.errors]
+
+    return {
+        "sessions": sessions,
+        "reruns": len(latencies),
+        "downloads": sum(stats.downloads for stats in results),
+        "errors": errors,
+        "elapsed": elapsed,
+        "p50": float(p50),
+        "p95": float(p95),
+        "p99": float(p99),
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "memory_per_session": (memory_peak - memory_before) / sessions,
+    }
+
+
+def format_report(report):
+    """
+    Format a load test report for the terminal.
+
+    Args:
+        report (dict): Result of run_load_test
+
+    Returns:
+        str: Human readable report
+    """
+    lines = [
+        f"Sessions:            {report['sessions']}",
+        f"Reruns:              {report['reruns']} in {report['elapsed']:.2f}s",
+        f"Throughput:          {report['throughput']:.1f} reruns/s",
+        f"Rerun latency p50:   {report['p50'] * 1000:.0f} ms",
+        f"Rerun latency p95:   {report['p95'] * 1000:.0f} ms",
+        f"Rerun latency p99:   {report['p99'] * 1000:.0f} ms",
+        f"Memory per session:  {report['memory_per_session'] / 1024 / 1024:.1f} MiB",
+        f"ICS downloads:       {report['downloads']}",
+        f"Failed sessions:     {len(report['errors'])}",
+    ]
+    lines.extend(f"  {error}" for error in report["errors"])
+    return "\n".join(lines)
+
+
+def main():
+    """Run the load test from the command line"""
+    parser = argparse.ArgumentParser(description="Load test the Exam Genius app")
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=1)
+    parser.add_argument("--courses", type=int, default=300)
+    parser.add_argument("--courses-per-session", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument(
+        "--no-images", action="store_true", help="Skip the Kaleido PNG render"
+    )
+    args = parser.parse_args()
+
+    report = run_load_test(
+        sessions=args.sessions,
+        iterations=args.iterations,
+        courses=args.courses,
+        courses_per_session=args.courses_per_session,
+        images=not args.no_images,
+        timeout=args.timeout,
+    )
+    print(format_report(report))
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    exit(main())
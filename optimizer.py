@@ -0,0 +1,259 @@
+"""
+Timetable optimizer for choosing elective courses.
+
+Finds the combinations of optional courses that can be taken together with a
+required set without any exam clashes, ranked by the shortest rest between
+two exams or by the largest number of exams on one day.
+"""
+
+import bisect
+import collections
+import heapq
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from utils import get_exam_intervals
+
+# Most electives the app lets a student choose at once
+MAX_ELECTIVES = 10
+
+RANK_MIN_GAP = "min_gap"
+RANK_EXAMS_PER_DAY = "exams_per_day"
+
+Combination = collections.namedtuple(
+    "Combination", ["electives", "min_gap", "max_exams_per_day"]
+)
+
+
+def _conflict_masks(starts, ends):
+    """
+    Build a bitset of clashing exams for every exam.
+
+    Args:
+        starts (np.ndarray): Exam start times in minutes
+        ends (np.ndarray): Exam end times in minutes
+
+    Returns:
+        list: Integer bitsets, bit j of entry i is set if exams i and j overlap
+    """
+    overlap = (starts[:, np.newaxis] < ends[np.newaxis, :]) & (
+        starts[np.newaxis, :] < ends[:, np.newaxis]
+    )
+    np.fill_diagonal(overlap, False)
+    return [sum(1 << int(j) for j in np.flatnonzero(row)) for row in overlap]
+
+
+def _popcount(bits):
+    return bin(bits).count("1")
+
+
+def find_best_combinations(df, required, optional, count, k=5, rank=RANK_MIN_GAP):
+    """
+    Find the best clash-free combinations of elective courses.
+
+    Candidates are explored in exam order with bitsets of clashing exams.
+    Branches are pruned when too few compatible candidates remain, or when
+    their score can no longer beat the k-th best combination found so far,
+    since adding exams never increases the minimum gap or decreases the
+    busiest day. Once k combinations are known, a branch is also pruned when
+    its remaining candidates cannot supply the missing electives with a
+    longer rest or a lighter busiest day than the k-th best: the most exams
+    that keep a rest is an interval scheduling problem solved greedily in end
+    order, and each day only takes exams up to the busiest day to beat.
+
+    Args:
+        df (pd.DataFrame): Exam schedule DataFrame
+        required (list): Courses that must be taken
+        optional (list): Pool of elective courses to choose from
+        count (int): Number of electives to choose
+        k (int): Maximum number of combinations to return
+        rank (str): RANK_MIN_GAP to maximize the shortest rest between exams,
+            or RANK_EXAMS_PER_DAY to minimize the most exams on one day
+
+    Returns:
+        list: Combination tuples, best first. ``min_gap`` is a pd.Timedelta, or
+            None when there are fewer than two exams.
+
+    Raises:
+        ValueError: If a course is unknown, the required courses clash with
+            each other or the rank is not supported
+    """
+    if rank not in (RANK_MIN_GAP, RANK_EXAMS_PER_DAY):
+        raise ValueError(f"Unknown rank '{rank}'")
+
+    required = list(dict.fromkeys(required))
+    optional = [course for course in dict.fromkeys(optional) if course not in required]
+    intervals = get_exam_intervals(df)
+    unknown = [
+        course for course in required + optional if course not in intervals.index
+    ]
+    if unknown:
+        raise ValueError(f"Courses not found in exam schedule: {', '.join(unknown)}")
+
+    courses = required + optional
+    selected = intervals.loc[courses]
+    starts = (selected["start"].to_numpy().astype("datetime64[m]")).astype(np.int64)
+    ends = (selected["end"].to_numpy().astype("datetime64[m]")).astype(np.int64)
+    days = (selected["start"].to_numpy().astype("datetime64[D]")).astype(np.int64)
+    masks = _conflict_masks(starts, ends)
+
+    required_ids = range(len(required))
+    required_bits = sum(1 << i for i in required_ids)
+    for i in required_ids:
+        if masks[i] & required_bits:
+            clashes = [courses[j] for j in required_ids if masks[i] >> j & 1]
+            raise ValueError(f"{courses[i]} clashes with {', '.join(clashes)}")
+
+    blocked = 0
+    for i in required_ids:
+        blocked |= masks[i]
+
+    # Candidates compatible with the required courses, in exam order
+    candidates = sorted(
+        (i for i in range(len(required), len(courses)) if not blocked >> i & 1),
+        key=lambda i: starts[i],
+    )
+    if count > len(candidates) or count < 0:
+        return []
+    starts = starts.tolist()
+    ends = ends.tolist()
+    days = days.tolist()
+    by_end = sorted(candidates, key=lambda i: (ends[i], starts[i]))
+    # Bitset of the candidates at or after each position in the search order
+    remaining = [0] * (len(candidates) + 1)
+    for position in range(len(candidates) - 1, -1, -1):
+        remaining[position] = remaining[position + 1] | 1 << candidates[position]
+
+    timeline = sorted((starts[i], ends[i]) for i in required_ids)
+    exams_per_day = collections.Counter(days[i] for i in required_ids)
+    min_gap = min(
+        (b[0] - a[1] for a, b in zip(timeline, timeline[1:])), default=float("inf")
+    )
+
+    def score(gap, busiest):
+        if rank == RANK_MIN_GAP:
+            return (gap, -busiest)
+        return (-busiest, gap)
+
+    best = []  # Min-heap of (score, order, electives) holding the top k
+    order = itertools.count()
+
+    def can_keep_rest(available, needed, rest):
+        # Greedy in end order picks the most exams that are at least `rest`
+        # apart from each other and from the exams already in the timeline
+        last_end = None
+        for i in by_end:
+            if not available >> i & 1:
+                continue
+            if last_end is not None and starts[i] < last_end + rest:
+                continue
+            index = bisect.bisect(timeline, (starts[i], ends[i]))
+            if index > 0 and starts[i] < timeline[index - 1][1] + rest:
+                continue
+            if index < len(timeline) and timeline[index][0] < ends[i] + rest:
+                continue
+            last_end = ends[i]
+            needed -= 1
+            if needed == 0:
+                return True
+        return False
+
+    def can_keep_load(available, needed, busiest):
+        # Each day can only take exams up to the busiest day to beat
+        free = collections.Counter()
+        for i in by_end:
+            if available >> i & 1 and exams_per_day[days[i]] + free[days[i]] < busiest:
+                free[days[i]] += 1
+                needed -= 1
+                if needed == 0:
+                    return True
+        return False
+
+    def can_beat(available, needed, worst):
+        # Times are whole minutes, so a longer rest is at least a minute longer
+        if rank == RANK_MIN_GAP:
+            rest, busiest = worst[0], -worst[1]
+            if rest == float("inf"):
+                return True
+            return can_keep_rest(available, needed, rest + 1) or (
+                busiest > 1
+                and can_keep_rest(available, needed, rest)
+                and can_keep_load(available, needed, busiest - 1)
+            )
+        busiest, rest = -worst[0], worst[1]
+        return can_keep_load(available, needed, busiest - 1) or (
+            rest != float("inf")
+            and can_keep_load(available, needed, busiest)
+            and can_keep_rest(available, needed, rest + 1)
+        )
+
+    def search(position, chosen, blocked, gap, busiest):
+        current = score(gap, busiest)
+        if len(best) == k and current <= best[0][0]:
+            return
+        needed = count - len(chosen)
+        if len(best) == k and needed > 0:
+            if not can_beat(remaining[position] & ~blocked, needed, best[0][0]):
+                return
+        if len(chosen) == count:
+            entry = (current, -next(order), list(chosen))
+            if len(best) < k:
+                heapq.heappush(best, entry)
+            else:
+                heapq.heapreplace(best, entry)
+            return
+        if _popcount(remaining[position] & ~blocked) < count - len(chosen):
+            return
+
+        for next_position in range(position, len(candidates)):
+            i = candidates[next_position]
+            if blocked >> i & 1:
+                continue
+            if _popcount(remaining[next_position] & ~blocked) < count - len(chosen):
+                break
+
+            # Rest before and after the new exam in the timeline
+            exam = (starts[i], ends[i])
+            index = bisect.bisect(timeline, exam)
+            new_gap = gap
+            if index > 0:
+                new_gap = min(new_gap, exam[0] - timeline[index - 1][1])
+            if index < len(timeline):
+                new_gap = min(new_gap, timeline[index][0] - exam[1])
+
+            timeline.insert(index, exam)
+            exams_per_day[days[i]] += 1
+            chosen.append(i)
+            search(
+                next_position + 1,
+                chosen,
+                blocked | masks[i],
+                new_gap,
+                max(busiest, exams_per_day[days[i]]),
+            )
+            chosen.pop()
+            exams_per_day[days[i]] -= 1
+            del timeline[index]
+
+    search(
+        0, [], blocked | required_bits, min_gap, max(exams_per_day.values(), default=0)
+    )
+
+    results = []
+    for (first, second), _, chosen in sorted(best, reverse=True):
+        if rank == RANK_MIN_GAP:
+            gap, busiest = first, -second
+        else:
+            gap, busiest = second, -first
+        results.append(
+            Combination(
+                electives=[courses[i] for i in sorted(chosen)],
+                min_gap=(
+                    None if gap == float("inf") else pd.Timedelta(minutes=int(gap))
+                ),
+                max_exams_per_day=busiest,
+            )
+        )
+    return results
@@ -0,0 +1,433 @@
+"""
+SQLite storage of processed exam schedules.
+
+Every processed schedule is kept as one row set per version, labelled with
+its term, so the app can start from the last stored schedule without
+downloading the workbook and older terms stay available for history queries.
+All queries are parameterized, so sqlite3 keeps them prepared in its
+statement cache.
+"""
+
+import datetime
+import sqlite3
+import threading
+
+import pandas as pd
+
+import utils
+from utils import (
+    CLASSROOM_CODE_COLUMN,
+    COURSE_ALIASES_COLUMN,
+    COURSE_CODE_AND_NAME_COLUMN,
+    COURSE_CODE_COLUMN,
+    COURSE_NAME_ALIASES_COLUMN,
+    COURSE_NAME_COLUMN,
+    EXAM_DATE_COLUMN,
+    EXAM_FINISH_TIME_COLUMN,
+    EXAM_SCHEDULE_URL,
+    EXAM_TIME_COLUMN,
+    ScheduleLoader,
+    get_schedule_version,
+    process_exam_data,
+    set_schedule_version,
+)
+
+# Table columns and the schedule columns stored in them
+EXAM_COLUMNS = {
+    "course_code": COURSE_CODE_COLUMN,
+    "course_name": COURSE_NAME_COLUMN,
+    "course_code_and_name": COURSE_CODE_AND_NAME_COLUMN,
+    "exam_date": EXAM_DATE_COLUMN,
+    "exam_time": EXAM_TIME_COLUMN,
+    "finish_time": EXAM_FINISH_TIME_COLUMN,
+    "classroom": CLASSROOM_CODE_COLUMN,
+    "aliases": COURSE_ALIASES_COLUMN,
+    "name_aliases": COURSE_NAME_ALIASES_COLUMN,
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS schedules (
+    version TEXT PRIMARY KEY,
+    term TEXT NOT NULL,
+    source TEXT,
+    saved_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS exams (
+    version TEXT NOT NULL REFERENCES schedules (version) ON DELETE CASCADE,
+    course_code TEXT NOT NULL,
+    course_name TEXT,
+    course_code_and_name TEXT NOT NULL,
+    exam_date TEXT,
+    exam_time TEXT,
+    finish_time TEXT,
+    classroom TEXT,
+    aliases TEXT,
+    name_aliases TEXT,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (version, course_code_and_name)
+);
+CREATE TABLE IF NOT EXISTS exam_rooms (
+    version TEXT NOT NULL,
+    course_code_and_name TEXT NOT NULL,
+    room TEXT NOT NULL,
+    PRIMARY KEY (version, room, course_code_and_name),
+    FOREIGN KEY (version, course_code_and_name)
+        REFERENCES exams (version, course_code_and_name) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_schedules_term ON schedules (term, saved_at);
+CREATE INDEX IF NOT EXISTS idx_exams_course_code ON exams (course_code);
+CREATE INDEX IF NOT EXISTS idx_exams_exam_date ON exams (version, exam_date);
+CREATE INDEX IF NOT EXISTS idx_exam_rooms_exam
+    ON exam_rooms (version, course_code_and_name);
+"""
+
+UPSERT_EXAM = f"""
+INSERT INTO exams (version, position, {", ".join(EXAM_COLUMNS)})
+VALUES (?, ?, {", ".join("?" for _ in EXAM_COLUMNS)})
+ON CONFLICT (version, course_code_and_name) DO UPDATE SET
+position = excluded.position,
+{", ".join(f"{column} = excluded.{column}" for column in EXAM_COLUMNS)}
+"""
+
+SELECT_EXAMS = f"SELECT {', '.join(EXAM_COLUMNS)} FROM exams"
+
+INSERT_ROOM = (
+    "INSERT OR IGNORE INTO exam_rooms (version, course_code_and_name, room)"
+    " VALUES (?, ?, ?)"
+)
+
+
+def _to_text(value):
+    # Excel times arrive as datetime.time, which is stored as 'HH:MM:SS'
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    return str(value)
+
+
+class ScheduleStore:
+    """
+    Exam schedules persisted in a SQLite database.
+
+    One connection is shared by all threads and serialized with a lock.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Database file, ':memory:' for a temporary database
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self._connection.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def _query(self, sql, parameters=()):
+        with self._lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+    def _frame(self, rows):
+        df = pd.DataFrame(rows, columns=list(EXAM_COLUMNS.values()))
+        # Schedules without finish times or classrooms are stored as NULL
+        return df.dropna(axis=1, how="all") if len(df) else df
+
+    def save_schedule(self, df, term, source=None):
+        """
+        Insert or update the rows of a processed schedule in one transaction.
+
+        Saving a schedule again updates its rows in place and makes it the
+        latest schedule of the term.
+
+        Args:
+            df (pd.DataFrame): Processed exam schedule DataFrame
+            term (str): Term label (e.g. '2025-2026-guz-final')
+            source (str): Optional URL or path the schedule was read from
+
+        Returns:
+            str: Version of the saved schedule
+        """
+        version = get_schedule_version(df)
+        # Missing columns are stored as NULL
+        columns = {
+            table_column: (
+                [_to_text(value) for value in df[column]]
+                if column in df.columns
+                else [None] * len(df)
+            )
+            for table_column, column in EXAM_COLUMNS.items()
+        }
+        # Rows keep their position, so loaded schedules are in the saved order
+        rows = [
+            (version, position) + row
+            for position, row in enumerate(zip(*columns.values()))
+        ]
+        # One row per room of every exam, classrooms are joined with ','
+        rooms = [
+            (version, course, room.strip())
+            for course, classroom in zip(
+                columns["course_code_and_name"], columns["classroom"]
+            )
+            if isinstance(classroom, str)
+            for room in classroom.split(",")
+            if room.strip()
+        ]
+        saved_at = datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO schedules (version, term, source, saved_at)"
+                " VALUES (?, ?, ?, ?) ON CONFLICT (version) DO UPDATE SET"
+                " term = excluded.term, source = excluded.source,"
+                " saved_at = excluded.saved_at",
+                (version, term, source, saved_at),
+            )
+            self._connection.executemany(UPSERT_EXAM, rows)
+            self._connection.execute(
+                "DELETE FROM exam_rooms WHERE version = ?", (version,)
+            )
+            self._connection.executemany(INSERT_ROOM, rooms)
+        return version
+
+    def latest_version(self, term=None):
+        """
+        Get the most recently saved schedule version.
+
+        Args:
+            term (str): Only consider schedules of this term
+
+        Returns:
+            str: Schedule version, None if nothing is stored
+        """
+        if term is None:
+            rows = self._query(
+                "SELECT version FROM schedules ORDER BY saved_at DESC LIMIT 1"
+            )
+        else:
+            rows = self._query(
+                "SELECT version FROM schedules WHERE term = ?"
+                " ORDER BY saved_at DESC LIMIT 1",
+                (term,),
+            )
+        return rows[0][0] if rows else None
+
+    def load_schedule(self, term=None, version=None):
+        """
+        Load a stored schedule.
+
+        Args:
+            term (str): Load the latest schedule of this term
+            version (str): Load this schedule version, overrides term
+
+        Returns:
+            pd.DataFrame: Exam schedule DataFrame in the saved row order, with
+                the version it was saved under, None if no matching schedule
+                is stored
+        """
+        version = version or self.latest_version(term)
+        if version is None:
+            return None
+        rows = self._query(
+            f"{SELECT_EXAMS} WHERE version = ? ORDER BY position",
+            (version,),
+        )
+        if not rows:
+            return None
+        df = self._frame(rows)
+        # Text columns hash differently from the saved schedule, so the
+        # stored version is kept and version-keyed caches stay valid
+        set_schedule_version(df, version)
+        return df
+
+    def find_courses(self, version, course_list):
+        """
+        Load the rows of selected courses of a stored schedule.
+
+        The result can be passed to the lookup functions in utils instead of
+        the whole schedule.
+
+        Args:
+            version (str): Schedule version
+            course_list (list): List of selected courses
+
+        Returns:
+            pd.DataFrame: Exam schedule rows of the selected courses
+        """
+        placeholders = ", ".join("?" for _ in course_list)
+        rows = self._query(
+            f"{SELECT_EXAMS} WHERE version = ?"
+            f" AND course_code_and_name IN ({placeholders})",
+            (version, *course_list),
+        )
+        return self._frame(rows)
+
+    def course_history(self, course_code):
+        """
+        Get the exams of a course across all stored terms.
+
+        Args:
+            course_code (str): Normalized course code (e.g. 'comp101')
+
+        Returns:
+            pd.DataFrame: Exam rows with 'term' and 'version' columns, oldest first
+        """
+        with self._lock:
+            cursor = self._connection.execute(
+                "SELECT schedules.term, schedules.version, exams.exam_date,"
+                " exams.exam_time, exams.finish_time, exams.classroom"
+                " FROM exams JOIN schedules USING (version)"
+                " WHERE exams.course_code = ? ORDER BY schedules.saved_at",
+                (course_code,),
+            )
+            rows = cursor.fetchall()
+        return pd.DataFrame(
+            rows,
+            columns=[
+                "term",
+                "version",
+                EXAM_DATE_COLUMN,
+                EXAM_TIME_COLUMN,
+                EXAM_FINISH_TIME_COLUMN,
+                CLASSROOM_CODE_COLUMN,
+            ],
+        )
+
+    def exams_on(self, version, exam_date):
+        """
+        Get the exams of a stored schedule on one day.
+
+        Args:
+            version (str): Schedule version
+            exam_date (str): Exam date as in the schedule (e.g. '2025-11-15 Cuma')
+
+        Returns:
+            pd.DataFrame: Exam schedule rows on that day
+        """
+        rows = self._query(
+            f"{SELECT_EXAMS} WHERE version = ? AND exam_date = ?",
+            (version, exam_date),
+        )
+        return self._frame(rows)
+
+    def exams_in_room(self, version, room):
+        """
+        Get the exams of a stored schedule held in one room.
+
+        Args:
+            version (str): Schedule version
+            room (str): Classroom code (e.g. 'A-101')
+
+        Returns:
+            pd.DataFrame: Exam schedule rows in that room, by exam date
+        """
+        columns = ", ".join(f"exams.{column}" for column in EXAM_COLUMNS)
+        rows = self._query(
+            f"SELECT {columns} FROM exam_rooms JOIN exams"
+            " USING (version, course_code_and_name)"
+            " WHERE exam_rooms.version = ? AND exam_rooms.room = ?"
+            " ORDER BY exams.exam_date, exams.exam_time",
+            (version, room),
+        )
+        return self._frame(rows)
+
+    def terms(self):
+        """
+        List the stored schedules.
+
+        Returns:
+            pd.DataFrame: 'term', 'version', 'source' and 'saved_at' columns,
+                newest first
+        """
+        rows = self._query(
+            "SELECT term, version, source, saved_at FROM schedules"
+            " ORDER BY saved_at DESC"
+        )
+        return pd.DataFrame(rows, columns=["term", "version", "source", "saved_at"])
+
+
+class StoredScheduleLoader(ScheduleLoader):
+    """
+    Schedule loader that starts from the stored schedule of a term.
+
+    The stored schedule is served at once, then the workbook is downloaded
+    in the background, saved to the store and served instead. Without a
+    stored schedule it behaves like ScheduleLoader.
+    """
+
+    def __init__(self, store, term, load_func=process_exam_data, warm_up=None):
+        """
+        Args:
+            store (ScheduleStore): Store of processed schedules
+            term (str): Term of the schedule
+            load_func (callable): Function returning the schedule DataFrame,
+                called with a ``progress`` callback keyword argument
+            warm_up (callable): Optional function called with every schedule
+                that is served
+        """
+        super().__init__(self._load_and_save, warm_up)
+        self.store = store
+        self.term = term
+        self._fetch = load_func
+        self.refresh_error = None
+
+    def _load_and_save(self, progress):
+        df = self._fetch(progress=progress)
+        self.store.save_schedule(df, self.term, source=EXAM_SCHEDULE_URL)
+        return df
+
+    def _run(self):
+        try:
+            stored = self.store.load_schedule(self.term)
+        except sqlite3.Error as e:
+            print(f"Reading the stored exam schedule failed: {e}")
+            stored = None
+        if stored is None:
+            super()._run()
+            return
+
+        self.df = stored
+        self.progress = 1.0
+        self.status = self.READY
+        self._done.set()
+
+        # Replace the stored schedule with the current workbook
+        try:
+            self.df = self._load_func(progress=lambda fraction: None)
+        except Exception as e:
+            self.refresh_error = e
+            print(f"Refreshing the exam schedule failed, serving stored copy: {e}")
+        if self.warm_up is not None:
+            try:
+                self.warm_up(self.df)
+            except Exception as e:
+                print(f"Warming up the exam schedule failed: {e}")
+
+
+_install_lock = threading.Lock()
+
+
+def install_store_loader(path, term):
+    """
+    Make the process-wide schedule loader start from a schedule store.
+
+    Does nothing if the loader already uses the store or has started loading.
+
+    Args:
+        path (str): SQLite database file
+        term (str): Term of the schedule
+
+    Returns:
+        ScheduleLoader: The process-wide loader
+    """
+    with _install_lock:
+        loader = utils.get_schedule_loader()
+        if isinstance(loader, StoredScheduleLoader) and loader.store.path == path:
+            return loader
+        if loader.status != loader.IDLE:
+            return loader
+        loader = StoredScheduleLoader(ScheduleStore(path), term, warm_up=loader.warm_up)
+        utils.set_schedule_loader(loader)
+        return loader
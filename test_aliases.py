@@ -0,0 +1,139 @@
+"""
+Tests for cross-listed course aliases in utils.py
+"""
+
+import time
+
+import pandas as pd
+
+from feed import FeedCache, encode_token
+from store import ScheduleStore
+from utils import (
+    CLASSROOM_CODE_COLUMN,
+    COURSE_ALIASES_COLUMN,
+    COURSE_CODE_AND_NAME_COLUMN,
+    COURSE_CODE_COLUMN,
+    COURSE_NAME_ALIASES_COLUMN,
+    COURSE_NAME_COLUMN,
+    EXAM_DATE_COLUMN,
+    EXAM_FINISH_TIME_COLUMN,
+    EXAM_TIME_COLUMN,
+    get_alias_index,
+    get_course_labels,
+    get_schedule_version,
+    normalize_alias,
+    prepare_exam_data,
+    resolve_course,
+)
+
+
+def make_cross_listed_schedule():
+    """Create a raw workbook with cross-listed courses"""
+    return pd.DataFrame(
+        {
+            EXAM_DATE_COLUMN: ["2025-11-15 Cuma"] * 3 + ["2025-11-17 Pazartesi"],
+            EXAM_TIME_COLUMN: ["09:30:00"] * 3 + ["13:00:00"],
+            EXAM_FINISH_TIME_COLUMN: ["11:30:00"] * 3 + ["15:00:00"],
+            COURSE_CODE_COLUMN: [
+                "COMP101;BİL101",
+                "COMP101;SE101",
+                "COMP101",
+                "MATH 102",
+            ],
+            COURSE_NAME_COLUMN: [
+                "Computer Science;Bilgisayar Bilimi",
+                "Computer Science;Yazılım Mühendisliğine Giriş",
+                "Computer Science",
+                "Calculus",
+            ],
+            CLASSROOM_CODE_COLUMN: ["A-101", "A-102", "A-103", "B-201"],
+        }
+    )
+
+
+def test_aliases_are_kept():
+    """Test that every cross-listed code and name survives the groupby"""
+    df = prepare_exam_data(make_cross_listed_schedule())
+
+    comp = df[df[COURSE_CODE_COLUMN] == "comp101"].iloc[0]
+    assert len(df) == 2
+    assert comp[COURSE_ALIASES_COLUMN] == "comp101;bil101;se101"
+    assert comp[COURSE_NAME_ALIASES_COLUMN] == (
+        "Computer Science;Bilgisayar Bilimi;Yazılım Mühendisliğine Giriş"
+    )
+    assert comp[COURSE_CODE_AND_NAME_COLUMN] == "COMP101 (Computer Science)"
+    assert comp[CLASSROOM_CODE_COLUMN] == "A-101, A-102, A-103"
+
+
+def test_resolve_course():
+    """Test that any code or name resolves to the canonical exam"""
+    df = prepare_exam_data(make_cross_listed_schedule())
+    comp = "COMP101 (Computer Science)"
+
+    for alias in ["comp101", "BİL101", "bil 101", "SE-101", "bilgisayar bilimi"]:
+        assert resolve_course(df, alias) == comp, alias
+    assert resolve_course(df, comp) == comp
+    assert resolve_course(df, "Math102") == "MATH 102 (Calculus)"
+    assert resolve_course(df, "phys103") is None
+    assert normalize_alias("Yazılım Mühendisliği") == "yazilimmuhendisligi"
+
+
+def test_course_labels_list_aliases():
+    """Test that picker labels show the cross-listed codes and names"""
+    df = prepare_exam_data(make_cross_listed_schedule())
+    labels = get_course_labels(df)
+
+    assert labels["COMP101 (Computer Science)"] == (
+        "COMP101 (Computer Science) / BIL101, SE101"
+        " / Bilgisayar Bilimi, Yazılım Mühendisliğine Giriş"
+    )
+    assert labels["MATH 102 (Calculus)"] == "MATH 102 (Calculus)"
+
+
+def test_schedules_without_alias_columns(make_fixture_schedule):
+    """Test that schedules without alias columns resolve their own codes"""
+    df = make_fixture_schedule(10)
+    course = df[COURSE_CODE_AND_NAME_COLUMN].iloc[0]
+    assert resolve_course(df, df[COURSE_CODE_COLUMN].iloc[0]) == course
+    assert get_course_labels(df)[course] == course
+
+
+def test_feed_resolves_aliases():
+    """Test that feed tokens may name a course by a cross-listed code"""
+    df = prepare_exam_data(make_cross_listed_schedule())
+    version = get_schedule_version(df)
+    etag, body = FeedCache().feed(
+        df, version, encode_token(["bil101", "comp101"], "en"), "final"
+    )
+    assert body.count(b"BEGIN:VEVENT") == 1
+
+
+def test_store_keeps_aliases(tmp_path):
+    """Test that stored schedules keep their aliases"""
+    store = ScheduleStore(str(tmp_path / "schedules.db"))
+    store.save_schedule(prepare_exam_data(make_cross_listed_schedule()), "2025-fall")
+    loaded = store.load_schedule("2025-fall")
+    store.close()
+    assert resolve_course(loaded, "se101") == "COMP101 (Computer Science)"
+
+
+def test_alias_index_is_fast():
+    """Test that a large schedule is indexed quickly and lookups are cheap"""
+    raw = make_cross_listed_schedule()
+    raw = pd.concat([raw] * 2500, ignore_index=True)
+    raw[COURSE_CODE_COLUMN] = [
+        f"C{i};X{i};Y{i}" if i % 2 else f"C{i}" for i in range(len(raw))
+    ]
+    df = prepare_exam_data(raw)
+
+    started = time.perf_counter()
+    index = get_alias_index(df)
+    elapsed = time.perf_counter() - started
+    assert len(index) > 25000
+    assert elapsed < 2, f"Indexing 10k exams took {elapsed:.2f}s"
+
+    started = time.perf_counter()
+    for i in range(1, 10000, 2):
+        assert resolve_course(df, f"y{i}").startswith(f"C{i} ")
+    elapsed = time.perf_counter() - started
+    assert elapsed < 1, f"5k alias lookups took {elapsed:.2f}s"
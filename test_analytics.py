@@ -0,0 +1,155 @@
+"""
+Tests for the exam clash analytics in analytics.py
+"""
+
+import io
+import itertools
+import random
+import time
+
+import pandas as pd
+import pytest
+
+from analytics import (
+    STUDENT_COLUMN,
+    analyze_clashes,
+    get_schedule_matrices,
+    read_enrollments,
+)
+from utils import (
+    COURSE_CODE_AND_NAME_COLUMN,
+    get_exam_intervals,
+    get_schedule_version,
+    set_schedule_version,
+)
+
+ENROLLMENTS = """student,course
+s1,COMP101;MATH102
+s2,comp101
+s2,MATH 102
+s2,PHYS103
+s2,HIST106
+s3,CHEM104;BIOL105
+s4,COMP101;GONE999
+s4,COMP101
+"""
+
+
+def test_read_enrollments():
+    """Test that both long and ';'-separated rows are accepted"""
+    enrollments = read_enrollments(io.StringIO(ENROLLMENTS))
+    assert len(enrollments) == 11
+    assert list(enrollments.columns) == ["student", "course"]
+
+    with pytest.raises(ValueError, match="course"):
+        read_enrollments(io.StringIO("student,lesson\ns1,COMP101\n"))
+
+
+def test_clash_matrix(overlapping_schedule):
+    """Test that only overlapping exams clash"""
+    df = overlapping_schedule
+    clashes, days, dates = get_schedule_matrices(df)
+    courses = list(df[COURSE_CODE_AND_NAME_COLUMN])
+
+    pairs = {
+        tuple(sorted((courses[i], courses[j]))) for i, j in zip(*clashes.nonzero())
+    }
+    assert pairs == {("COMP101", "MATH102")}
+    assert days.sum() == len(df)
+    assert len(dates) == 3
+
+
+def test_analyze_clashes(overlapping_schedule):
+    """Test clash counts, busy days and unknown courses"""
+    df = overlapping_schedule
+    report = analyze_clashes(df, read_enrollments(io.StringIO(ENROLLMENTS)))
+
+    assert report.pairs.to_dict("records") == [
+        {"course_a": "COMP101", "course_b": "MATH102", "students": 2}
+    ]
+    assert report.students_with_clashes == 2
+    assert report.busy_days[STUDENT_COLUMN].tolist() == ["s2"]
+    assert report.busy_days["exams"].tolist() == [4]
+    assert report.unknown_courses == ["GONE999"]
+
+
+def test_matches_direct_count(make_fixture_schedule):
+    """Test the matrix counts against counting every student's pairs"""
+    df = make_fixture_schedule(60, seed=4)
+    courses = list(df[COURSE_CODE_AND_NAME_COLUMN])
+    rng = random.Random(1)
+    enrollments = pd.DataFrame(
+        [
+            {"student": f"s{student}", "course": course}
+            for student in range(300)
+            for course in rng.sample(courses, 6)
+        ]
+    )
+    report = analyze_clashes(df, enrollments)
+
+    intervals = get_exam_intervals(df)
+    expected = {}
+    clashing_students = set()
+    for student, group in enrollments.groupby("student"):
+        for a, b in itertools.combinations(sorted(group["course"]), 2):
+            if (
+                intervals.loc[a, "start"] < intervals.loc[b, "end"]
+                and intervals.loc[b, "start"] < intervals.loc[a, "end"]
+            ):
+                expected[(a, b)] = expected.get((a, b), 0) + 1
+                clashing_students.add(student)
+
+    actual = {
+        tuple(sorted((row.course_a, row.course_b))): row.students
+        for row in report.pairs.itertuples()
+    }
+    assert actual == expected
+    assert report.students_with_clashes == len(clashing_students)
+
+
+def test_rows_in_another_order(make_fixture_schedule):
+    """Test a schedule of the same version whose rows are in another order"""
+    df = make_fixture_schedule(60, seed=4)
+    courses = list(df[COURSE_CODE_AND_NAME_COLUMN])
+    rng = random.Random(2)
+    enrollments = pd.DataFrame(
+        [
+            {"student": f"s{student}", "course": course}
+            for student in range(100)
+            for course in rng.sample(courses, 6)
+        ]
+    )
+    expected = analyze_clashes(df, enrollments)
+    shuffled = df.sample(frac=1, random_state=0).reset_index(drop=True)
+    set_schedule_version(shuffled, get_schedule_version(df))
+
+    def pairs(report):
+        return {
+            (*sorted((row.course_a, row.course_b)), row.students)
+            for row in report.pairs.itertuples()
+        }
+
+    report = analyze_clashes(shuffled, enrollments)
+    assert pairs(report) == pairs(expected)
+    assert report.students_with_clashes == expected.students_with_clashes
+    assert report.busy_days.equals(expected.busy_days)
+
+
+def test_large_roster_is_fast(make_fixture_schedule):
+    """Test that 50k students are analysed within seconds"""
+    df = make_fixture_schedule(1000)
+    courses = df[COURSE_CODE_AND_NAME_COLUMN].to_numpy()
+    rng = random.Random(0)
+    enrollments = pd.DataFrame(
+        {
+            "student": [f"s{i}" for i in range(50000) for _ in range(6)],
+            "course": [courses[rng.randrange(len(courses))] for _ in range(300000)],
+        }
+    )
+
+    started = time.perf_counter()
+    report = analyze_clashes(df, enrollments)
+    elapsed = time.perf_counter() - started
+
+    assert report.students_with_clashes > 0
+    assert elapsed < 5, f"Analysing 50k students took {elapsed:.2f}s"
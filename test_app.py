@@ -0,0 +1,222 @@
+"""
+Tests for the Streamlit app using Streamlit's headless AppTest driver.
+The schedule loader is replaced so no network access is needed.
+"""
+
+import os
+import threading
+import time
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import export
+import utils
+from departments import warm_departments
+from utils import COURSE_CODE_COLUMN, ScheduleLoader
+
+# Time budget for the first render while the schedule is still loading
+TIME_TO_FIRST_PAINT_TARGET = 2.0
+
+
+# Exams of the schedule the app is tested with
+EXAMS = [
+    ("comp101", "2025-11-15 Cuma", "09:30:00", "11:30:00", "Computer Science", "A-101"),
+    ("math102", "2025-11-17 Pazartesi", "13:00:00", "15:00:00", "Calculus", "B-201"),
+]
+
+
+@pytest.fixture
+def slow_loader(monkeypatch, make_schedule):
+    """Install a loader that blocks until the test releases it"""
+    release = threading.Event()
+
+    def load(progress):
+        progress(0.3)
+        release.wait(10)
+        return make_schedule(EXAMS)
+
+    loader = ScheduleLoader(load)
+    monkeypatch.setattr(utils, "_schedule_loader", loader)
+    yield loader, release
+    release.set()
+
+
+def test_first_paint_does_not_wait_for_schedule(slow_loader):
+    """Test that the page renders while the schedule is still loading"""
+    loader, release = slow_loader
+    at = AppTest.from_file("app.py")
+
+    started = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - started
+
+    assert not at.exception, f"App raised {at.exception}"
+    assert (
+        elapsed < TIME_TO_FIRST_PAINT_TARGET
+    ), f"First paint took {elapsed:.2f}s, target is {TIME_TO_FIRST_PAINT_TARGET}s"
+    assert loader.status == ScheduleLoader.LOADING
+    assert len(at.sidebar.number_input) >= 3, "Grade calculator should render"
+    assert len(at.get("progress")) == 1, "Loading progress should be shown"
+    assert len(at.multiselect) == 0, "Course picker should wait for the data"
+
+    # The grade calculator works before the schedule is available
+    at.sidebar.number_input(key="grade_1").set_value(60.0)
+    at.sidebar.number_input(key="grade_2").set_value(70.0)
+    at.sidebar.button[-1].click().run()
+    assert "66" in at.sidebar.success[0].value
+
+
+def test_course_picker_appears_when_ready(slow_loader):
+    """Test that the course picker is shown once the schedule has loaded"""
+    loader, release = slow_loader
+    at = AppTest.from_file("app.py").run()
+    assert len(at.multiselect) == 0
+
+    release.set()
+    assert loader.wait(5)
+    at.run()
+
+    assert not at.exception, f"App raised {at.exception}"
+    assert len(at.get("progress")) == 0
+    assert at.multiselect[0].options == [
+        "COMP101 (Computer Science)",
+        "MATH102 (Calculus)",
+    ]
+
+
+def test_load_error_is_reported(monkeypatch):
+    """Test that a failed load shows an error instead of crashing"""
+
+    calls = []
+
+    def load(progress):
+        calls.append(progress)
+        raise Exception("network down")
+
+    loader = ScheduleLoader(load)
+    monkeypatch.setattr(utils, "_schedule_loader", loader)
+    loader.start()
+    loader.wait(5)
+
+    at = AppTest.from_file("app.py").run()
+    assert not at.exception, f"App raised {at.exception}"
+    assert len(at.error) == 1
+    assert len(at.multiselect) == 0
+
+    # Reruns keep showing the error, only the retry button loads again
+    at.run()
+    assert len(calls) == 1 and loader.status == loader.ERROR
+    assert len(at.error) == 1
+
+
+def test_get_df_waits_for_loader(monkeypatch, make_schedule):
+    """Test that get_df blocks until the background load finishes"""
+    loader = ScheduleLoader(lambda progress: make_schedule(EXAMS))
+    monkeypatch.setattr(utils, "_schedule_loader", loader)
+
+    df = utils.get_df()
+    assert loader.is_ready
+    assert list(df[COURSE_CODE_COLUMN]) == ["comp101", "math102"]
+    assert utils.df is df, "utils.df should expose the loaded schedule"
+
+
+def test_required_grade_in_calculator(slow_loader):
+    """Test that unknown exams show the required grade and a what-if table"""
+    at = AppTest.from_file("app.py").run()
+    at.sidebar.number_input(key="grade_1").set_value(40.0)
+    at.sidebar.checkbox(key="unknown_2").check()
+    at.sidebar.button[-1].click().run()
+
+    assert not at.exception, f"App raised {at.exception}"
+    assert "56.7" in at.sidebar.info[0].value
+    assert len(at.sidebar.dataframe) == 1
+
+
+def test_elective_planner(slow_loader):
+    """Test that the planner lists clash-free elective combinations"""
+    loader, release = slow_loader
+    release.set()
+    loader.start()
+    assert loader.wait(5)
+
+    at = AppTest.from_file("app.py").run()
+    at.multiselect(key="planner_required").select("COMP101 (Computer Science)")
+    at.run()
+    at.multiselect(key="planner_optional").select("MATH102 (Calculus)")
+    at.run()
+    at.button(key="planner_find").click().run()
+
+    assert not at.exception, f"App raised {at.exception}"
+    table = at.dataframe[-1].value
+    assert list(table.iloc[:, 0]) == ["MATH102 (Calculus)"]
+    assert list(table.iloc[:, 1]) == ["2 gün 1 saat"]
+
+
+def test_whole_department_uses_prebuilt_artifacts(
+    slow_loader, monkeypatch, fake_render
+):
+    """Test that selecting a department serves its prebuilt image"""
+    loader, release = slow_loader
+    release.set()
+    loader.start()
+    assert loader.wait(5)
+    warm_departments(loader.df, languages=("tr",), max_workers=1, render=fake_render)
+
+    def no_render(df):
+        raise AssertionError("Prebuilt image should be served")
+
+    def no_export(*args, **kwargs):
+        raise AssertionError("Exports should only be built when clicked")
+
+    monkeypatch.setattr(utils, "render_table_image", no_render)
+    monkeypatch.setattr(export, "export_bytes", no_export)
+    at = AppTest.from_file("app.py").run()
+    at.selectbox(key="department").select("comp")
+    at.run()
+    at.main.button[0].click().run()
+
+    assert not at.exception, f"App raised {at.exception}"
+    assert list(at.dataframe[0].value.iloc[:, 0]) == ["Computer Science"]
+
+
+def test_image_is_rendered_in_memory(slow_loader, monkeypatch, tmp_path, fake_render):
+    """Test that the image download does not go through a shared file"""
+    loader, release = slow_loader
+    release.set()
+    loader.start()
+    assert loader.wait(5)
+    rendered = []
+
+    def render(table):
+        rendered.append(list(table.iloc[:, 0]))
+        return fake_render(table)
+
+    monkeypatch.setattr(utils, "render_table_image", render)
+    at = AppTest.from_file(os.path.abspath("app.py"))
+    # Without an output directory a file based export would fail
+    monkeypatch.chdir(tmp_path)
+    at.run()
+    at.multiselect[0].set_value(["MATH102 (Calculus)"]).run()
+    at.main.button[0].click().run()
+
+    assert not at.exception, f"App raised {at.exception}"
+    assert rendered == [["Calculus"]]
+
+
+def test_exam_density_heatmap(slow_loader):
+    """Test that the density heatmap follows the department filter"""
+    loader, release = slow_loader
+    release.set()
+    loader.start()
+    assert loader.wait(5)
+
+    at = AppTest.from_file("app.py").run()
+    assert len(at.get("plotly_chart")) == 1
+    assert at.multiselect(key="density_departments").options == ["COMP", "MATH"]
+    at.multiselect(key="density_departments").select("math")
+    at.radio(key="density_metric").set_value("rooms").run()
+
+    assert not at.exception, f"App raised {at.exception}"
+    summary = [caption.value for caption in at.caption if "yoğun" in caption.value]
+    assert summary == ["En yoğun gün: 17/11/2025 (1), en yoğun saat: 13:00 (1)"]
@@ -0,0 +1,151 @@
+"""
+Tests for the LRU cache in cache.py and the cached lookups in utils.py
+"""
+
+import threading
+
+import pandas as pd
+
+from cache import LRUCache, VersionCache
+from utils import (
+    COURSE_CODE_AND_NAME_COLUMN,
+    EXAM_TIME_COLUMN,
+    create_ics_file,
+    create_result_dataframe,
+    get_exam_date,
+    get_schedule_version,
+    prepare_exam_data,
+    result_cache,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_hits_misses_and_evictions():
+    """Test that the least recently used entry is evicted first"""
+    cache = LRUCache(max_size=2, ttl=None)
+    assert cache.get_or_compute("a", lambda: 1) == 1
+    assert cache.get_or_compute("b", lambda: 2) == 2
+    assert cache.get_or_compute("a", lambda: 0) == 1, "Entry should be cached"
+    cache.get_or_compute("c", lambda: 3)
+
+    assert cache.get_or_compute("b", lambda: 20) == 20, "b should be evicted"
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 4,
+        "evictions": 2,
+        "expirations": 0,
+        "size": 2,
+    }
+
+
+def test_entries_expire():
+    """Test that entries are recomputed after their TTL"""
+    clock = FakeClock()
+    cache = LRUCache(ttl=10, clock=clock)
+    cache.get_or_compute("a", lambda: 1)
+    clock.now = 9
+    assert cache.get_or_compute("a", lambda: 2) == 1
+    clock.now = 10
+    assert cache.get_or_compute("a", lambda: 2) == 2
+    assert cache.expirations == 1
+
+
+def test_errors_are_not_cached():
+    """Test that a failing computation stores nothing"""
+    cache = LRUCache()
+
+    def fail():
+        raise ValueError("not found")
+
+    try:
+        cache.get_or_compute("a", fail)
+    except ValueError:
+        pass
+    assert len(cache) == 0
+    assert cache.get_or_compute("a", lambda: 1) == 1
+
+
+def test_invalidate():
+    """Test removing entries by predicate"""
+    cache = LRUCache()
+    for key in [("x", 1), ("x", 2), ("y", 1)]:
+        cache.get_or_compute(key, lambda: key)
+    assert cache.invalidate(lambda key: key[1] == 1) == 2
+    assert len(cache) == 1
+    assert cache.invalidate() == 1
+
+
+def test_version_cache():
+    """Test that values of the most recent schedule versions are kept"""
+    cache = VersionCache(max_size=2)
+    cache.put("v1", "intervals 1")
+    assert cache.get_or_compute("v2", lambda: "intervals 2") == "intervals 2"
+    assert cache.get("v1") == "intervals 1"
+    cache.put("v3", "intervals 3")
+
+    assert cache.get("v2") is None, "v2 is the least recently used version"
+    assert cache.get("v2", {}) == {}
+    assert cache.get("v1") == "intervals 1" and len(cache) == 2
+
+
+def test_concurrent_access():
+    """Test that counters stay consistent under concurrent use"""
+    cache = LRUCache(max_size=50)
+
+    def worker():
+        for i in range(2000):
+            cache.get_or_compute(i % 100, lambda: i)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = cache.stats()
+    assert stats["hits"] + stats["misses"] == 16000
+    assert stats["size"] == 50
+
+
+def test_result_dataframe_is_cached(make_raw_schedule):
+    """Test that repeated selections are served from the shared cache"""
+    df = prepare_exam_data(make_raw_schedule())
+    courses = list(df[COURSE_CODE_AND_NAME_COLUMN])
+    before = result_cache.stats()
+
+    first = create_result_dataframe(df, courses, "en", include_classroom=True)
+    second = create_result_dataframe(
+        df, list(reversed(courses)), "en", include_classroom=True
+    )
+    create_ics_file(df, courses, "en")
+
+    after = result_cache.stats()
+    assert after["hits"] - before["hits"] == 2
+    pd.testing.assert_frame_equal(first, second)
+
+    # Modifying a returned table does not change what other callers get
+    first.iloc[0, 0] = "changed"
+    third = create_result_dataframe(df, courses, "en", include_classroom=True)
+    pd.testing.assert_frame_equal(third, second)
+
+
+def test_cache_invalidated_by_new_schedule(make_raw_schedule):
+    """Test that preparing a new schedule drops lookups of the old one"""
+    df = prepare_exam_data(make_raw_schedule())
+    course = "COMP101 (Computer Science)"
+    assert "09:30" in get_exam_date(df, course, "tr")
+    old_version = get_schedule_version(df)
+
+    raw = make_raw_schedule()
+    raw.loc[0, EXAM_TIME_COLUMN] = "10:30:00"
+    new_df = prepare_exam_data(raw)
+
+    assert result_cache.invalidate(lambda key: key[1] == old_version) == 0
+    assert "10:30" in get_exam_date(new_df, course, "tr")
@@ -0,0 +1,82 @@
+"""
+Tests for the exam density aggregation in density.py
+"""
+
+import pandas as pd
+
+import density
+from density import get_density_table, get_exam_density
+from utils import (
+    CLASSROOM_CODE_COLUMN,
+    get_schedule_version,
+    set_schedule_version,
+)
+
+
+def test_exam_density(overlapping_schedule):
+    """Test exam and room counts per day and slot"""
+    df = overlapping_schedule
+    df[CLASSROOM_CODE_COLUMN] = ["A-101, A-102", "B-201", "", "C-301", None, "D"]
+    stats = get_exam_density(df)
+
+    monday = pd.Timestamp("2025-11-17")
+    assert stats.exams.loc[monday].to_dict() == {
+        "09:00": 1,
+        "10:00": 1,
+        "13:00": 1,
+        "16:00": 1,
+    }
+    assert stats.rooms.loc[monday, "09:00"] == 2
+    assert stats.rooms.loc[monday, "13:00"] == 0
+    assert stats.per_day["exams"].to_dict() == {
+        monday: 4,
+        pd.Timestamp("2025-11-18"): 1,
+        pd.Timestamp("2025-11-20"): 1,
+    }
+    assert stats.per_slot.loc["09:00"].to_dict() == {"exams": 3, "rooms": 3}
+
+
+def test_department_filter(make_fixture_schedule):
+    """Test that filters only count the selected departments"""
+    df = make_fixture_schedule(200)
+    everything = get_exam_density(df)
+    comp = get_exam_density(df, ["comp"])
+    others = get_exam_density(
+        df, sorted(set(get_density_table(df)["department"]) - {"comp"})
+    )
+
+    assert everything.exams.to_numpy().sum() == 200
+    assert (
+        comp.per_slot["exams"]
+        .add(others.per_slot["exams"], fill_value=0)
+        .equals(everything.per_slot["exams"])
+    )
+    assert get_exam_density(df, []).exams.equals(everything.exams)
+    assert get_exam_density(df, ["none"]).exams.empty
+
+
+def test_filters_use_the_cached_table(monkeypatch, make_fixture_schedule):
+    """Test that filtering does not aggregate the schedule rows again"""
+    df = make_fixture_schedule(100)
+    get_exam_density(df)
+
+    def fail(df):
+        raise AssertionError("Schedule rows should not be read again")
+
+    monkeypatch.setattr(density, "get_exam_intervals", fail)
+    for departments in (["comp"], ["eee", "math"], None):
+        get_exam_density(df, departments)
+
+
+def test_rows_in_another_order(make_fixture_schedule):
+    """Test a schedule of the same version whose rows are in another order"""
+    df = make_fixture_schedule(100)
+    expected = get_exam_density(df)
+    shuffled = df.sample(frac=1, random_state=0).reset_index(drop=True)
+    set_schedule_version(shuffled, get_schedule_version(df))
+    # Only the density table is rebuilt, from the intervals cached for df
+    density._density_tables.invalidate()
+
+    stats = get_exam_density(shuffled)
+    assert stats.exams.equals(expected.exams)
+    assert stats.rooms.equals(expected.rooms)
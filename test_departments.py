@@ -0,0 +1,105 @@
+"""
+Tests for the prebuilt department artifacts in departments.py
+"""
+
+import pytest
+
+from departments import (
+    get_department_artifacts,
+    get_departments,
+    warm_departments,
+)
+from utils import ScheduleLoader, create_ics_file, create_result_dataframe
+
+
+def failing_render(table):
+    raise RuntimeError("no image backend")
+
+
+def test_get_departments(make_fixture_schedule):
+    """Test that courses are grouped by the prefix of their code"""
+    df = make_fixture_schedule(30)
+    departments = get_departments(df)
+
+    assert list(departments) == sorted(departments)
+    assert sum(len(courses) for courses in departments.values()) == 30
+    for department, courses in departments.items():
+        assert all(course.lower().startswith(department) for course in courses)
+
+
+def test_warm_departments_without_images(make_fixture_schedule):
+    """Test that every department is prebuilt in both languages"""
+    df = make_fixture_schedule(40)
+    departments = get_departments(df)
+    artifacts = warm_departments(df, render_images=False)
+
+    assert len(artifacts) == 2 * len(departments)
+    department, courses = next(iter(departments.items()))
+    built = get_department_artifacts(df, department, "en")
+    assert built.png is None
+    assert built.table.equals(
+        create_result_dataframe(df, courses, "en", include_classroom=True)
+    )
+
+    def stable_lines(text):
+        return [
+            line
+            for line in text.splitlines()
+            if not line.startswith(("UID:", "DTSTAMP:"))
+        ]
+
+    assert stable_lines(built.ics) == stable_lines(
+        create_ics_file(df, courses, "en", "final")
+    )
+    assert built.ics.count("BEGIN:VEVENT") == len(courses)
+
+    # Prebuilt tables are shared, so callers get their own copy
+    built.table.iloc[0, 0] = "changed"
+    assert get_department_artifacts(df, department, "en").table.iloc[0, 0] != "changed"
+
+
+def test_warm_departments_renders_in_processes(make_fixture_schedule, fake_render):
+    """Test that images are rendered by the process pool"""
+    df = make_fixture_schedule(20)
+    warm_departments(df, languages=("tr",), max_workers=2, render=fake_render)
+
+    for department, courses in get_departments(df).items():
+        built = get_department_artifacts(df, department, "tr")
+        assert built.png == f"PNG {len(courses)}".encode()
+
+
+def test_failed_renders_are_skipped(make_fixture_schedule):
+    """Test that a broken image backend does not lose the other artifacts"""
+    df = make_fixture_schedule(10)
+    artifacts = warm_departments(
+        df, languages=("tr",), max_workers=1, render=failing_render
+    )
+    assert artifacts
+    assert all(built.png is None and built.ics for built in artifacts.values())
+
+
+def test_unknown_department(make_fixture_schedule):
+    """Test that departments without courses are rejected"""
+    df = make_fixture_schedule(10)
+    with pytest.raises(ValueError, match="xyz"):
+        get_department_artifacts(df, "xyz")
+
+
+def test_loader_warm_up(make_fixture_schedule):
+    """Test that the loader warms up after marking the schedule ready"""
+    df = make_fixture_schedule(10)
+    warmed = []
+    loader = ScheduleLoader(lambda progress: df, warm_up=warmed.append)
+    loader.start()
+    assert loader.wait(5)
+    loader._thread.join(5)
+    assert warmed == [df]
+
+    # A failing warm-up leaves the loaded schedule usable
+    def fail(df):
+        raise RuntimeError("boom")
+
+    loader = ScheduleLoader(lambda progress: df, warm_up=fail)
+    loader.start()
+    loader._thread.join(5)
+    assert loader.is_ready and loader.df is df
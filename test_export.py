@@ -0,0 +1,183 @@
+"""
+Tests for the streaming export pipeline in export.py
+"""
+
+import csv
+import io
+import re
+import tracemalloc
+import zipfile
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from export import WRITERS, export, export_bytes, export_to_path, export_zip
+from utils import (
+    COURSE_CODE_AND_NAME_COLUMN,
+    create_ics_file,
+    create_result_dataframe,
+    get_language_column_names,
+)
+
+# Exams of the schedule the exports are tested with
+EXAMS = [
+    ("comp101", "2025-11-15 Cuma", "09:30:00", "11:30:00", "Computer Science", "A-101"),
+    (
+        "turk102",
+        "2025-11-17 Pazartesi",
+        "13:00:00",
+        "15:00:00",
+        "Türk Dili (Şiir ve Düzyazı)",
+        "B-201,B-202",
+    ),
+]
+
+
+def make_result(rows):
+    """Create a large result DataFrame without going through the lookups"""
+    col_names = get_language_column_names("en")
+    return pd.DataFrame(
+        {
+            col_names["course_name"]: [
+                f"Course {i} with a long name" for i in range(rows)
+            ],
+            col_names["exam_date"]: [
+                f"{1 + i % 28:02d}/01/2026 Monday 09:00-11:00" for i in range(rows)
+            ],
+            col_names["classroom"]: [f"R-{i % 300}" for i in range(rows)],
+        }
+    )
+
+
+class NonSeekableSink(io.RawIOBase):
+    """Write-only stream that only counts bytes, like a network response"""
+
+    def __init__(self):
+        self.size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.size += len(data)
+        return len(data)
+
+
+@pytest.fixture
+def result_df(make_schedule):
+    return create_result_dataframe(
+        make_schedule(EXAMS),
+        list(make_schedule(EXAMS)[COURSE_CODE_AND_NAME_COLUMN]),
+        "tr",
+        True,
+    )
+
+
+def test_registered_formats():
+    """Test that the standard writers are registered"""
+    assert {"csv", "xlsx", "pdf", "ics"} <= set(WRITERS)
+
+
+def test_csv(result_df):
+    """Test CSV export round trip"""
+    data = export_bytes(result_df, "csv")
+    assert data.startswith(b"\xef\xbb\xbf"), "CSV should start with a UTF-8 BOM"
+    rows = list(csv.reader(io.StringIO(data.decode("utf-8-sig"))))
+    assert rows[0] == list(result_df.columns)
+    assert rows[2][0] == "Türk Dili (Şiir ve Düzyazı)"
+
+
+def test_xlsx(result_df):
+    """Test XLSX export round trip"""
+    workbook = openpyxl.load_workbook(io.BytesIO(export_bytes(result_df, "xlsx", "tr")))
+    sheet = workbook["Sınavlar"]
+    values = [list(row) for row in sheet.iter_rows(values_only=True)]
+    assert values[0] == list(result_df.columns)
+    assert values[1:] == [list(row) for row in result_df.itertuples(index=False)]
+
+
+def test_ics_matches_create_ics_file(result_df, make_schedule):
+    """Test that the ICS writer matches create_ics_file"""
+    df = make_schedule(EXAMS)
+    exported = export_bytes(result_df, "ics", "tr", exam_type="final").decode()
+    expected = create_ics_file(df, list(df[COURSE_CODE_AND_NAME_COLUMN]), "tr", "final")
+
+    def stable_lines(text):
+        return [
+            line
+            for line in text.split("\n")
+            if not line.startswith(("UID:", "DTSTAMP:"))
+        ]
+
+    assert stable_lines(exported) == stable_lines(expected)
+
+
+def test_pdf_structure():
+    """Test that PDF cross-reference offsets point at their objects"""
+    data = export_bytes(make_result(130), "pdf", "en")
+    assert data.startswith(b"%PDF-1.4")
+    assert data.rstrip().endswith(b"%%EOF")
+
+    startxref = int(re.search(rb"startxref\n(\d+)", data).group(1))
+    xref = data[startxref:].split(b"trailer")[0].split(b"\n")[3:]
+    offsets = [int(line[:10]) for line in xref if line.strip()]
+    for object_id, offset in enumerate(offsets, start=1):
+        assert data[offset:].startswith(b"%d 0 obj" % object_id)
+
+    assert re.search(rb"/Count (\d+)", data).group(1) == b"3"
+
+
+def test_pdf_transliterates_turkish(result_df):
+    """Test that characters outside WinAnsi are transliterated"""
+    data = export_bytes(result_df, "pdf", "tr")
+    assert b"(T\xfcrk Dili \\(Siir ve D\xfczyaz" in data
+
+
+def test_zip_to_non_seekable_stream(result_df):
+    """Test that a ZIP bundle can be streamed to a non-seekable file"""
+    sink = NonSeekableSink()
+    export_zip(result_df, sink, ["csv", "xlsx", "pdf", "ics"], "tr")
+    assert sink.size > 0
+
+    archive = zipfile.ZipFile(io.BytesIO(export_bytes(result_df, "zip", "tr")))
+    assert sorted(archive.namelist()) == [
+        "exam_schedule.csv",
+        "exam_schedule.ics",
+        "exam_schedule.pdf",
+        "exam_schedule.xlsx",
+    ]
+    assert archive.testzip() is None
+
+
+def test_unknown_format(result_df, tmp_path):
+    """Test that unknown formats are rejected"""
+    with pytest.raises(ValueError):
+        export(result_df, io.BytesIO(), "docx")
+    with pytest.raises(ValueError):
+        export_to_path(result_df, str(tmp_path / "schedule.docx"))
+    assert not (tmp_path / "schedule.docx").exists()
+
+
+def test_export_to_path(result_df, tmp_path):
+    """Test batch export to disk"""
+    path = tmp_path / "schedule.pdf"
+    export_to_path(result_df, str(path), "tr")
+    assert path.read_bytes().startswith(b"%PDF")
+
+
+def test_memory_stays_flat():
+    """Test that streamed exports do not grow with the number of rows"""
+
+    def peak_memory(result):
+        tracemalloc.start()
+        export_zip(result, NonSeekableSink(), ["csv", "pdf", "ics"], "en")
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak
+
+    small, large = make_result(1000), make_result(10000)
+    small_peak, large_peak = peak_memory(small), peak_memory(large)
+    assert (
+        large_peak < 2 * small_peak
+    ), f"Peak memory grew from {small_peak} to {large_peak} bytes for 10x the rows"
@@ -0,0 +1,236 @@
+"""
+Tests for the subscribable ICS feed in feed.py, served over a local HTTP server.
+"""
+
+import base64
+import threading
+import zlib
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+import pytest
+import requests
+
+import utils
+
+from feed import (
+    MAX_TOKEN_BYTES,
+    ThreadingWSGIServer,
+    create_feed_app,
+    decode_token,
+    encode_token,
+    feed_url,
+    keep_schedule_fresh,
+)
+from utils import ScheduleLoader, create_ics_file
+
+
+def feed_exams(comp_time="09:30:00"):
+    """Exams of the schedule the feeds are tested with"""
+    return [
+        (
+            "comp101",
+            "2025-11-15 Cuma",
+            comp_time,
+            "11:30:00",
+            "Computer Science",
+            "A-101",
+        ),
+        (
+            "math102",
+            "2025-11-17 Pazartesi",
+            "13:00:00",
+            "15:00:00",
+            "Calculus",
+            "B-201",
+        ),
+        ("phys103", "2025-11-18 Salı", "10:00:00", "12:00:00", "Physics", "C-301"),
+    ]
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def feed_server(make_schedule):
+    state = {"df": make_schedule(feed_exams())}
+    app = create_feed_app(get_df=lambda: state["df"])
+    server = make_server(
+        "127.0.0.1",
+        0,
+        app,
+        server_class=ThreadingWSGIServer,
+        handler_class=QuietHandler,
+    )
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", app, state
+    server.shutdown()
+    server.server_close()
+
+
+def test_token_round_trip():
+    """Test that tokens encode the course list and language"""
+    token = encode_token(["math102", "comp101", "comp101"], "en")
+    assert decode_token(token) == (["comp101", "math102"], "en")
+    assert "comp101" not in token, "Token should be opaque"
+
+    with pytest.raises(ValueError):
+        decode_token("not-a-token")
+
+
+def make_token(data):
+    """Encode raw bytes the way encode_token does"""
+    return base64.urlsafe_b64encode(zlib.compress(data, 9)).decode().rstrip("=")
+
+
+def test_decode_token_rejects_hostile_payloads():
+    """Test that oversized, trailing and mistyped payloads are rejected"""
+    bomb = b'{"c":["' + b"a" * (MAX_TOKEN_BYTES * 16) + b'"],"l":"tr"}'
+    assert len(make_token(bomb)) < 2000
+    with pytest.raises(ValueError, match="too large"):
+        decode_token(make_token(bomb))
+
+    token = encode_token(["comp101"], "tr")
+    data = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+    trailing = base64.urlsafe_b64encode(data + b"extra").decode()
+    with pytest.raises(ValueError):
+        decode_token(trailing)
+
+    with pytest.raises(ValueError):
+        decode_token(make_token(b'{"c":"comp101","l":"tr"}'))
+
+
+def test_feed_url(make_schedule):
+    """Test that feed URLs use the webcal scheme"""
+    df = make_schedule(feed_exams())
+    url = feed_url("https://exams.example.com/", df, ["MATH102 (Calculus)"], "tr")
+    token = url.rsplit("/", 1)[1][: -len(".ics")]
+    assert url.startswith("webcal://exams.example.com/feed/")
+    assert decode_token(token) == (["math102"], "tr")
+
+
+def test_feed_serves_calendar(feed_server):
+    """Test that a feed contains one event per known course"""
+    base_url, app, state = feed_server
+    token = encode_token(["comp101", "math102", "gone999"], "tr")
+
+    response = requests.get(f"{base_url}/feed/{token}.ics")
+    assert response.status_code == 200
+    assert response.headers["Content-Type"].startswith("text/calendar")
+    assert "max-age" in response.headers["Cache-Control"]
+    body = response.text
+    assert body.startswith("BEGIN:VCALENDAR\r\n")
+    assert body.count("BEGIN:VEVENT") == 2
+    assert "DTSTART:20251115T093000" in body
+    assert "LOCATION:B-201" in body
+
+
+def test_feed_matches_download(feed_server):
+    """Test that feed events match the downloadable ICS file"""
+    base_url, app, state = feed_server
+    token = encode_token(["math102"], "en")
+    body = requests.get(f"{base_url}/feed/{token}.ics").text
+    download = create_ics_file(state["df"], ["MATH102 (Calculus)"], "en", "final")
+
+    def stable_lines(text):
+        return [
+            line
+            for line in text.splitlines()
+            if not line.startswith(("UID:", "DTSTAMP:"))
+        ]
+
+    assert stable_lines(body) == stable_lines(download)
+
+
+def test_conditional_requests(feed_server, make_schedule):
+    """Test ETag revalidation and invalidation on schedule changes"""
+    base_url, app, state = feed_server
+    url = f"{base_url}/feed/{encode_token(['comp101', 'phys103'], 'en')}.ics"
+
+    first = requests.get(url)
+    etag = first.headers["ETag"]
+    for _ in range(20):
+        response = requests.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+    assert app.cache.feed_builds == 1
+    assert app.cache.fragment_builds == 2
+
+    # A changed schedule produces a new ETag and rebuilt calendar
+    state["df"] = make_schedule(feed_exams("14:00:00"))
+    changed = requests.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert "DTSTART:20251115T140000" in changed.text
+
+    # Event UIDs stay the same so calendars update instead of duplicating
+    def uids(text):
+        return sorted(line for line in text.splitlines() if line.startswith("UID:"))
+
+    assert uids(first.text) == uids(changed.text)
+
+
+def test_shared_fragments(feed_server):
+    """Test that feeds with overlapping courses reuse event fragments"""
+    base_url, app, state = feed_server
+    for courses in (["comp101"], ["comp101", "math102"], ["math102", "phys103"]):
+        requests.get(f"{base_url}/feed/{encode_token(courses, 'tr')}.ics")
+    assert app.cache.fragment_builds == 3
+
+
+def test_invalid_requests(feed_server):
+    """Test responses to malformed feed requests"""
+    base_url, app, state = feed_server
+    assert requests.get(f"{base_url}/feed/garbage.ics").status_code == 404
+    assert requests.get(f"{base_url}/other").status_code == 404
+    assert requests.post(f"{base_url}/feed/x.ics").status_code == 405
+
+
+def test_schedule_is_reloaded(monkeypatch, make_schedule):
+    """Test that reloads change the ETag and failed reloads keep the schedule"""
+    schedules = [
+        make_schedule(feed_exams()),
+        make_schedule(feed_exams(comp_time="10:00:00")),
+        None,
+    ]
+    reloaded = threading.Semaphore(0)
+
+    def load(progress):
+        df = schedules.pop(0)
+        reloaded.release()
+        if df is None:
+            raise ConnectionError("workbook unavailable")
+        return df
+
+    first = ScheduleLoader(load)
+    monkeypatch.setattr(utils, "_schedule_loader", first)
+    app = create_feed_app()
+    token = encode_token(["comp101"])
+
+    def etag():
+        headers = {}
+        app(
+            {"REQUEST_METHOD": "HEAD", "PATH_INFO": f"/feed/{token}.ics"},
+            lambda status, response_headers: headers.update(response_headers),
+        )
+        return headers["ETag"]
+
+    old = etag()
+    stop = threading.Event()
+    thread = keep_schedule_fresh(
+        interval=0.01, stop=stop, make_loader=lambda: ScheduleLoader(load)
+    )
+    try:
+        assert reloaded.acquire(timeout=5) and reloaded.acquire(timeout=5)
+        assert reloaded.acquire(timeout=5), "The failed reload should be attempted"
+    finally:
+        stop.set()
+        thread.join(5)
+
+    assert utils.get_schedule_loader() is not first
+    assert utils.get_schedule_loader().is_ready
+    assert etag() != old
@@ -0,0 +1,214 @@
+"""
+Tests for the streamed, resumable download layer in fetch.py.
+A local HTTP server simulates dropped connections, slow responses and
+servers with and without Range support.
+"""
+
+import http.server
+import io
+import threading
+import time
+
+import pytest
+import requests
+
+from fetch import DownloadTooLargeError, download_to_file, fetch_to_tempfile
+
+BODY = bytes(range(256)) * 1024  # 256 KiB payload
+NEW_BODY = bytes(reversed(range(256))) * 1024  # Workbook updated mid-download
+ETAG = '"v1"'
+
+
+class ScheduleHandler(http.server.BaseHTTPRequestHandler):
+    """Request handler whose behaviour depends on the requested path."""
+
+    protocol_version = "HTTP/1.1"
+    hits = {}
+    ranges = []
+    requests = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def _count(self):
+        ScheduleHandler.hits[self.path] = ScheduleHandler.hits.get(self.path, 0) + 1
+        return ScheduleHandler.hits[self.path]
+
+    def _send_body(self, start=0, drop_after=None, ranged=False, full=BODY, etag=ETAG):
+        body = full[start:]
+        self.send_response(206 if ranged else 200)
+        if ranged:
+            self.send_header(
+                "Content-Range", f"bytes {start}-{len(full) - 1}/{len(full)}"
+            )
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if drop_after is not None:
+            self.wfile.write(body[:drop_after])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def _range_start(self):
+        header = self.headers.get("Range")
+        if header is None:
+            return None
+        return int(header.split("=")[1].rstrip("-"))
+
+    def do_GET(self):
+        hit = self._count()
+        start = self._range_start()
+        ScheduleHandler.requests.append(dict(self.headers))
+
+        if self.path == "/ok":
+            self._send_body()
+        elif self.path == "/drop-resumable":
+            # First attempt drops halfway, later attempts honour Range
+            if start is None:
+                self._send_body(drop_after=len(BODY) // 2)
+            else:
+                ScheduleHandler.ranges.append(start)
+                self._send_body(start=start, ranged=True)
+        elif self.path == "/changing":
+            # The file is replaced after the first attempt drops, so the old
+            # validator no longer matches and the new file is sent in full;
+            # a plain Range request gets the middle of the new file
+            if hit == 1:
+                self._send_body(drop_after=len(BODY) // 2)
+            elif self.headers.get("If-Range") in (None, '"v2"'):
+                self._send_body(start=start, ranged=True, full=NEW_BODY, etag='"v2"')
+            else:
+                self._send_body(full=NEW_BODY, etag='"v2"')
+        elif self.path == "/drop-no-range":
+            # Server ignores Range and always sends the full body
+            if hit == 1:
+                self._send_body(drop_after=len(BODY) // 3)
+            else:
+                self._send_body()
+        elif self.path == "/slow":
+            if hit == 1:
+                time.sleep(1.0)
+            self._send_body()
+        elif self.path == "/flaky":
+            if hit == 1:
+                self.send_response(503)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            else:
+                self._send_body()
+        elif self.path == "/missing":
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        else:
+            self.send_response(500)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+
+@pytest.fixture
+def server():
+    ScheduleHandler.hits = {}
+    ScheduleHandler.ranges = []
+    ScheduleHandler.requests = []
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), ScheduleHandler)
+    thread = threading.Thread(
+        target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_download_ok(server):
+    """Test a plain streamed download"""
+    file = io.BytesIO()
+    size = download_to_file(f"{server}/ok", file, backoff=0)
+    assert size == len(BODY), f"Expected {len(BODY)} bytes, got {size}"
+    assert file.getvalue() == BODY
+
+
+def test_resume_with_range(server):
+    """Test that a dropped transfer resumes from the received offset"""
+    progress = []
+    file = io.BytesIO()
+    download_to_file(
+        f"{server}/drop-resumable",
+        file,
+        backoff=0,
+        on_progress=lambda received, total: progress.append((received, total)),
+    )
+    assert file.getvalue() == BODY
+    assert ScheduleHandler.ranges == [
+        len(BODY) // 2
+    ], f"Expected one resume at the midpoint, got {ScheduleHandler.ranges}"
+    assert progress[-1] == (len(BODY), len(BODY))
+
+
+def test_resume_is_validated(server):
+    """Test that a file changed between attempts is downloaded again"""
+    file = io.BytesIO()
+    size = download_to_file(f"{server}/changing", file, backoff=0)
+
+    assert size == len(NEW_BODY)
+    assert file.getvalue() == NEW_BODY, "Old and new bodies were spliced"
+    first, second = ScheduleHandler.requests
+    assert first["Accept-Encoding"] == second["Accept-Encoding"] == "identity"
+    assert "If-Range" not in first
+    assert second["If-Range"] == ETAG
+    assert second["Range"] == f"bytes={len(BODY) // 2}-"
+
+
+def test_restart_without_range_support(server):
+    """Test that the download restarts when the server ignores Range"""
+    file = io.BytesIO()
+    download_to_file(f"{server}/drop-no-range", file, backoff=0)
+    assert file.getvalue() == BODY
+    assert ScheduleHandler.hits["/drop-no-range"] == 2
+
+
+def test_slow_response_retried(server):
+    """Test that a read timeout is retried"""
+    file = io.BytesIO()
+    download_to_file(f"{server}/slow", file, timeout=0.3, backoff=0)
+    assert file.getvalue() == BODY
+    assert ScheduleHandler.hits["/slow"] == 2
+
+
+def test_retry_on_server_error(server):
+    """Test that 5xx responses are retried"""
+    file = io.BytesIO()
+    download_to_file(f"{server}/flaky", file, backoff=0)
+    assert file.getvalue() == BODY
+
+
+def test_no_retry_on_client_error(server):
+    """Test that 4xx responses fail immediately"""
+    with pytest.raises(requests.exceptions.HTTPError):
+        download_to_file(f"{server}/missing", io.BytesIO(), backoff=0)
+    assert ScheduleHandler.hits["/missing"] == 1
+
+
+def test_retries_exhausted(server):
+    """Test that persistent failures are raised after the retry budget"""
+    with pytest.raises(requests.exceptions.HTTPError):
+        download_to_file(f"{server}/broken", io.BytesIO(), retries=2, backoff=0)
+    assert ScheduleHandler.hits["/broken"] == 3
+
+
+def test_max_bytes(server):
+    """Test that oversized downloads are rejected"""
+    with pytest.raises(DownloadTooLargeError):
+        download_to_file(f"{server}/ok", io.BytesIO(), max_bytes=1024, backoff=0)
+
+
+def test_fetch_to_tempfile_cleanup(server):
+    """Test that the temporary file exists only inside the context"""
+    with fetch_to_tempfile(f"{server}/ok", suffix=".xlsx", backoff=0) as path:
+        with open(path, "rb") as file:
+            assert file.read() == BODY
+    with pytest.raises(FileNotFoundError):
+        open(path, "rb")
@@ -0,0 +1,61 @@
+"""
+Tests for the required grade solver and scenario grids in grades.py
+"""
+
+import numpy as np
+import pytest
+
+from grades import required_grade, scenario_grid
+
+
+def test_required_grade_single_unknown():
+    """Test the score needed on the final after the midterm"""
+    result = required_grade([40, 0], [40, 60], 50, unknown=[1])
+    assert result == pytest.approx(56.6667, abs=1e-3), f"Expected ~56.67, got {result}"
+
+
+def test_required_grade_multiple_unknown():
+    """Test that several unknown exams share the same required score"""
+    result = required_grade([80, 0, 0], [20, 40, 40], 60, unknown=[1, 2])
+    assert result == pytest.approx(55.0), f"Expected 55, got {result}"
+
+
+def test_required_grade_already_passed_and_impossible():
+    """Test the bounds of the required score"""
+    assert required_grade([100, 0], [80, 20], 50, unknown=[1]) == 0.0
+    assert required_grade([0, 0], [70, 30], 50, unknown=[1]) > 100
+
+
+def test_required_grade_invalid_input():
+    """Test that unsolvable inputs are rejected"""
+    with pytest.raises(ValueError):
+        required_grade([50, 50], [40, 60], 50, unknown=[])
+    with pytest.raises(ValueError):
+        required_grade([50, 0], [100, 0], 50, unknown=[1])
+
+
+def test_scenario_grid_single_unknown():
+    """Test the one dimensional what-if grid"""
+    grid = scenario_grid([40, 0], [40, 60], unknown=[1], step=0.1)
+    assert len(grid) == 1001
+    assert grid.loc[0.0, "total"] == pytest.approx(16.0)
+    assert grid["total"].iloc[-1] == pytest.approx(76.0)
+
+
+def test_scenario_grid_two_unknown():
+    """Test the two dimensional grid against a loop calculation"""
+    grades, weights = [70, 0, 0], [30, 50, 20]
+    grid = scenario_grid(grades, weights, unknown=[1, 2], step=0.1)
+    assert grid.shape == (1001, 1001)
+
+    for final, makeup in [(0.0, 0.0), (45.5, 12.3), (100.0, 100.0)]:
+        expected = 70 * 0.3 + final * 0.5 + makeup * 0.2
+        actual = grid.values[int(round(final * 10)), int(round(makeup * 10))]
+        assert actual == pytest.approx(expected), f"Wrong total at {final}, {makeup}"
+    assert np.all(np.diff(grid.values, axis=0) >= 0)
+
+
+def test_scenario_grid_rejects_three_unknown():
+    """Test that grids are limited to two dimensions"""
+    with pytest.raises(ValueError):
+        scenario_grid([0, 0, 0], [30, 30, 40], unknown=[0, 1, 2])
@@ -0,0 +1,29 @@
+"""
+Tests for the load-testing harness in loadtest.py
+"""
+
+from loadtest import format_report, run_load_test
+from utils import COURSE_CODE_AND_NAME_COLUMN, get_schedule_loader
+
+
+def test_fixture_schedule(make_fixture_schedule):
+    """Test that the fixture schedule has unique courses"""
+    schedule = make_fixture_schedule(courses=120)
+    assert len(schedule) == 120
+    assert schedule[COURSE_CODE_AND_NAME_COLUMN].is_unique
+
+
+def test_run_load_test():
+    """Test a small concurrent load run end to end"""
+    loader = get_schedule_loader()
+    report = run_load_test(sessions=3, iterations=1, courses=50, images=False)
+
+    assert report["errors"] == [], f"Sessions failed: {report['errors']}"
+    # One page load plus toggle, select and show per iteration
+    assert report["reruns"] == 3 * 4
+    assert report["downloads"] == 3
+    assert 0 < report["p50"] <= report["p95"] <= report["p99"]
+    assert report["throughput"] > 0
+    assert report["memory_per_session"] > 0
+    assert "Rerun latency p95" in format_report(report)
+    assert get_schedule_loader() is loader, "The original loader should be restored"
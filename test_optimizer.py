@@ -0,0 +1,134 @@
+"""
+Tests for the elective combination optimizer in optimizer.py
+"""
+
+import itertools
+import time
+
+import pandas as pd
+import pytest
+
+from optimizer import RANK_EXAMS_PER_DAY, RANK_MIN_GAP, find_best_combinations
+from utils import COURSE_CODE_AND_NAME_COLUMN, get_exam_intervals
+
+
+def brute_force(df, required, optional, count):
+    """Score every clash-free combination by minimum gap in minutes"""
+    intervals = get_exam_intervals(df)
+    scores = {}
+    for electives in itertools.combinations(optional, count):
+        exams = sorted(
+            (intervals.loc[course, "start"], intervals.loc[course, "end"])
+            for course in list(required) + list(electives)
+        )
+        gaps = [(b[0] - a[1]).total_seconds() / 60 for a, b in zip(exams, exams[1:])]
+        if min(gaps, default=0) >= 0:
+            scores[electives] = min(gaps, default=float("inf"))
+    return scores
+
+
+def test_best_combinations_by_gap(overlapping_schedule):
+    """Test that combinations are clash-free and ranked by rest"""
+    df = overlapping_schedule
+    results = find_best_combinations(
+        df, ["COMP101"], ["MATH102", "PHYS103", "CHEM104", "BIOL105"], 2, k=3
+    )
+
+    assert results[0].electives == ["CHEM104", "BIOL105"]
+    assert results[0].min_gap == pd.Timedelta(hours=22)
+    assert results[0].max_exams_per_day == 1
+
+    # Physics is two hours after the required exam in either combination
+    assert sorted(result.electives for result in results[1:]) == [
+        ["PHYS103", "BIOL105"],
+        ["PHYS103", "CHEM104"],
+    ]
+    assert all(result.min_gap == pd.Timedelta(hours=2) for result in results[1:])
+
+
+def test_best_combinations_by_exams_per_day(overlapping_schedule):
+    """Test ranking by the busiest day"""
+    df = overlapping_schedule
+    results = find_best_combinations(
+        df,
+        [],
+        ["COMP101", "PHYS103", "HIST106", "CHEM104"],
+        3,
+        rank=RANK_EXAMS_PER_DAY,
+    )
+
+    assert results[0].max_exams_per_day == 2
+    assert "CHEM104" in results[0].electives
+    assert results[-1].electives == ["COMP101", "PHYS103", "HIST106"]
+    assert results[-1].max_exams_per_day == 3
+
+
+def test_invalid_requests(overlapping_schedule):
+    """Test clashing required courses, unknown courses and impossible counts"""
+    df = overlapping_schedule
+    with pytest.raises(ValueError, match="clashes"):
+        find_best_combinations(df, ["COMP101", "MATH102"], ["PHYS103"], 1)
+    with pytest.raises(ValueError, match="GONE999"):
+        find_best_combinations(df, ["COMP101"], ["GONE999"], 1)
+    with pytest.raises(ValueError, match="rank"):
+        find_best_combinations(df, [], ["COMP101"], 1, rank="fewest")
+
+    # Math clashes with the required course, so only one candidate remains
+    assert find_best_combinations(df, ["COMP101"], ["MATH102", "PHYS103"], 2) == []
+
+
+def test_matches_brute_force(make_fixture_schedule):
+    """Test that pruning never drops the best combinations"""
+    df = make_fixture_schedule(40, seed=3)
+    courses = list(df[COURSE_CODE_AND_NAME_COLUMN])
+    required, optional = courses[:2], courses[2:20]
+
+    results = find_best_combinations(df, required, optional, 3, k=5)
+    expected = brute_force(df, required, optional, 3)
+    best_gaps = sorted(expected.values(), reverse=True)[:5]
+
+    assert [result.min_gap.total_seconds() / 60 for result in results] == best_gaps
+    for result in results:
+        assert tuple(result.electives) in expected
+
+
+def test_matches_brute_force_by_exams_per_day(make_fixture_schedule):
+    """Test that the daily load bound never drops the best combinations"""
+    df = make_fixture_schedule(40, seed=5)
+    courses = list(df[COURSE_CODE_AND_NAME_COLUMN])
+    required, optional = courses[:2], courses[2:20]
+    days = get_exam_intervals(df)["start"].dt.normalize()
+
+    results = find_best_combinations(
+        df, required, optional, 4, k=5, rank=RANK_EXAMS_PER_DAY
+    )
+    expected = {
+        electives: (days[required + list(electives)].value_counts().max(), gap)
+        for electives, gap in brute_force(df, required, optional, 4).items()
+    }
+    best = sorted(expected.values(), key=lambda score: (score[0], -score[1]))[:5]
+
+    assert [
+        (result.max_exams_per_day, result.min_gap.total_seconds() / 60)
+        for result in results
+    ] == best
+
+
+@pytest.mark.parametrize("rank", [RANK_MIN_GAP, RANK_EXAMS_PER_DAY])
+@pytest.mark.parametrize("pool,count", [(60, 4), (60, 7), (60, 10), (200, 10)])
+def test_large_pool_is_fast(rank, pool, count, make_fixture_schedule):
+    """Test that large pools of electives are searched in under a second"""
+    df = make_fixture_schedule(300)
+    courses = list(df[COURSE_CODE_AND_NAME_COLUMN])
+    get_exam_intervals(df)
+
+    started = time.perf_counter()
+    results = find_best_combinations(
+        df, courses[:4], courses[4 : 4 + pool], count, k=10, rank=rank
+    )
+    elapsed = time.perf_counter() - started
+
+    assert len(results) == 10
+    assert all(len(result.electives) == count for result in results)
+    assert elapsed < 1, f"Choosing {count} of {pool} electives took {elapsed:.2f}s"
+    assert all(result.min_gap >= pd.Timedelta(0) for result in results)
@@ -0,0 +1,183 @@
+"""
+Tests for the SQLite schedule store in store.py
+"""
+
+import threading
+
+import pytest
+
+import utils
+from store import ScheduleStore, StoredScheduleLoader, install_store_loader
+from utils import (
+    CLASSROOM_CODE_COLUMN,
+    COURSE_CODE_AND_NAME_COLUMN,
+    ScheduleLoader,
+    create_result_dataframe,
+    get_schedule_version,
+    prepare_exam_data,
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ScheduleStore(str(tmp_path / "schedules.db"))
+    yield store
+    store.close()
+
+
+def test_round_trip(store, make_raw_schedule):
+    """Test that a stored schedule gives the same results as the original"""
+    df = prepare_exam_data(make_raw_schedule())
+    version = store.save_schedule(df, "2025-fall", source="test.xlsx")
+    loaded = store.load_schedule("2025-fall")
+
+    assert store.latest_version() == version
+    assert get_schedule_version(loaded) == version
+    courses = list(df[COURSE_CODE_AND_NAME_COLUMN])
+    for language in ("tr", "en"):
+        assert create_result_dataframe(
+            loaded, courses, language, include_classroom=True
+        ).equals(create_result_dataframe(df, courses, language, True))
+    assert store.load_schedule("2024-spring") is None
+
+
+def test_load_keeps_row_order(store, make_fixture_schedule):
+    """Test that a stored schedule loads in the order it was saved"""
+    df = make_fixture_schedule(20).iloc[::-1]
+    version = store.save_schedule(df, "2025-fall")
+    loaded = store.load_schedule(version=version)
+
+    labels = list(df[COURSE_CODE_AND_NAME_COLUMN])
+    assert list(loaded[COURSE_CODE_AND_NAME_COLUMN]) == labels
+
+
+def test_upsert_and_history(store, make_fixture_schedule):
+    """Test that saving again updates rows and terms keep their own rows"""
+    old = make_fixture_schedule(20, seed=1)
+    new = make_fixture_schedule(20, seed=2)
+    old_version = store.save_schedule(old, "2024-fall")
+    store.save_schedule(old, "2024-fall")
+    new_version = store.save_schedule(new, "2025-fall")
+
+    assert len(store.load_schedule(version=old_version)) == 20
+    assert list(store.terms()["version"]) == [new_version, old_version]
+    assert store.latest_version("2024-fall") == old_version
+
+    code = old["DERS KODU"].iloc[0]
+    history = store.course_history(code)
+    assert list(history["term"]) == ["2024-fall", "2025-fall"]
+
+
+def test_queries_use_indexes(store, make_fixture_schedule):
+    """Test that lookups by code, date and room are index searches"""
+    store.save_schedule(make_fixture_schedule(50), "2025-fall")
+    plans = {
+        "course_code": "SELECT * FROM exams WHERE course_code = 'comp100'",
+        "exam_date": "SELECT * FROM exams WHERE version = 'v' AND exam_date = 'd'",
+        "room": "SELECT * FROM exam_rooms WHERE version = 'v' AND room = 'B-101'",
+    }
+    for column, query in plans.items():
+        plan = " ".join(row[-1] for row in store._query(f"EXPLAIN QUERY PLAN {query}"))
+        assert "SEARCH" in plan and "INDEX" in plan, f"{column} lookup scans: {plan}"
+
+
+def test_selected_courses_and_days(store, make_fixture_schedule):
+    """Test loading only the rows a lookup needs"""
+    df = make_fixture_schedule(30)
+    version = store.save_schedule(df, "2025-fall")
+    courses = list(df[COURSE_CODE_AND_NAME_COLUMN].iloc[:3])
+
+    selected = store.find_courses(version, courses)
+    assert sorted(selected[COURSE_CODE_AND_NAME_COLUMN]) == sorted(courses)
+    assert len(create_result_dataframe(selected, courses, "en")) == 3
+
+    day = df["SINAV GÜNÜ"].iloc[0]
+    assert len(store.exams_on(version, day)) == (df["SINAV GÜNÜ"] == day).sum()
+
+
+def test_exams_in_room(store, make_raw_schedule):
+    """Test that every room of a multi-room exam finds it"""
+    df = prepare_exam_data(make_raw_schedule())
+    version = store.save_schedule(df, "2025-fall")
+
+    comp = "COMP101 (Computer Science)"
+    for room in ("A-101", "A-102"):
+        exams = store.exams_in_room(version, room)
+        assert list(exams[COURSE_CODE_AND_NAME_COLUMN]) == [comp], room
+    assert len(store.exams_in_room(version, "A-101,A-102")) == 0
+
+    # Saving again replaces the rooms instead of adding to them
+    store.save_schedule(df, "2025-fall")
+    assert len(store._query("SELECT * FROM exam_rooms")) == 3
+
+
+def test_schedule_without_classrooms(store, make_schedule):
+    """Test saving a schedule that has no classroom column"""
+    df = make_schedule([("comp101", "2025-11-17 Pazartesi", "09:00:00", "11:00:00")])
+    version = store.save_schedule(df, "2025-fall")
+
+    assert len(store._query("SELECT * FROM exam_rooms")) == 0
+    assert CLASSROOM_CODE_COLUMN not in store.load_schedule(version=version).columns
+
+
+def test_loader_starts_from_store(store, make_fixture_schedule):
+    """Test that a stored schedule is served before the download finishes"""
+    stored = make_fixture_schedule(10, seed=1)
+    fresh = make_fixture_schedule(10, seed=2)
+    store.save_schedule(stored, "2025-fall")
+    release = threading.Event()
+
+    def download(progress):
+        release.wait(10)
+        return fresh
+
+    loader = StoredScheduleLoader(store, "2025-fall", load_func=download)
+    loader.start()
+    assert loader.wait(5)
+    assert loader.is_ready
+    assert sorted(loader.df[COURSE_CODE_AND_NAME_COLUMN]) == sorted(
+        stored[COURSE_CODE_AND_NAME_COLUMN]
+    )
+
+    # The downloaded schedule replaces the stored one and is saved
+    release.set()
+    loader._thread.join(5)
+    assert loader.df is fresh
+    assert store.latest_version("2025-fall") == get_schedule_version(fresh)
+
+
+def test_loader_without_stored_schedule(store, make_fixture_schedule):
+    """Test that the first load downloads and saves the schedule"""
+    df = make_fixture_schedule(10)
+    loader = StoredScheduleLoader(store, "2025-fall", load_func=lambda progress: df)
+    loader.start()
+    assert loader.wait(5)
+    assert loader.df is df
+    assert len(store.load_schedule("2025-fall")) == 10
+
+
+def test_loader_keeps_stored_copy_on_failure(store, make_fixture_schedule):
+    """Test that a failed refresh keeps serving the stored schedule"""
+    store.save_schedule(make_fixture_schedule(10), "2025-fall")
+
+    def fail(progress):
+        raise Exception("network down")
+
+    loader = StoredScheduleLoader(store, "2025-fall", load_func=fail)
+    loader.start()
+    loader.wait(5)
+    loader._thread.join(5)
+    assert loader.is_ready and len(loader.df) == 10
+    assert str(loader.refresh_error) == "network down"
+
+
+def test_install_store_loader(tmp_path, monkeypatch):
+    """Test that the process-wide loader is replaced only before loading"""
+    monkeypatch.setattr(utils, "_schedule_loader", ScheduleLoader())
+    path = str(tmp_path / "schedules.db")
+
+    loader = install_store_loader(path, "2025-fall")
+    assert isinstance(loader, StoredScheduleLoader)
+    assert utils.get_schedule_loader() is loader
+    assert install_store_loader(path, "2025-fall") is loader
+    loader.store.close()
@@ -0,0 +1,146 @@
+"""
+Tests for the schema validation stage and rejected-row quarantine in utils.py
+"""
+
+import datetime
+import time
+
+import pandas as pd
+import pytest
+
+from utils import (
+    CLASSROOM_CODE_COLUMN,
+    COURSE_CODE_AND_NAME_COLUMN,
+    COURSE_CODE_COLUMN,
+    COURSE_NAME_COLUMN,
+    EXAM_DATE_COLUMN,
+    EXAM_FINISH_TIME_COLUMN,
+    EXAM_TIME_COLUMN,
+    REJECTION_REASON_COLUMN,
+    create_result_dataframe,
+    get_exam_intervals,
+    get_quarantined_rows,
+    parse_exam_times,
+    prepare_exam_data,
+    validate_exam_data,
+)
+
+
+def test_validate_exam_data(make_raw_schedule):
+    """Test that invalid rows are separated with their reasons"""
+    valid, quarantine = validate_exam_data(make_raw_schedule())
+
+    assert list(valid.index) == [0, 1, 6]
+    assert list(quarantine.index) == [2, 3, 4, 5]
+    reasons = quarantine[REJECTION_REASON_COLUMN].to_dict()
+    assert reasons[2] == "invalid exam date"
+    assert reasons[3] == "invalid start time"
+    assert reasons[4] == "invalid course code"
+    assert reasons[5] == "invalid course code; missing course name; invalid exam date"
+
+
+def test_validate_exam_data_edge_cases():
+    """Test that rows the formatting cannot handle are rejected or cleaned"""
+    raw = pd.DataFrame(
+        {
+            EXAM_DATE_COLUMN: [
+                "2025-11-15 Cuma",
+                "2025-11-15",
+                pd.Timestamp("2025-11-15"),
+                " 2025-11-16  Cumartesi ",
+                "2025-11-17 Pazartesi",
+            ],
+            EXAM_TIME_COLUMN: ["25:00", "09:00", "09:00", " 09:00", "9:75"],
+            EXAM_FINISH_TIME_COLUMN: ["11:00", "11:00", "11:00", "11:00 ", "11:00"],
+            COURSE_CODE_COLUMN: ["COMP101", "COMP102", "COMP103", "COMP104", "COMP105"],
+            COURSE_NAME_COLUMN: ["A", "B", "C", "D", "E"],
+        }
+    )
+    valid, quarantine = validate_exam_data(raw)
+
+    assert list(valid.index) == [3]
+    assert quarantine[REJECTION_REASON_COLUMN].to_dict() == {
+        0: "invalid start time",
+        1: "invalid exam date",
+        2: "invalid exam date",
+        4: "invalid start time",
+    }
+
+    df = prepare_exam_data(raw)
+    result = create_result_dataframe(df, list(df[COURSE_CODE_AND_NAME_COLUMN]), "en")
+    assert len(result) == 1
+    assert df[EXAM_DATE_COLUMN].iloc[0] == "2025-11-16 Cumartesi"
+    assert df[EXAM_TIME_COLUMN].iloc[0] == "09:00"
+
+
+def test_datetime_exam_times():
+    """Test that the time of day of datetime cells is used"""
+    times = pd.Series(
+        [
+            datetime.datetime(1900, 1, 1, 9, 30),
+            pd.Timestamp("2025-11-15 13:00"),
+            datetime.time(15, 0),
+            "16:00",
+        ]
+    )
+    assert list(parse_exam_times(times)) == [
+        pd.Timedelta(hours=9, minutes=30),
+        pd.Timedelta(hours=13),
+        pd.Timedelta(hours=15),
+        pd.Timedelta(hours=16),
+    ]
+
+    raw = pd.DataFrame(
+        {
+            EXAM_DATE_COLUMN: ["2025-11-15 Cuma"],
+            EXAM_TIME_COLUMN: [datetime.datetime(1900, 1, 1, 9, 0)],
+            EXAM_FINISH_TIME_COLUMN: [datetime.datetime(1900, 1, 1, 11, 0)],
+            COURSE_CODE_COLUMN: ["COMP101"],
+            COURSE_NAME_COLUMN: ["Computer Science"],
+        }
+    )
+    df = prepare_exam_data(raw)
+    assert len(get_quarantined_rows(df)) == 0
+    assert df[EXAM_TIME_COLUMN].iloc[0] == datetime.time(9, 0)
+    assert get_exam_intervals(df)["end"].iloc[0] == pd.Timestamp("2025-11-15 11:00")
+
+
+def test_missing_required_columns(make_raw_schedule):
+    """Test that a workbook without required columns is rejected"""
+    raw = make_raw_schedule().drop(columns=[EXAM_TIME_COLUMN])
+    with pytest.raises(ValueError, match=EXAM_TIME_COLUMN):
+        validate_exam_data(raw)
+
+
+def test_prepare_exam_data_quarantines(make_raw_schedule):
+    """Test that bad rows no longer abort the whole ingest"""
+    df = prepare_exam_data(make_raw_schedule())
+
+    assert sorted(df[COURSE_CODE_COLUMN]) == ["comp101", "math 102"]
+    assert "COMP101 (Computer Science)" in list(df[COURSE_CODE_AND_NAME_COLUMN])
+    comp = df[df[COURSE_CODE_COLUMN] == "comp101"].iloc[0]
+    assert comp[CLASSROOM_CODE_COLUMN] == "A-101,A-102", "Empty rooms are skipped"
+    assert len(get_quarantined_rows(df)) == 4
+
+    # Every remaining row can be formatted and sorted
+    result = create_result_dataframe(
+        df, list(df[COURSE_CODE_AND_NAME_COLUMN]), "en", include_classroom=True
+    )
+    assert len(result) == 2
+
+
+def test_get_quarantined_rows_unknown_schedule():
+    """Test that schedules not prepared here have no rejected rows"""
+    df = pd.DataFrame({COURSE_CODE_COLUMN: ["comp101"]})
+    assert len(get_quarantined_rows(df)) == 0
+
+
+def test_validation_is_vectorized(make_raw_schedule):
+    """Test that a large workbook is validated quickly"""
+    raw = pd.concat([make_raw_schedule()] * 20000, ignore_index=True)
+    started = time.perf_counter()
+    valid, quarantine = validate_exam_data(raw)
+    elapsed = time.perf_counter() - started
+
+    assert len(valid) == 60000 and len(quarantine) == 80000
+    assert elapsed < 5, f"Validating 140k rows took {elapsed:.2f}s"
@@ -1,6 +1,10 @@
 # Import required libraries
 import datetime
-import io
+import hashlib
+import re
+import threading
+import uuid
+import weakref
 
 import pandas as pd
 import plotly.figure_factory as ff
@@ -8,6 +12,9 @@ import requests
 import urllib3
 from unidecode import unidecode
 
+from cache import LRUCache, VersionCache
+from fetch import fetch_to_tempfile
+
 # Disable SSL warnings when verify=False is used
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -19,6 +26,33 @@ COURSE_CODE_COLUMN = "DERS KODU"
 COURSE_NAME_COLUMN = "DERS ADI"
 COURSE_CODE_AND_NAME_COLUMN = "DERS KODU VE ADI"
 CLASSROOM_CODE_COLUMN = "DERSLİK/ODA KODLARI"
+REJECTION_REASON_COLUMN = "RED NEDENİ"
+# All codes and names of cross-listed courses, joined with ';'
+COURSE_ALIASES_COLUMN = "DERS KODLARI"
+COURSE_NAME_ALIASES_COLUMN = "DERS ADLARI"
+
+# Columns without which the workbook cannot be processed
+REQUIRED_COLUMNS = [
+    EXAM_DATE_COLUMN,
+    EXAM_TIME_COLUMN,
+    COURSE_CODE_COLUMN,
+    COURSE_NAME_COLUMN,
+]
+
+# Patterns checked by validate_exam_data, written for both Python's re and RE2
+# (used by Arrow-backed strings), so letters are listed instead of using \w
+_CODE_LETTERS = "[A-Za-zÇĞİÖŞÜçğıöşü]"
+_SINGLE_COURSE_CODE = rf"\s*{_CODE_LETTERS}+\s*-?\s*[0-9]+{_CODE_LETTERS}*\s*"
+COURSE_CODE_PATTERN = rf"{_SINGLE_COURSE_CODE}(?:;{_SINGLE_COURSE_CODE})*;?"
+EXAM_TIME_PATTERN = r"(?:[01]?\d|2[0-3]):[0-5]\d(?::[0-5]\d)?"
+EXAM_DATE_FORMATS = ["%Y-%m-%d", "%d.%m.%Y"]
+
+# URL of the exam schedule Excel file and the term it belongs to
+EXAM_SCHEDULE_URL = "https://halic.edu.tr/wp-content/uploads/duyurular/2025/12/24/2025-2026-guz-final-tum-liste.xlsx"
+EXAM_TERM = "2025-2026-guz-final"
+
+# Formatted exam lookups shared by all sessions, keyed by schedule version
+result_cache = LRUCache(max_size=4096, ttl=6 * 3600)
 
 
 def format_date(date_str):
@@ -47,41 +81,217 @@ def format_date(date_str):
     return formatted_date
 
 
-def process_exam_data():
+def process_exam_data(progress=None):
     """
     Retrieve and process exam data from Halic University's exam schedule Excel file.
 
+    Args:
+        progress (callable): Optional callback receiving the completed
+            fraction (0.0-1.0) of the download and processing steps
+
     Returns:
         pd.DataFrame: Processed exam data DataFrame
     """
-    # URL of the exam schedule Excel file
-    url = "https://halic.edu.tr/wp-content/uploads/duyurular/2025/12/24/2025-2026-guz-final-tum-liste.xlsx"
+    url = EXAM_SCHEDULE_URL
+
+    def report(fraction):
+        if progress is not None:
+            progress(fraction)
+
+    def report_download(received, total):
+        # Downloading takes the first 80% of the progress bar
+        if total:
+            report(0.8 * min(received / total, 1.0))
 
     try:
-        # Download Excel file with SSL verification disabled and timeout
+        # Stream the Excel file to a temporary file with retries and resume
         # Note: verify=False is used due to SSL certificate issues with halic.edu.tr
-        midterm_xls = requests.get(url, verify=False, timeout=30)
-        midterm_xls.raise_for_status()  # Raise an exception for bad status codes
+        with fetch_to_tempfile(
+            url, suffix=".xlsx", verify=False, on_progress=report_download
+        ) as path:
+            report(0.8)
+            df = pd.read_excel(path)
     except requests.exceptions.RequestException as e:
         print(f"Error downloading exam data: {e}")
         # Return empty DataFrame or raise exception based on your preference
         raise Exception(f"Failed to download exam schedule from {url}: {e}")
 
-    # Read Excel file into DataFrame using BytesIO to avoid deprecation warning
-    df = pd.read_excel(io.BytesIO(midterm_xls.content))
+    report(0.9)
+    df = prepare_exam_data(df)
+    report(1.0)
+    return df
+
+
+def parse_exam_dates(dates):
+    """
+    Parse a column of exam dates in any of the supported formats at once.
+
+    Args:
+        dates (pd.Series): Dates like '2025-11-15 Cuma' or '15.11.2025 Cuma'
+
+    Returns:
+        pd.Series: Parsed dates, NaT where no format matches
+    """
+    day_parts = dates.astype("string").str.strip().str.split(" ").str[0]
+    parsed = pd.Series(pd.NaT, index=dates.index, dtype="datetime64[ns]")
+    for date_format in EXAM_DATE_FORMATS:
+        parsed = parsed.fillna(
+            pd.to_datetime(day_parts, format=date_format, errors="coerce")
+        )
+    return parsed
+
+
+def parse_exam_times(times):
+    """
+    Parse a column of exam times into offsets from midnight at once.
+
+    Args:
+        times (pd.Series): Times as 'HH:MM', 'HH:MM:SS', datetime.time or
+            datetime.datetime, of which only the time of day is used
+
+    Returns:
+        pd.Series: Time offsets as timedeltas, NaT where a time is invalid or
+            outside of the day
+    """
+    # Excel gives time cells with a date part as datetime.datetime, whose
+    # string form also contains the date
+    times = times.map(
+        lambda value: (
+            value.strftime("%H:%M:%S")
+            if isinstance(value, (datetime.time, datetime.datetime))
+            else value
+        )
+    )
+    text = times.astype("string").str.strip()
+    text = text.where(text.str.fullmatch(EXAM_TIME_PATTERN).fillna(False))
+    text = text.str.replace(r"^([0-9]{1,2}:[0-9]{2})$", r"\1:00", regex=True)
+    return pd.to_timedelta(text, errors="coerce")
+
+
+def validate_exam_data(df):
+    """
+    Check the rows of a raw exam schedule and separate the invalid ones.
+
+    All checks are vectorized over whole columns, so large workbooks are
+    validated in one pass instead of failing on the first bad cell.
+
+    Args:
+        df (pd.DataFrame): Exam schedule as read from the Excel file
+
+    Returns:
+        tuple: DataFrame of valid rows, and DataFrame of rejected rows with
+            the reasons in REJECTION_REASON_COLUMN
+
+    Raises:
+        ValueError: If required columns are missing
+    """
+    missing = [column for column in REQUIRED_COLUMNS if column not in df.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+    codes = df[COURSE_CODE_COLUMN].astype("string")
+    names = df[COURSE_NAME_COLUMN].astype("string").str.strip()
+    # Dates are text with a weekday (e.g. '2025-11-15 Cuma'), cells Excel
+    # read as timestamps have no weekday and are rejected
+    dates = df[EXAM_DATE_COLUMN]
+    weekdays = dates.where(dates.map(type) == str).astype("string").str.split().str[1]
+    invalid_dates = parse_exam_dates(dates).isna() | weekdays.isna()
+
+    checks = [
+        (
+            ~codes.str.fullmatch(COURSE_CODE_PATTERN).fillna(False),
+            "invalid course code",
+        ),
+        (names.fillna("").eq(""), "missing course name"),
+        (invalid_dates, "invalid exam date"),
+        (parse_exam_times(df[EXAM_TIME_COLUMN]).isna(), "invalid start time"),
+    ]
+    if EXAM_FINISH_TIME_COLUMN in df.columns:
+        checks.append(
+            (
+                parse_exam_times(df[EXAM_FINISH_TIME_COLUMN]).isna(),
+                "invalid finish time",
+            )
+        )
+
+    # Collect every failed check of a row in one reason string
+    reasons = pd.Series("", index=df.index)
+    for failed, reason in checks:
+        reasons = reasons.mask(failed.to_numpy(dtype=bool), reasons + reason + "; ")
+
+    rejected = reasons.ne("")
+    quarantine = df[rejected].copy()
+    quarantine[REJECTION_REASON_COLUMN] = reasons[rejected].str.rstrip("; ")
+    return df[~rejected].copy(), quarantine
+
+
+# Rejected rows of recently prepared schedules, by schedule version
+_quarantined_rows = VersionCache()
+
+
+def get_quarantined_rows(df):
+    """
+    Get the rows rejected while preparing an exam schedule.
+
+    Args:
+        df (pd.DataFrame): Exam schedule returned by prepare_exam_data
+
+    Returns:
+        pd.DataFrame: Rejected rows with the reasons in REJECTION_REASON_COLUMN
+    """
+    quarantine = _quarantined_rows.get(get_schedule_version(df))
+    if quarantine is None:
+        return pd.DataFrame(columns=[*df.columns, REJECTION_REASON_COLUMN])
+    return quarantine
+
+
+def prepare_exam_data(df):
+    """
+    Validate and clean a raw exam schedule read from the Excel file.
+
+    Invalid rows are quarantined instead of aborting, see get_quarantined_rows.
+
+    Args:
+        df (pd.DataFrame): Exam schedule as read from the Excel file
+
+    Returns:
+        pd.DataFrame: Processed exam data DataFrame
+    """
+    df, quarantine = validate_exam_data(df)
+    if len(quarantine) > 0:
+        print(f"Quarantined {len(quarantine)} invalid rows of the exam schedule")
+
+    # Clean and process course data, the first code and name of a
+    # cross-listed course name its exam and the others are kept as aliases
+    code_aliases = df[COURSE_CODE_COLUMN].astype(str).str.split(";").explode()
+    code_aliases = code_aliases.map(lambda y: unidecode(y).strip().lower())
+    name_aliases = df[COURSE_NAME_COLUMN].astype(str).str.split(";").explode()
+    name_aliases = name_aliases.str.strip()
+    df[COURSE_ALIASES_COLUMN] = (
+        code_aliases[code_aliases != ""].groupby(level=0).agg(";".join)
+    )
+    df[COURSE_NAME_ALIASES_COLUMN] = (
+        name_aliases[name_aliases != ""].groupby(level=0).agg(";".join)
+    )
+    df[COURSE_NAME_ALIASES_COLUMN] = df[COURSE_NAME_ALIASES_COLUMN].fillna("")
 
-    # Clean and process course data
-    df[COURSE_CODE_COLUMN] = df[COURSE_CODE_COLUMN].apply(lambda x: x.split(";")[0])
-    df[COURSE_NAME_COLUMN] = df[COURSE_NAME_COLUMN].apply(lambda x: x.split(";")[0])
+    df[COURSE_CODE_COLUMN] = df[COURSE_CODE_COLUMN].astype(str).str.split(";").str[0]
+    df[COURSE_NAME_COLUMN] = df[COURSE_NAME_COLUMN].astype(str).str.split(";").str[0]
     df[COURSE_CODE_COLUMN] = df[COURSE_CODE_COLUMN].apply(
-        lambda y: unidecode(y).lower()
+        lambda y: unidecode(y).strip().lower()
     )
 
+    # Remove the padding that the checks accept but the time and date
+    # formatting does not
+    df[EXAM_DATE_COLUMN] = df[EXAM_DATE_COLUMN].str.split().str.join(" ")
+    for column in (EXAM_TIME_COLUMN, EXAM_FINISH_TIME_COLUMN):
+        if column in df.columns:
+            df[column] = df[column].map(_clean_exam_time)
+
     # Clean classroom data if it exists
     if CLASSROOM_CODE_COLUMN in df.columns:
-        df[CLASSROOM_CODE_COLUMN] = df[CLASSROOM_CODE_COLUMN].apply(lambda x: str(x))
-        df[CLASSROOM_CODE_COLUMN] = df[CLASSROOM_CODE_COLUMN].apply(
-            lambda x: x.replace(";", ",")
+        df[CLASSROOM_CODE_COLUMN] = (
+            df[CLASSROOM_CODE_COLUMN].fillna("").astype(str).str.replace(";", ",")
         )
 
     # Select and group relevant columns
@@ -91,6 +301,8 @@ def process_exam_data():
         EXAM_FINISH_TIME_COLUMN,
         COURSE_CODE_COLUMN,
         COURSE_NAME_COLUMN,
+        COURSE_ALIASES_COLUMN,
+        COURSE_NAME_ALIASES_COLUMN,
     ]
     if CLASSROOM_CODE_COLUMN in df.columns:
         columns_to_use.append(CLASSROOM_CODE_COLUMN)
@@ -106,6 +318,9 @@ def process_exam_data():
         EXAM_DATE_COLUMN: "first",
         EXAM_TIME_COLUMN: "first",
         COURSE_NAME_COLUMN: "first",
+        # Rows of the same exam may list different cross-listed courses
+        COURSE_ALIASES_COLUMN: _join_aliases,
+        COURSE_NAME_ALIASES_COLUMN: _join_aliases,
     }
 
     # Add finish time to aggregation if it exists in the DataFrame
@@ -113,7 +328,7 @@ def process_exam_data():
         agg_dict[EXAM_FINISH_TIME_COLUMN] = "first"
 
     if CLASSROOM_CODE_COLUMN in df.columns:
-        agg_dict[CLASSROOM_CODE_COLUMN] = ", ".join
+        agg_dict[CLASSROOM_CODE_COLUMN] = _join_classrooms
 
     df = df.groupby(COURSE_CODE_COLUMN).agg(agg_dict).reset_index()
 
@@ -125,9 +340,157 @@ def process_exam_data():
         df[COURSE_CODE_COLUMN].str.upper() + " (" + df[COURSE_NAME_COLUMN] + ")"
     )
 
+    version = get_schedule_version(df)
+    _quarantined_rows.put(version, quarantine)
+    # Lookups of older schedules can no longer be requested by the app
+    result_cache.invalidate(lambda key: key[1] != version)
     return df
 
 
+def _clean_exam_time(value):
+    if isinstance(value, str):
+        return value.strip()
+    # Only the time of day of datetime cells is used, see parse_exam_times
+    if isinstance(value, datetime.datetime):
+        return value.time()
+    return value
+
+
+def _join_classrooms(values):
+    # Rows without a classroom are left out instead of adding empty entries
+    return ", ".join(value for value in values if value)
+
+
+def _join_aliases(values):
+    aliases = (alias for value in values for alias in value.split(";") if alias)
+    return ";".join(dict.fromkeys(aliases))
+
+
+def normalize_alias(text):
+    """
+    Normalize a course code or name for alias lookups.
+
+    Case, Turkish characters, spaces and punctuation are ignored, so
+    'BİL 101', 'bil101' and 'Bil-101' are the same alias.
+
+    Args:
+        text (str): Course code or name
+
+    Returns:
+        str: Normalized alias
+    """
+    return re.sub(r"[^0-9a-z]", "", unidecode(str(text)).lower())
+
+
+# Alias indexes of recently used schedules, by schedule version
+_alias_indexes = VersionCache()
+
+
+def get_alias_index(df):
+    """
+    Get the index of every course code and name alias of a schedule.
+
+    Built with vectorized explodes over the alias columns and cached per
+    schedule version. Canonical codes take precedence over aliases, then
+    earlier exams over later ones.
+
+    Args:
+        df (pd.DataFrame): Exam schedule DataFrame
+
+    Returns:
+        dict: Normalized alias to course code and name
+    """
+    return _alias_indexes.get_or_compute(
+        get_schedule_version(df), lambda: _build_alias_index(df)
+    )
+
+
+def _build_alias_index(df):
+    courses = df[COURSE_CODE_AND_NAME_COLUMN]
+    columns = [
+        COURSE_CODE_COLUMN,
+        COURSE_CODE_AND_NAME_COLUMN,
+        COURSE_ALIASES_COLUMN,
+        COURSE_NAME_COLUMN,
+        COURSE_NAME_ALIASES_COLUMN,
+    ]
+    table = pd.concat(
+        [
+            pd.DataFrame(
+                {
+                    "alias": df[column].astype(str).str.split(";").to_numpy(),
+                    "course": courses.to_numpy(),
+                }
+            )
+            for column in columns
+            if column in df.columns
+        ],
+        ignore_index=True,
+    ).explode("alias")
+    table = table[table["alias"].notna()]
+    normalized = {alias: normalize_alias(alias) for alias in table["alias"].unique()}
+    table["alias"] = table["alias"].map(normalized)
+    table = table[table["alias"] != ""].drop_duplicates("alias")
+
+    return dict(zip(table["alias"], table["course"]))
+
+
+def resolve_course(df, alias):
+    """
+    Find the exam of a course by any of its codes or names.
+
+    Args:
+        df (pd.DataFrame): Exam schedule DataFrame
+        alias (str): Course code, cross-listed code, name or code and name
+
+    Returns:
+        str: Course code and name of the exam, None if not found
+    """
+    return get_alias_index(df).get(normalize_alias(alias))
+
+
+def get_course_labels(df):
+    """
+    Get the labels of the course picker, listing the cross-listed codes and
+    names, so a course can be searched by any of them.
+
+    Args:
+        df (pd.DataFrame): Exam schedule DataFrame
+
+    Returns:
+        dict: Course code and name to its label
+    """
+    courses = df[COURSE_CODE_AND_NAME_COLUMN]
+    if COURSE_ALIASES_COLUMN not in df.columns:
+        return dict(zip(courses, courses))
+    if COURSE_NAME_ALIASES_COLUMN in df.columns:
+        name_aliases = df[COURSE_NAME_ALIASES_COLUMN]
+    else:
+        name_aliases = [""] * len(df)
+
+    labels = {}
+    for course, code, aliases, name, names in zip(
+        courses,
+        df[COURSE_CODE_COLUMN],
+        df[COURSE_ALIASES_COLUMN],
+        df[COURSE_NAME_COLUMN],
+        name_aliases,
+    ):
+        other_codes = [alias.upper() for alias in _other_aliases(aliases, code)]
+        other_names = _other_aliases(names, name)
+        labels[course] = " / ".join(
+            [course]
+            + [", ".join(others) for others in (other_codes, other_names) if others]
+        )
+    return labels
+
+
+def _other_aliases(aliases, own):
+    if not isinstance(aliases, str):
+        return []
+    return [alias for alias in aliases.split(";") if alias and alias != own]
+
+
 def parse_exam_time(time_value):
     """
     Parse exam time from various input formats.
@@ -166,6 +529,13 @@ def get_exam_date(df, course_code, language="tr"):
     Raises:
         ValueError: If course_code is not found in the DataFrame
     """
+    return result_cache.get_or_compute(
+        ("exam_date", get_schedule_version(df), course_code, language),
+        lambda: _format_exam_date(df, course_code, language),
+    )
+
+
+def _format_exam_date(df, course_code, language):
     # Validate that the course exists
     course_rows = df[df[COURSE_CODE_AND_NAME_COLUMN] == course_code]
     if len(course_rows) == 0:
@@ -274,6 +644,9 @@ def create_result_dataframe(df, course_list, language="tr", include_classroom=Fa
     """
     Create a result DataFrame with sorted exam dates.
 
+    Results are shared between callers selecting the same courses through
+    result_cache, each caller gets its own copy.
+
     Args:
         df (pd.DataFrame): Exam schedule DataFrame
         course_list (list): List of selected courses
@@ -283,6 +656,16 @@ def create_result_dataframe(df, course_list, language="tr", include_classroom=Fa
     Returns:
         pd.DataFrame: Sorted result DataFrame
     """
+    courses = tuple(sorted(course_list))
+    result_df = result_cache.get_or_compute(
+        ("result", get_schedule_version(df), courses, language, include_classroom),
+        lambda: _build_result_dataframe(df, courses, language, include_classroom),
+    )
+    # The cached table is shared, so callers must not be able to modify it
+    return result_df.copy()
+
+
+def _build_result_dataframe(df, course_list, language, include_classroom):
     # Get column names based on language
     col_names = get_language_column_names(language)
     course_name_col = col_names["course_name"]
@@ -352,12 +735,15 @@ def getClassroom(df, course_code):
     return classroom
 
 
-def createImage(df):
+def render_table_image(df):
     """
-    Create an image of the result DataFrame.
+    Render the result DataFrame as a PNG image.
 
     Args:
         df (pd.DataFrame): Input DataFrame
+
+    Returns:
+        bytes: PNG image data
     """
     course_list = list(df.iloc[:, 0])
     scale = 21
@@ -367,7 +753,124 @@ def createImage(df):
     fig.layout.width = width if width > 800 else 800
     fig.update_layout(autosize=True)
 
-    fig.write_image("output/examgenius.png", scale=2)
+    return fig.to_image(format="png", scale=2)
+
+
+def createImage(df):
+    """
+    Create an image of the result DataFrame.
+
+    Args:
+        df (pd.DataFrame): Input DataFrame
+    """
+    image = render_table_image(df)
+    with open("output/examgenius.png", "wb") as file:
+        file.write(image)
+
+
+def get_exam_type_text(language="tr", exam_type="midterm"):
+    """
+    Get the display name of an exam type.
+
+    Args:
+        language (str): Language code ('tr' or 'en')
+        exam_type (str): Type of exam ('midterm' or 'final')
+
+    Returns:
+        str: Exam type name in the given language
+    """
+    if language == "en":
+        return "Midterm" if exam_type == "midterm" else "Final"
+    return "Vize" if exam_type == "midterm" else "Final"
+
+
+def create_ics_event(
+    course_name,
+    exam_date_str,
+    classroom="N/A",
+    language="tr",
+    exam_type="midterm",
+    uid=None,
+    dtstamp=None,
+):
+    """
+    Create the lines of a single ICS event for an exam.
+
+    Args:
+        course_name (str): Course name
+        exam_date_str (str): Exam date as returned by get_exam_date
+        classroom (str): Classroom codes
+        language (str): Language of the event text ('tr' or 'en')
+        exam_type (str): Type of exam ('midterm' or 'final')
+        uid (str): Event UID, a random one is generated if not given
+        dtstamp (datetime.datetime): Event timestamp, defaults to now
+
+    Returns:
+        list: ICS lines from BEGIN:VEVENT to END:VEVENT
+    """
+    exam_type_text = get_exam_type_text(language, exam_type)
+
+    # Parse the date and time
+    date_parts = exam_date_str.split()
+    date_str = date_parts[0]  # Format: dd/mm/yyyy
+    time_part = date_parts[-1]  # Format: HH:MM or HH:MM-HH:MM
+
+    # Parse the date
+    day, month, year = map(int, date_str.split("/"))
+
+    # Handle time parsing (could be start time only or start-end time)
+    if "-" in time_part:
+        # Both start and end times are provided
+        start_time_str, end_time_str = time_part.split("-")
+        start_hour, start_minute = map(int, start_time_str.split(":"))
+        end_hour, end_minute = map(int, end_time_str.split(":"))
+
+        start_datetime = datetime.datetime(year, month, day, start_hour, start_minute)
+        end_datetime = datetime.datetime(year, month, day, end_hour, end_minute)
+    else:
+        # Only start time provided, assume 2-hour duration
+        start_hour, start_minute = map(int, time_part.split(":"))
+        start_datetime = datetime.datetime(year, month, day, start_hour, start_minute)
+        end_datetime = start_datetime + datetime.timedelta(hours=2)
+
+    # Format dates for ICS
+    start_str = start_datetime.strftime("%Y%m%dT%H%M%S")
+    end_str = end_datetime.strftime("%Y%m%dT%H%M%S")
+
+    # Create a unique ID for the event
+    event_uid = uid or str(uuid.uuid4())
+    dtstamp = dtstamp or datetime.datetime.now()
+
+    # Create the event
+    summary = f"{course_name} {exam_type_text.title()}"
+    description = (
+        f"{exam_type_text} exam for {course_name}"
+        if language == "en"
+        else f"{course_name} {exam_type_text.lower()} sınavı"
+    )
+
+    return [
+        "BEGIN:VEVENT",
+        f"UID:{event_uid}",
+        f"DTSTAMP:{dtstamp.strftime('%Y%m%dT%H%M%S')}",
+        f"DTSTART:{start_str}",
+        f"DTEND:{end_str}",
+        f"SUMMARY:{summary}",
+        f"DESCRIPTION:{description}",
+        f"LOCATION:{classroom}",
+        "END:VEVENT",
+    ]
+
+
+# ICS calendar header and footer
+ICS_HEADER = [
+    "BEGIN:VCALENDAR",
+    "VERSION:2.0",
+    "PRODID:-//ExamGenius//EN",
+    "CALSCALE:GREGORIAN",
+    "METHOD:PUBLISH",
+]
+ICS_FOOTER = ["END:VCALENDAR"]
 
 
 def create_ics_file(df, course_list, language="tr", exam_type="midterm"):
@@ -383,17 +886,8 @@ def create_ics_file(df, course_list, language="tr", exam_type="midterm"):
     Returns:
         str: ICS file content as a string
     """
-    import datetime
-    import uuid
-
     # Start with the ICS file header
-    ics_content = [
-        "BEGIN:VCALENDAR",
-        "VERSION:2.0",
-        "PRODID:-//ExamGenius//EN",
-        "CALSCALE:GREGORIAN",
-        "METHOD:PUBLISH",
-    ]
+    ics_content = list(ICS_HEADER)
 
     # Get the result DataFrame to work with
     result_df = create_result_dataframe(
@@ -406,83 +900,225 @@ def create_ics_file(df, course_list, language="tr", exam_type="midterm"):
     exam_date_col = col_names["exam_date"]
     classroom_col = col_names["classroom"]
 
-    # Determine exam type text based on language
-    exam_type_text = "Vize" if exam_type == "midterm" else "Final"
-    if language == "en":
-        exam_type_text = "Midterm" if exam_type == "midterm" else "Final"
-
     # Process each row in the result DataFrame
     for _, row in result_df.iterrows():
-        course_name = row[course_name_col]
-        exam_date_str = row[exam_date_col]
         classroom = row[classroom_col] if classroom_col in row else "N/A"
+        ics_content.extend(
+            create_ics_event(
+                row[course_name_col],
+                row[exam_date_col],
+                classroom,
+                language,
+                exam_type,
+            )
+        )
+
+    # Add the ICS file footer
+    ics_content.extend(ICS_FOOTER)
 
-        # Parse the date and time
-        date_parts = exam_date_str.split()
-        date_str = date_parts[0]  # Format: dd/mm/yyyy
-        time_part = date_parts[-1]  # Format: HH:MM or HH:MM-HH:MM
+    # Join the ICS content with line breaks
+    return "\n".join(ics_content)
 
-        # Parse the date
-        day, month, year = map(int, date_str.split("/"))
 
-        # Handle time parsing (could be start time only or start-end time)
-        if "-" in time_part:
-            # Both start and end times are provided
-            start_time_str, end_time_str = time_part.split("-")
-            start_hour, start_minute = map(int, start_time_str.split(":"))
-            end_hour, end_minute = map(int, end_time_str.split(":"))
+# Schedule versions by DataFrame id, dropped when the DataFrame is collected
+_schedule_versions = {}
+
+
+def get_schedule_version(df):
+    """
+    Get a version identifier for the content of an exam schedule.
+
+    The identifier is a hash of the DataFrame content and is computed once per
+    DataFrame object, so schedules must not be modified after this call.
+
+    Args:
+        df (pd.DataFrame): Exam schedule DataFrame
 
-            start_datetime = datetime.datetime(
-                year, month, day, start_hour, start_minute
+    Returns:
+        str: Hexadecimal version identifier
+    """
+    key = id(df)
+    entry = _schedule_versions.get(key)
+    if entry is not None and entry[0]() is df:
+        return entry[1]
+
+    digest = hashlib.sha1("\x1f".join(map(str, df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    version = digest.hexdigest()[:16]
+    set_schedule_version(df, version)
+    return version
+
+
+def set_schedule_version(df, version):
+    """
+    Assign the version identifier of an exam schedule.
+
+    Used for schedules restored from storage, whose column order and types
+    differ from the schedule they were saved from, so they keep its version.
+
+    Args:
+        df (pd.DataFrame): Exam schedule DataFrame
+        version (str): Version identifier from get_schedule_version
+    """
+    key = id(df)
+    ref = weakref.ref(df, lambda _: _schedule_versions.pop(key, None))
+    _schedule_versions[key] = (ref, version)
+
+
+# Exam intervals of recently used schedules, by schedule version
+_exam_intervals = VersionCache()
+
+# Exams without a finish time are assumed to take two hours, as in ICS files
+DEFAULT_EXAM_DURATION = pd.Timedelta(hours=2)
+
+
+def get_exam_intervals(df):
+    """
+    Get the start and end of every exam as typed datetimes.
+
+    Computed with vectorized parsing and cached per schedule version.
+
+    Args:
+        df (pd.DataFrame): Exam schedule DataFrame
+
+    Returns:
+        pd.DataFrame: 'start' and 'end' columns indexed by course code and name
+    """
+    return _exam_intervals.get_or_compute(
+        get_schedule_version(df), lambda: _build_exam_intervals(df)
+    )
+
+
+def _build_exam_intervals(df):
+    days = parse_exam_dates(df[EXAM_DATE_COLUMN])
+    start = days + parse_exam_times(df[EXAM_TIME_COLUMN])
+    if EXAM_FINISH_TIME_COLUMN in df.columns:
+        end = days + parse_exam_times(df[EXAM_FINISH_TIME_COLUMN])
+        end = end.fillna(start + DEFAULT_EXAM_DURATION)
+    else:
+        end = start + DEFAULT_EXAM_DURATION
+
+    return pd.DataFrame(
+        {"start": start.to_numpy(), "end": end.to_numpy()},
+        index=pd.Index(df[COURSE_CODE_AND_NAME_COLUMN].to_numpy()),
+    )
+
+
+class ScheduleLoader:
+    """
+    Load the exam schedule on a background thread.
+
+    The loader is shared by all sessions of the process so the schedule is
+    downloaded and parsed once, while pages render without waiting for it.
+    """
+
+    IDLE = "idle"
+    LOADING = "loading"
+    READY = "ready"
+    ERROR = "error"
+
+    def __init__(self, load_func=process_exam_data, warm_up=None):
+        """
+        Args:
+            load_func (callable): Function returning the schedule DataFrame,
+                called with a ``progress`` callback keyword argument
+            warm_up (callable): Optional function called with every loaded
+                schedule after it is marked ready, e.g. to precompute results
+        """
+        self._load_func = load_func
+        self.warm_up = warm_up
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread = None
+        self.status = self.IDLE
+        self.progress = 0.0
+        self.df = None
+        self.error = None
+
+    @property
+    def is_ready(self):
+        return self.status == self.READY
+
+    def start(self, retry=True):
+        """
+        Start loading in the background unless a load is running or finished.
+
+        Args:
+            retry (bool): Whether a failed load is started again
+        """
+        with self._lock:
+            if self.status in (self.LOADING, self.READY):
+                return
+            if self.status == self.ERROR and not retry:
+                return
+            self.status = self.LOADING
+            self.progress = 0.0
+            self.error = None
+            self._done.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="schedule-loader", daemon=True
             )
-            end_datetime = datetime.datetime(year, month, day, end_hour, end_minute)
+            self._thread.start()
+
+    def wait(self, timeout=None):
+        """
+        Block until the current load finishes.
+
+        Args:
+            timeout (float): Maximum time to wait in seconds
+
+        Returns:
+            bool: True if the load finished within the timeout
+        """
+        return self._done.wait(timeout)
+
+    def _set_progress(self, fraction):
+        self.progress = fraction
+
+    def _run(self):
+        try:
+            df = self._load_func(progress=self._set_progress)
+        except Exception as e:
+            self.error = e
+            self.status = self.ERROR
         else:
-            # Only start time provided, assume 2-hour duration
-            start_hour, start_minute = map(int, time_part.split(":"))
-            start_datetime = datetime.datetime(
-                year, month, day, start_hour, start_minute
-            )
-            end_datetime = start_datetime + datetime.timedelta(hours=2)
+            self.df = df
+            self.progress = 1.0
+            self.status = self.READY
+        finally:
+            self._done.set()
 
-        # Format dates for ICS
-        start_str = start_datetime.strftime("%Y%m%dT%H%M%S")
-        end_str = end_datetime.strftime("%Y%m%dT%H%M%S")
+        # Warming up runs after the schedule is served, so it never delays it
+        if self.status == self.READY and self.warm_up is not None:
+            try:
+                self.warm_up(self.df)
+            except Exception as e:
+                print(f"Warming up the exam schedule failed: {e}")
 
-        # Create a unique ID for the event
-        event_uid = str(uuid.uuid4())
 
-        # Create the event
-        summary = f"{course_name} {exam_type_text.title()}"
-        description = (
-            f"{exam_type_text} exam for {course_name}"
-            if language == "en"
-            else f"{course_name} {exam_type_text.lower()} sınavı"
-        )
+# Process-wide schedule loader - started lazily
+_schedule_loader = ScheduleLoader()
 
-        # Add the event to the ICS content
-        ics_content.extend(
-            [
-                "BEGIN:VEVENT",
-                f"UID:{event_uid}",
-                f"DTSTAMP:{datetime.datetime.now().strftime('%Y%m%dT%H%M%S')}",
-                f"DTSTART:{start_str}",
-                f"DTEND:{end_str}",
-                f"SUMMARY:{summary}",
-                f"DESCRIPTION:{description}",
-                f"LOCATION:{classroom}",
-                "END:VEVENT",
-            ]
-        )
 
-    # Add the ICS file footer
-    ics_content.append("END:VCALENDAR")
+def get_schedule_loader():
+    """
+    Get the process-wide schedule loader.
 
-    # Join the ICS content with line breaks
-    return "\n".join(ics_content)
+    Returns:
+        ScheduleLoader: Shared loader instance
+    """
+    return _schedule_loader
 
 
-# Global DataFrame - initialized lazily
-_df_cache = None
+def set_schedule_loader(loader):
+    """
+    Replace the process-wide schedule loader, e.g. with a fixture schedule.
+
+    Args:
+        loader (ScheduleLoader): Loader used by get_df and the app
+    """
+    global _schedule_loader
+    _schedule_loader = loader
 
 
 def get_df():
@@ -491,18 +1127,24 @@ def get_df():
 
     Returns:
         pd.DataFrame: Exam schedule DataFrame
-    """
-    global _df_cache
-    if _df_cache is None:
-        _df_cache = process_exam_data()
-    return _df_cache
-
 
-# For backward compatibility, try to load df at module import
-# but don't fail if network is unavailable
-try:
-    df = process_exam_data()
-except (requests.exceptions.RequestException, ConnectionError, Exception) as e:
-    # If data fetch fails at import time, df will be None
-    # Functions should use get_df() for lazy loading
-    df = None
+    Raises:
+        Exception: If the exam schedule could not be loaded
+    """
+    loader = get_schedule_loader()
+    loader.start()
+    loader.wait()
+    if loader.error is not None:
+        raise loader.error
+    return loader.df
+
+
+def __getattr__(name):
+    # For backward compatibility, ``utils.df`` loads the schedule on first
+    # access instead of at import time, and is None if the download fails
+    if name == "df":
+        try:
+            return get_df()
+        except Exception:
+            return None
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")